@@ -1,5 +1,8 @@
 import json
 import os
+import re
+import threading
+import time
 
 import titan.resources as resources
 
@@ -78,7 +81,8 @@ def get_sql_fixtures():
                 continue
             try:
                 idx = 1
-                for fixture in get_sql_fixture(f):
+                # Column definitions aren't statements, that fixture has one per line
+                for fixture in get_sql_fixture(f, lines=resource_name == "column"):
                     yield (resource_cls, fixture, idx)
                     idx += 1
             except Exception:
@@ -91,3 +95,95 @@ def get_sql_fixture(filename, lines=False):
             yield from f.read().splitlines()
         else:
             yield from _split_statements(f.read())
+
+
+USE_ROLE = re.compile(r"^\s*USE\s+ROLE\s+(\S+?)\s*;?\s*$", re.IGNORECASE)
+
+
+class StubCursor:
+    def __init__(self, session):
+        self._session = session
+        self._result = []
+        self._pending = []
+
+    def execute(self, sql, num_statements=None, **kwargs):
+        if num_statements and num_statements > 1:
+            self._result, *self._pending = self._session.respond_batch(sql, num_statements)
+        else:
+            self._result, self._pending = self._session.respond(sql), []
+        # Like the connector, take the session's role from the response
+        for statement in sql.split(";\n"):
+            match = USE_ROLE.match(statement)
+            if match:
+                self._session.role = match.group(1).upper()
+        return self
+
+    def nextset(self):
+        if not self._pending:
+            return None
+        self._result = self._pending.pop(0)
+        return self
+
+    def fetchall(self):
+        return self._result
+
+
+class StubSession:
+    """
+    A stand-in for a Snowflake connection. Every statement is recorded in `queries` and answered by
+    `handler(sql)`, which should return a list of row dicts. `latency` simulates a per-query round trip.
+    """
+
+    def __init__(self, handler=None, latency: float = 0.0, user: str = "STUB_USER", role: str = "STUB_ROLE"):
+        self.handler = handler or (lambda sql: [])
+        self.latency = latency
+        self.user = user
+        self.role = role
+        self.queries = []
+        self._lock = threading.Lock()
+
+    def cursor(self, *args, **kwargs):
+        return StubCursor(self)
+
+    def respond(self, sql):
+        with self._lock:
+            self.queries.append(sql)
+        if self.latency:
+            time.sleep(self.latency)
+        return self.handler(sql)
+
+    def respond_batch(self, sql, num_statements):
+        """A multi-statement request is one round trip, the handler still answers each statement"""
+        statements = sql.split(";\n")
+        assert len(statements) == num_statements
+        with self._lock:
+            self.queries.append(sql)
+        if self.latency:
+            time.sleep(self.latency)
+        return [self.handler(statement) for statement in statements]
+
+
+SESSION_CTX_ROW = {
+    "ACCOUNT_LOCATOR": "ABCD123",
+    "ACCOUNT": "SOMEACCT",
+    "AVAILABLE_ROLES": '["SYSADMIN"]',
+    "DATABASE": None,
+    "RELEASE_BUNDLE_2024_01": "ENABLED",
+    "ROLE": "SYSADMIN",
+    "SCHEMAS": "[]",
+    "SECONDARY_ROLES": "[]",
+    "USER": "STUB_USER",
+    "VERSION": "8.0.0",
+    "WAREHOUSE": None,
+}
+
+
+def with_session_ctx(handler, **overrides):
+    """Wrap a StubSession handler so that it also answers the query behind data_provider.fetch_session"""
+
+    def _handler(sql):
+        if "CURRENT_ACCOUNT_NAME()" in sql:
+            return [SESSION_CTX_ROW | overrides]
+        return handler(sql)
+
+    return _handler
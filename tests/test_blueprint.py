@@ -1,13 +1,37 @@
+import io
+import os
+import re
+import tempfile
 import unittest
+from contextlib import redirect_stdout
+from unittest import mock
 
 from titan import (
     Blueprint,
     Database,
     PythonUDF,
+    Role,
     Schema,
     Table,
     View,
+    Warehouse,
 )
+from snowflake.connector.errors import ProgrammingError
+
+from titan import data_provider
+from titan.blueprint import _fetch_remote_state, _plan_dependencies, _run_dag
+from titan.client import ConnectionPool
+from titan.state import StateStore
+from tests.helpers import StubSession, with_session_ctx
+
+SESSION_CTX = {"account": "SOMEACCT", "account_locator": "ABCD123"}
+
+
+def _show_roles_handler(sql):
+    match = re.match(r"SHOW ROLES LIKE '(\w+)'", sql)
+    if match and int(match.group(1).split("_")[1]) % 2 == 0:
+        return [{"name": match.group(1), "comment": "", "owner": "SYSADMIN"}]
+    return []
 
 
 class TestBlueprint(unittest.TestCase):
@@ -123,3 +147,266 @@ class TestBlueprint(unittest.TestCase):
                 "volatility": None,
             },
         )
+
+    def test_fetch_remote_state_concurrent(self):
+        roles = [Role(name=f"ROLE_{i}") for i in range(20)]
+        manifest = Blueprint(name="blueprint", resources=roles).generate_manifest(SESSION_CTX)
+
+        serial = _fetch_remote_state(StubSession(with_session_ctx(_show_roles_handler)), manifest)
+        session = StubSession(with_session_ctx(_show_roles_handler), latency=0.01)
+        concurrent = _fetch_remote_state(session, manifest, max_workers=8)
+
+        self.assertEqual(len([sql for sql in session.queries if sql.startswith("SHOW ROLES")]), 20)
+        self.assertEqual(len(concurrent), 11)  # 10 roles + the account
+        self.assertEqual(list(concurrent.items()), list(serial.items()))
+
+    def test_plan_with_state_store(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "state.jsonl")
+            roles = [Role(name=f"ROLE_{i}") for i in range(4)]
+            session = StubSession(with_session_ctx(_show_roles_handler))
+            first = Blueprint(name="blueprint", resources=roles, state_store=StateStore(path)).plan(session)
+            self.assertTrue(any(sql.startswith("SHOW ROLES") for sql in session.queries))
+
+            session = StubSession(with_session_ctx(_show_roles_handler))
+            roles = [Role(name=f"ROLE_{i}") for i in range(4)]
+            second = Blueprint(name="blueprint", resources=roles, state_store=StateStore(path)).plan(session)
+            self.assertFalse(any(sql.startswith("SHOW ROLES") for sql in session.queries))
+            self.assertEqual(second, first)
+
+            session = StubSession(with_session_ctx(_show_roles_handler))
+            roles = [Role(name=f"ROLE_{i}", comment="changed" if i == 0 else None) for i in range(4)]
+            Blueprint(name="blueprint", resources=roles, state_store=StateStore(path)).plan(session)
+            shows = [sql for sql in session.queries if sql.startswith("SHOW ROLES")]
+            self.assertEqual(len(shows), 1)
+
+    def test_plan_refetches_only_changed_objects(self):
+        updated_on = {f"WH_{i}": "2024-01-01" for i in range(5)}
+
+        def _handler(sql):
+            if sql == "SHOW WAREHOUSES":
+                return [
+                    {
+                        "name": name,
+                        "owner": "SYSADMIN",
+                        "type": "STANDARD",
+                        "size": "X-Small",
+                        "auto_suspend": 600,
+                        "auto_resume": "true",
+                        "comment": "",
+                        "created_on": "2023-01-01",
+                        "updated_on": updated_on[name],
+                    }
+                    for name in updated_on
+                ]
+            if sql.startswith("SHOW PARAMETERS"):
+                return [
+                    {"key": key, "value": "0", "type": "NUMBER"}
+                    for key in [
+                        "MAX_CONCURRENCY_LEVEL",
+                        "STATEMENT_QUEUED_TIMEOUT_IN_SECONDS",
+                        "STATEMENT_TIMEOUT_IN_SECONDS",
+                    ]
+                ]
+            return []
+
+        def _plan(path):
+            session = StubSession(with_session_ctx(_handler))
+            warehouses = [Warehouse(name=name) for name in updated_on]
+            store = StateStore(path, track_changes=True)
+            with mock.patch.object(data_provider, "fetch_warehouse", wraps=data_provider.fetch_warehouse) as fetch:
+                Blueprint(name="blueprint", resources=warehouses, state_store=store).plan(session)
+            self.assertEqual(session.queries.count("SHOW WAREHOUSES"), 1)
+            return [str(call.args[1]) for call in fetch.call_args_list]
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "state.jsonl")
+            self.assertEqual(len(_plan(path)), 5)
+            self.assertEqual(_plan(path), [])
+            updated_on["WH_3"] = "2024-02-01"
+            self.assertEqual(_plan(path), ["WH_3"])
+
+    def test_plan_skips_unchanged_databases(self):
+        last_altered = {"DB_0": "2024-01-01", "DB_1": "2024-01-01"}
+
+        def _handler(sql):
+            match = re.search(r"FROM (\w+)\.information_schema\.databases", sql)
+            if match:
+                return [
+                    {
+                        "KIND": "DATABASE",
+                        "OBJECT_SCHEMA": None,
+                        "OBJECT_NAME": match.group(1),
+                        "CREATED": "2023-01-01",
+                        "LAST_ALTERED": last_altered[match.group(1)],
+                    }
+                ]
+            return []
+
+        def _plan(path, comment=None):
+            session = StubSession(with_session_ctx(_handler))
+            resources = []
+            for name in last_altered:
+                db, sch = Database(name=name), Schema(name="SCH")
+                tbl = Table(name="T", columns=[{"name": "ID", "data_type": "INT"}], comment=comment)
+                db.add(sch)
+                sch.add(tbl)
+                resources.extend([db, sch, tbl])
+            store = StateStore(path, track_changes=True)
+            blueprint = Blueprint(name="blueprint", resources=resources, state_store=store)
+            manifest = blueprint.generate_manifest(data_provider.fetch_session(session))
+            with mock.patch.object(data_provider, "fetch_resource", side_effect=lambda _, urn: manifest[str(urn)]):
+                with mock.patch("titan.blueprint._fetch_remote_state", wraps=_fetch_remote_state) as fetch:
+                    self.assertEqual(blueprint.plan(session), [])
+            return [urn_str for urn_str in fetch.call_args.args[1]["_urns"] if "account/" not in urn_str]
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "state.jsonl")
+            self.assertEqual(len(_plan(path)), 6)
+            self.assertEqual(_plan(path), [])
+            last_altered["DB_1"] = "2024-02-01"
+            self.assertEqual(
+                _plan(path),
+                ["urn::ABCD123:database/DB_1", "urn::ABCD123:schema/DB_1.SCH", "urn::ABCD123:table/DB_1.SCH.T"],
+            )
+            self.assertEqual(len(_plan(path, comment="changed")), 6)
+
+    def test_plan_reports_queries(self):
+        session = StubSession(with_session_ctx(_show_roles_handler))
+        blueprint = Blueprint(name="blueprint", resources=[Role(name="ROLE_1")], report_queries=True)
+        blueprint.plan(session)
+        callers = {caller for row in blueprint.query_stats.report() for caller in row["callers"]}
+        self.assertIn("fetch_role", callers)
+        self.assertIn("fetch_session", callers)
+
+    def test_plan_prints_queries(self):
+        session = StubSession(with_session_ctx(_show_roles_handler))
+        blueprint = Blueprint(name="blueprint", resources=[Role(name="ROLE_1")], print_queries=True)
+        with redirect_stdout(io.StringIO()) as out:
+            blueprint.plan(session)
+        self.assertIn("> SHOW ROLES", out.getvalue())
+
+    def test_tags_set_outside_the_blueprint_plan_nothing(self):
+        def _handler(sql):
+            if sql.startswith("SHOW ROLES"):
+                return [{"name": "R", "comment": "", "owner": "SYSADMIN"}]
+            if sql == "SHOW TAGS IN ACCOUNT":
+                return [{"database_name": "GOV", "schema_name": "TAGS", "name": "OWNER"}]
+            if "tag_references" in sql:
+                return [
+                    {
+                        "TAG_DATABASE": "GOV",
+                        "TAG_SCHEMA": "TAGS",
+                        "TAG_NAME": "OWNER",
+                        "TAG_VALUE": "data",
+                        "OBJECT_DATABASE": "",
+                        "OBJECT_SCHEMA": "",
+                        "OBJECT_NAME": "R",
+                        "DOMAIN": "ROLE",
+                    }
+                ]
+            return []
+
+        session = StubSession(with_session_ctx(_handler))
+        blueprint = Blueprint(name="blueprint", resources=[Role(name="R")])
+        self.assertEqual(blueprint.plan(session), [])
+        blueprint.apply(session)
+        self.assertFalse(any(sql.startswith("ALTER") for sql in session.queries))
+
+    def test_plan_dependencies(self):
+        urns = ["urn::ABCD123:database/DB", "urn::ABCD123:role/R", "urn::ABCD123:table/DB.SCH.T"]
+        refs = [
+            ("urn::ABCD123:table/DB.SCH.T", "urn::ABCD123:schema/DB.SCH"),
+            ("urn::ABCD123:schema/DB.SCH", "urn::ABCD123:database/DB"),
+        ]
+        self.assertEqual(
+            _plan_dependencies(urns, refs),
+            {
+                "urn::ABCD123:database/DB": set(),
+                "urn::ABCD123:role/R": set(),
+                "urn::ABCD123:table/DB.SCH.T": {"urn::ABCD123:database/DB"},
+            },
+        )
+
+    def test_run_dag_skips_dependents_of_failures(self):
+        ran = []
+
+        def _fn(node):
+            ran.append(node)
+            if node == "A":
+                raise RuntimeError("A failed")
+
+        dependencies = {"A": set(), "B": {"A"}, "C": {"B"}, "D": set()}
+        with self.assertRaises(RuntimeError) as ctx:
+            _run_dag(_fn, dependencies, max_workers=4)
+        self.assertEqual(sorted(ran), ["A", "D"])
+        self.assertEqual(ctx.exception.skipped, ["B", "C"])
+
+    def test_run_dag_starts_nothing_after_a_failure(self):
+        ran = []
+
+        def _fn(node):
+            ran.append(node)
+            if node == "A":
+                raise RuntimeError("A failed")
+
+        with self.assertRaises(RuntimeError):
+            _run_dag(_fn, {"A": set(), "B": set(), "C": set()}, max_workers=1)
+        self.assertEqual(ran, ["A"])
+
+    def test_apply_concurrently(self):
+        db = Database(name="DB")
+        schema = Schema(name="SCH", database=db)
+        roles = [Role(name=f"ROLE_{i}") for i in range(10)]
+        session = StubSession(with_session_ctx(lambda sql: []), latency=0.005)
+        blueprint = Blueprint(name="blueprint", resources=[db, schema, *roles], max_apply_workers=4)
+        blueprint.apply(session)
+
+        creates = [sql for sql in session.queries if sql.startswith("CREATE")]
+        self.assertEqual(len(creates), 12)
+        create_order = [sql.split(" ")[2] for sql in creates]
+        self.assertLess(create_order.index("DB"), create_order.index("DB.SCH"))
+
+    def test_apply_concurrently_through_pool(self):
+        sessions = []
+
+        def _factory():
+            sessions.append(StubSession(with_session_ctx(lambda sql: []), latency=0.005))
+            return sessions[-1]
+
+        roles = [Role(name=f"ROLE_{i}") for i in range(8)]
+        blueprint = Blueprint(name="blueprint", resources=roles, max_apply_workers=4)
+        blueprint.apply(ConnectionPool(_factory, max_size=4))
+
+        creates = [sql for session in sessions for sql in session.queries if sql.startswith("CREATE")]
+        self.assertEqual(len(creates), 8)
+        self.assertGreater(len(sessions), 1)
+        self.assertLessEqual(len(sessions), 4)
+
+    def test_apply_batches_statements(self):
+        db = Database(name="DB")
+        roles = [Role(name=f"ROLE_{i}") for i in range(6)]
+        session = StubSession(with_session_ctx(lambda sql: []))
+        blueprint = Blueprint(name="blueprint", resources=[db, *roles], batch_statements=True)
+        actions = blueprint.apply(session)
+
+        self.assertEqual(len(actions), 7)
+        batches = [sql for sql in session.queries if sql.startswith("CREATE")]
+        self.assertEqual(len(batches), 1)
+        self.assertEqual(batches[0].split(";\n"), [str(sql) for sql in actions])
+
+    def test_apply_concurrently_stops_dependents(self):
+        def _handler(sql):
+            if sql.startswith("CREATE DATABASE"):
+                raise ProgrammingError("boom")
+            return []
+
+        db = Database(name="DB")
+        schema = Schema(name="SCH", database=db)
+        session = StubSession(with_session_ctx(_handler))
+        blueprint = Blueprint(name="blueprint", resources=[db, schema, Role(name="R")], max_apply_workers=4)
+        with self.assertRaises(ProgrammingError) as ctx:
+            blueprint.apply(session)
+        self.assertEqual(ctx.exception.skipped, ["urn::ABCD123:schema/DB.SCH"])
+        self.assertIn("CREATE ROLE R", session.queries)
+        self.assertFalse(any(sql.startswith("CREATE SCHEMA") for sql in session.queries))
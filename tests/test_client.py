@@ -0,0 +1,299 @@
+import threading
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from snowflake.connector.errors import ProgrammingError
+
+from titan import data_provider
+from titan.client import (
+    ConnectionPool,
+    QueryStats,
+    ResultCache,
+    _normalize_sql,
+    _object_type_for_sql,
+    _cursor_for,
+    current_role,
+    _percentile,
+    _query_fingerprint,
+    _query_hooks,
+    execute,
+    execute_batch,
+    invalidate_cache,
+    query_caller,
+    query_hook,
+    result_cache,
+)
+from titan.enums import ResourceType
+from titan.identifiers import FQN
+from tests.helpers import StubSession
+
+USER_FIELDS = [
+    "login_name",
+    "display_name",
+    "first_name",
+    "last_name",
+    "email",
+    "mins_to_unlock",
+    "days_to_expiry",
+    "comment",
+    "disabled",
+    "must_change_password",
+    "default_warehouse",
+    "default_namespace",
+    "default_role",
+    "default_secondary_roles",
+    "mins_to_bypass_mfa",
+]
+
+
+def _user_row(name):
+    row = {field: None for field in USER_FIELDS}
+    row.update({"name": name, "owner": "USERADMIN", "disabled": "false", "must_change_password": "false"})
+    return row
+
+
+@pytest.fixture
+def users_session():
+    users = [_user_row(f"USER_{i}") for i in range(5)]
+    return StubSession(lambda sql: users if sql == "SHOW USERS" else [])
+
+
+@pytest.mark.parametrize(
+    "sql, resource_type",
+    [
+        ("SHOW USERS", ResourceType.USER),
+        ("SHOW USER FUNCTIONS IN ACCOUNT", ResourceType.FUNCTION),
+        ("SHOW ROLES LIKE 'FOO'", ResourceType.ROLE),
+        ("SHOW DATABASES LIKE 'FOO'", ResourceType.DATABASE),
+        ("SHOW TERSE DYNAMIC TABLES IN ACCOUNT", ResourceType.DYNAMIC_TABLE),
+        ("SHOW PASSWORD POLICIES IN SCHEMA DB.SCH", ResourceType.PASSWORD_POLICY),
+        ("SHOW GRANTS OF ROLE FOO", ResourceType.ROLE_GRANT),
+        ("DESC FUNCTION FOO(VARCHAR)", ResourceType.FUNCTION),
+        ("SELECT SYSTEM$SHOW_IMPORTED_DATABASES()", None),
+    ],
+)
+def test_object_type_for_sql(sql, resource_type):
+    assert _object_type_for_sql(sql) == resource_type
+
+
+def test_normalize_sql_preserves_literals():
+    assert _normalize_sql("SHOW   ROLES\n LIKE 'A  B';") == "SHOW ROLES LIKE 'A  B'"
+
+
+def test_fetch_user_issues_show_users_once(users_session):
+    for i in range(5):
+        assert data_provider.fetch_user(users_session, FQN(name=f"USER_{i}"))["name"] == f"USER_{i}"
+    assert users_session.queries.count("SHOW USERS") == 1
+    assert result_cache(users_session).stats() == {"hits": 4, "misses": 1, "entries": 1}
+
+
+def test_cache_is_keyed_by_role(users_session):
+    execute(users_session, "SHOW USERS", cacheable=True)
+    execute(users_session, "SHOW USERS", use_role="SECURITYADMIN", cacheable=True)
+    assert users_session.queries == ["SHOW USERS", "USE ROLE SECURITYADMIN", "SHOW USERS"]
+
+
+def test_invalidate_by_object_type(users_session):
+    execute(users_session, "SHOW USERS", cacheable=True)
+    execute(users_session, "SHOW ROLES", cacheable=True)
+    invalidate_cache(users_session, ResourceType.ROLE)
+    execute(users_session, "SHOW USERS", cacheable=True)
+    execute(users_session, "SHOW ROLES", cacheable=True)
+    assert users_session.queries == ["SHOW USERS", "SHOW ROLES", "SHOW ROLES"]
+
+
+def test_ttl_and_size_eviction():
+    cache = ResultCache(ttl=60, max_entries=2)
+    for sql in ["SHOW USERS", "SHOW ROLES", "SHOW WAREHOUSES"]:
+        cache.get_or_execute(None, sql, lambda: [])
+    assert len(cache) == 2
+    cache.get_or_execute(None, "SHOW USERS", lambda: [])
+    assert cache.stats()["misses"] == 4
+
+    expired = ResultCache(ttl=-1)
+    expired.get_or_execute(None, "SHOW USERS", lambda: [])
+    expired.get_or_execute(None, "SHOW USERS", lambda: [])
+    assert expired.stats()["misses"] == 2
+
+
+def test_query_fingerprint():
+    assert _query_fingerprint("SHOW ROLES LIKE 'ANALYST'") == "SHOW ROLES LIKE ?"
+    assert _query_fingerprint("ALTER WAREHOUSE WH SET AUTO_SUSPEND = 60") == "ALTER WAREHOUSE WH SET AUTO_SUSPEND = ?"
+    assert _query_fingerprint("SHOW  GRANTS   TO ROLE R1;") == "SHOW GRANTS TO ROLE R1"
+
+
+def test_query_hook_records(users_session):
+    records = []
+    with query_hook(records.append):
+        data_provider.fetch_user(users_session, FQN(name="USER_1"))
+        with query_caller("lifecycle.create_resource"):
+            execute(users_session, "CREATE ROLE R", use_role="SECURITYADMIN")
+    execute(users_session, "SHOW USERS")
+
+    assert [r.sql for r in records] == ["SHOW USERS", "USE ROLE SECURITYADMIN", "CREATE ROLE R"]
+    assert records[0].caller == "fetch_user"
+    assert records[0].rows == 5
+    assert records[0].role == "STUB_ROLE"
+    assert records[2].caller == "lifecycle.create_resource"
+    assert records[2].role == "SECURITYADMIN"
+
+
+def test_query_hook_records_errors():
+    def _handler(sql):
+        raise ProgrammingError("boom", errno=2003)
+
+    records = []
+    with query_hook(records.append), pytest.raises(ProgrammingError):
+        execute(StubSession(_handler), "SHOW ROLES LIKE 'R'")
+    assert records[0].error_code == 2003
+    assert records[0].rows is None
+
+
+def test_no_query_hooks_by_default(capsys):
+    assert _query_hooks == []
+    execute(StubSession(), "SHOW ROLES")
+    assert capsys.readouterr().out == ""
+
+
+def test_query_stats():
+    stats = QueryStats()
+    session = StubSession()
+    with query_hook(stats):
+        for i in range(10):
+            execute(session, f"SHOW ROLES LIKE 'ROLE_{i}'")
+        execute(session, "SHOW USERS")
+    report = {row["fingerprint"]: row for row in stats.report()}
+    assert len(stats) == 11
+    assert report["SHOW ROLES LIKE ?"]["count"] == 10
+    assert report["SHOW USERS"]["count"] == 1
+    assert report["SHOW USERS"]["callers"] == [__name__ + ".test_query_stats"]
+
+
+def test_percentile():
+    values = sorted(float(i) for i in range(1, 101))
+    assert _percentile(values, 50) == 50.0
+    assert _percentile(values, 95) == 95.0
+    assert _percentile(values, 99) == 99.0
+    assert _percentile([0.5], 99) == 0.5
+    assert _percentile([], 50) == 0.0
+
+
+def _pool(handler=None, latency=0.0, **kwargs):
+    sessions = []
+
+    def _factory():
+        session = StubSession(handler, latency=latency, role="SYSADMIN")
+        sessions.append(session)
+        return session
+
+    return ConnectionPool(_factory, **kwargs), sessions
+
+
+def test_connection_pool_is_bounded():
+    pool, sessions = _pool(latency=0.01, max_size=2)
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(lambda i: execute(pool, f"SHOW ROLES LIKE 'R{i}'"), range(16)))
+    assert len(sessions) == 2
+    assert len(pool) == 2
+    assert sum(len(session.queries) for session in sessions) == 16
+
+
+def test_connection_pool_pins_roles():
+    pool, sessions = _pool(max_size=2)
+    execute(pool, "CREATE ROLE A", use_role="SECURITYADMIN")
+    execute(pool, "CREATE ROLE B", use_role="SECURITYADMIN")
+    execute(pool, "SHOW ROLES")
+    execute(pool, "CREATE ROLE C", use_role="SECURITYADMIN")
+    queries = [sql for session in sessions for sql in session.queries]
+    assert queries.count("USE ROLE SECURITYADMIN") == 1
+    assert len(sessions) == 2
+    assert sessions[1].queries == ["SHOW ROLES"]
+
+
+def test_connection_pool_replaces_unhealthy_connections():
+    broken = threading.Event()
+
+    def _handler(sql):
+        if sql == "SELECT 1" and broken.is_set():
+            raise ProgrammingError("connection lost")
+        return []
+
+    pool, sessions = _pool(_handler, health_check_interval=0)
+    execute(pool, "SHOW ROLES")
+    broken.set()
+    execute(pool, "SHOW USERS")
+    assert len(sessions) == 2
+    assert sessions[1].queries == ["SHOW USERS"]
+    assert len(pool) == 1
+
+
+def test_connection_pool_shares_result_cache(users_session):
+    pool, sessions = _pool(lambda sql: users_session.handler(sql), max_size=4)
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        list(executor.map(lambda i: data_provider.fetch_user(pool, FQN(name=f"USER_{i}")), range(5)))
+    queries = [sql for session in sessions for sql in session.queries]
+    assert queries.count("SHOW USERS") == 1
+
+
+def test_cursor_reuse():
+    session = StubSession()
+    assert _cursor_for(session) is _cursor_for(session)
+    other_thread = ThreadPoolExecutor(max_workers=1).submit(_cursor_for, session).result()
+    assert other_thread is not _cursor_for(session)
+
+
+def test_use_role_skipped_when_already_in_role():
+    session = StubSession()
+    execute(session, "CREATE ROLE A", use_role="SECURITYADMIN")
+    execute(session, "CREATE ROLE B", use_role="SECURITYADMIN")
+    execute(session, "CREATE DATABASE DB", use_role="SYSADMIN")
+    execute(session, "USE ROLE SECURITYADMIN")
+    execute(session, "CREATE ROLE C", use_role="SECURITYADMIN")
+    assert session.queries == [
+        "USE ROLE SECURITYADMIN",
+        "CREATE ROLE A",
+        "CREATE ROLE B",
+        "USE ROLE SYSADMIN",
+        "CREATE DATABASE DB",
+        "USE ROLE SECURITYADMIN",
+        "CREATE ROLE C",
+    ]
+    assert current_role(session) == "SECURITYADMIN"
+
+
+def test_role_follows_connection():
+    def _handler(sql):
+        if sql == "USE ROLE MISSING":
+            raise ProgrammingError("no such role", errno=2003)
+        return []
+
+    session = StubSession(_handler)
+    execute(session, "SELECT 1", use_role="SYSADMIN")
+    with pytest.raises(ProgrammingError):
+        execute(session, "SELECT 1", use_role="MISSING")
+    assert current_role(session) == "SYSADMIN"
+
+    # A role change made outside titan is picked up from the connection
+    session.cursor().execute("USE ROLE PUBLIC")
+    execute(session, "SELECT 2", use_role="sysadmin")
+    assert session.queries[-2:] == ["USE ROLE sysadmin", "SELECT 2"]
+
+
+def test_role_switches_are_serialized_on_a_shared_connection():
+    session = StubSession(lambda sql: [{"role": session.role}], latency=0.001)
+
+    def _run(role):
+        return [execute(session, f"SELECT '{role}'", use_role=role)[0]["role"] for _ in range(20)]
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        results = list(executor.map(_run, ["SYSADMIN", "SECURITYADMIN"]))
+    assert results == [["SYSADMIN"] * 20, ["SECURITYADMIN"] * 20]
+
+
+def test_execute_batch():
+    session = StubSession(lambda sql: [{"sql": sql}])
+    results = execute_batch(session, ["CREATE ROLE A", "CREATE ROLE B", "CREATE ROLE C"], use_role="SECURITYADMIN")
+    assert results == [[{"sql": "CREATE ROLE A"}], [{"sql": "CREATE ROLE B"}], [{"sql": "CREATE ROLE C"}]]
+    assert session.queries == ["USE ROLE SECURITYADMIN", "CREATE ROLE A;\nCREATE ROLE B;\nCREATE ROLE C"]
@@ -0,0 +1,498 @@
+import re
+
+from snowflake.connector.errors import ProgrammingError
+
+from titan import data_provider
+from titan.enums import ResourceType
+from titan.identifiers import FQN, URN
+from tests.helpers import StubSession, with_session_ctx
+
+
+def _warehouse_row(name):
+    return {
+        "name": name,
+        "owner": "SYSADMIN",
+        "type": "STANDARD",
+        "size": "X-Small",
+        "auto_suspend": 600,
+        "auto_resume": "true",
+        "comment": "",
+        "enable_query_acceleration": "false",
+    }
+
+
+WAREHOUSE_PARAMS = [
+    {"key": "MAX_CONCURRENCY_LEVEL", "value": "8", "type": "NUMBER"},
+    {"key": "STATEMENT_QUEUED_TIMEOUT_IN_SECONDS", "value": "0", "type": "NUMBER"},
+    {"key": "STATEMENT_TIMEOUT_IN_SECONDS", "value": "172800", "type": "NUMBER"},
+]
+
+
+SCHEMA_PARAMS = [
+    {"key": "MAX_DATA_EXTENSION_TIME_IN_DAYS", "value": "14", "type": "NUMBER"},
+    {"key": "DEFAULT_DDL_COLLATION", "value": "", "type": "STRING"},
+]
+
+
+def _account_handler(sql):
+    if sql == "SHOW WAREHOUSES":
+        return [_warehouse_row(f"WH_{i}") for i in range(3)]
+    if sql == "SHOW WAREHOUSES LIKE 'WH_0'":
+        return [_warehouse_row("WH_0")]
+    if sql.startswith("SHOW PARAMETERS FOR WAREHOUSE"):
+        return WAREHOUSE_PARAMS
+    if sql.startswith("SHOW PARAMETERS IN SCHEMA"):
+        return SCHEMA_PARAMS
+    if sql.startswith("SHOW SCHEMAS IN DATABASE"):
+        database = sql.split()[-1].upper()
+        if database not in ("DB", "OTHER_DB"):
+            raise ProgrammingError(f"Database '{database}' does not exist or not authorized.", errno=2003)
+        return [
+            {
+                "database_name": database,
+                "name": "SCH",
+                "options": "",
+                "owner": "SYSADMIN",
+                "retention_time": "1",
+                "comment": "",
+            }
+        ]
+    return []
+
+
+def test_snapshot_serves_fetches_from_one_show():
+    session = StubSession(with_session_ctx(_account_handler))
+    with data_provider.snapshot(session):
+        warehouses = [data_provider.fetch_warehouse(session, FQN(name=f"WH_{i}")) for i in range(3)]
+        assert data_provider.fetch_warehouse(session, FQN(name="MISSING")) is None
+    assert [wh["name"] for wh in warehouses] == ["WH_0", "WH_1", "WH_2"]
+    assert session.queries.count("SHOW WAREHOUSES") == 1
+    assert not any(sql.startswith("SHOW WAREHOUSES LIKE") for sql in session.queries)
+
+
+def test_snapshot_matches_like_semantics():
+    session = StubSession(with_session_ctx(_account_handler))
+    with data_provider.snapshot(session) as snap:
+        assert len(snap.show_rows(data_provider.ResourceType.SCHEMA, FQN(database="db", name='"sch"'))) == 1
+        assert snap.show_rows(data_provider.ResourceType.SCHEMA, FQN(database="DB", name="NOPE")) == []
+
+
+def test_snapshot_lists_schemas_per_database():
+    session = StubSession(with_session_ctx(_account_handler))
+    with data_provider.snapshot(session):
+        data_provider.fetch_schema(session, FQN(database="DB", name="SCH"))
+        data_provider.fetch_schema(session, FQN(database="DB", name="MISSING"))
+        assert data_provider.fetch_schema(session, FQN(database="NOPE", name="SCH")) is None
+    assert session.queries.count("SHOW SCHEMAS IN DATABASE DB") == 1
+    assert "SHOW SCHEMAS IN DATABASE OTHER_DB" not in session.queries
+    # The listing of a database that can't be shown doesn't answer for its schemas
+    assert "SHOW SCHEMAS LIKE 'SCH' IN DATABASE NOPE" in session.queries
+
+
+def test_snapshot_confirms_misses_in_capped_listing():
+    def _handler(sql):
+        if sql == "SHOW WAREHOUSES":
+            return [_warehouse_row(f"WH_{i}") for i in range(data_provider.SHOW_ROW_LIMIT)]
+        if sql == "SHOW WAREHOUSES LIKE 'WH_LAST'":
+            return [_warehouse_row("WH_LAST")]
+        return _account_handler(sql)
+
+    session = StubSession(with_session_ctx(_handler))
+    with data_provider.snapshot(session):
+        assert data_provider.fetch_warehouse(session, FQN(name="WH_7"))["name"] == "WH_7"
+        assert data_provider.fetch_warehouse(session, FQN(name="WH_LAST"))["name"] == "WH_LAST"
+        assert data_provider.fetch_warehouse(session, FQN(name="MISSING")) is None
+    assert "SHOW WAREHOUSES LIKE 'WH_7'" not in session.queries
+    assert session.queries.count("SHOW WAREHOUSES LIKE 'WH_LAST'") == 1
+    assert "SHOW WAREHOUSES LIKE 'MISSING'" in session.queries
+
+
+def _expect(session, resource_type, fqns):
+    data_provider.expect(session, [URN(resource_type, fqn, "ABCD123") for fqn in fqns])
+
+
+def test_snapshot_batches_show_parameters():
+    session = StubSession(with_session_ctx(_account_handler))
+    with data_provider.snapshot(session):
+        _expect(session, ResourceType.WAREHOUSE, [FQN(name=f"WH_{i}") for i in range(3)])
+        _expect(session, ResourceType.SCHEMA, [FQN(database="DB", name="SCH"), FQN(database="OTHER_DB", name="SCH")])
+        warehouses = [data_provider.fetch_warehouse(session, FQN(name=f"WH_{i}")) for i in range(3)]
+        schema = data_provider.fetch_schema(session, FQN(database="DB", name="SCH"))
+    assert [wh["max_concurrency_level"] for wh in warehouses] == [8, 8, 8]
+    assert schema["max_data_extension_time_in_days"] == 14
+    assert (
+        session.queries.count(
+            'SHOW PARAMETERS FOR WAREHOUSE "WH_0";\n'
+            'SHOW PARAMETERS FOR WAREHOUSE "WH_1";\n'
+            'SHOW PARAMETERS FOR WAREHOUSE "WH_2"'
+        )
+        == 1
+    )
+    # Only schemas in DB are included, a single statement isn't sent as a batch
+    assert 'SHOW PARAMETERS IN SCHEMA "DB"."SCH"' in session.queries
+    assert not any("PARAMETERS" in sql and "OTHER_DB" in sql for sql in session.queries)
+
+
+def test_snapshot_reads_parameters_only_for_expected_objects():
+    def _handler(sql):
+        if sql == "SHOW WAREHOUSES":
+            return [_warehouse_row(name) for name in ("WH_0", "my-wh", "Mixed")]
+        return _account_handler(sql)
+
+    session = StubSession(with_session_ctx(_handler))
+    with data_provider.snapshot(session):
+        _expect(session, ResourceType.WAREHOUSE, [FQN(name='"my-wh"'), FQN(name='"Mixed"'), FQN(name="NEW_WH")])
+        for name in ('"my-wh"', '"Mixed"'):
+            assert data_provider.fetch_warehouse(session, FQN(name=name))["max_concurrency_level"] == 8
+    parameter_queries = [sql for sql in session.queries if sql.startswith("SHOW PARAMETERS")]
+    assert parameter_queries == ['SHOW PARAMETERS FOR WAREHOUSE "my-wh";\nSHOW PARAMETERS FOR WAREHOUSE "Mixed"']
+
+
+def test_failed_parameter_batch_falls_back_per_object():
+    def _handler(sql):
+        if sql == 'SHOW PARAMETERS FOR WAREHOUSE "WH_2"':
+            raise ProgrammingError("Warehouse does not exist or not authorized")
+        return _account_handler(sql)
+
+    session = StubSession(with_session_ctx(_handler))
+    with data_provider.snapshot(session):
+        _expect(session, ResourceType.WAREHOUSE, [FQN(name=f"WH_{i}") for i in range(3)])
+        warehouse = data_provider.fetch_warehouse(session, FQN(name="WH_1"))
+    assert warehouse["statement_timeout_in_seconds"] == 172800
+    assert "SHOW PARAMETERS FOR WAREHOUSE WH_1" in session.queries
+
+
+def test_fetch_without_snapshot_uses_show_like():
+    session = StubSession(with_session_ctx(_account_handler))
+    assert data_provider.fetch_warehouse(session, FQN(name="WH_0"))["name"] == "WH_0"
+    assert session.queries[0] == "SHOW WAREHOUSES LIKE 'WH_0'"
+
+
+def _grants_handler(sql):
+    if sql == "SHOW GRANTS TO ROLE ANALYST":
+        return [
+            {
+                "privilege": "USAGE",
+                "granted_on": "WAREHOUSE",
+                "name": f"WH_{i}",
+                "grantee_name": "ANALYST",
+                "grant_option": "false",
+                "granted_by": "SYSADMIN",
+            }
+            for i in range(50)
+        ]
+    return []
+
+
+def test_grant_graph_shares_show_grants():
+    session = StubSession(with_session_ctx(_grants_handler))
+    with data_provider.snapshot(session):
+        for i in range(50):
+            grants = data_provider.fetch_grant(
+                session, FQN(name="ANALYST", params={"type": "WAREHOUSE", "on": f"WH_{i}"})
+            )
+            assert grants[0]["on"] == f"WH_{i}"
+        role_grants = data_provider.fetch_role_grants(session, "ANALYST")
+    assert len(role_grants) == 50
+    assert role_grants["urn::ABCD123:warehouse/WH_7"] == [{"priv": "USAGE", "grant_option": False, "owner": "SYSADMIN"}]
+    assert session.queries.count("SHOW GRANTS TO ROLE ANALYST") == 1
+
+
+def _column_row(schema, table, name, position, data_type="TEXT", **overrides):
+    row = {
+        "TABLE_SCHEMA": schema,
+        "TABLE_NAME": table,
+        "COLUMN_NAME": name,
+        "ORDINAL_POSITION": position,
+        "DATA_TYPE": data_type,
+        "IS_NULLABLE": "YES",
+        "COLUMN_DEFAULT": None,
+        "IS_IDENTITY": "NO",
+        "COMMENT": None,
+        "CHARACTER_MAXIMUM_LENGTH": 16777216,
+        "NUMERIC_PRECISION": 38,
+        "NUMERIC_SCALE": 0,
+        "DATETIME_PRECISION": 9,
+    }
+    row.update(overrides)
+    return row
+
+
+def _tables_handler(sql):
+    if sql == "SHOW TABLES IN SCHEMA DB.SCH":
+        return [
+            {
+                "database_name": "DB",
+                "schema_name": "SCH",
+                "name": f"T_{i}",
+                "kind": "TABLE",
+                "owner": "SYSADMIN",
+                "comment": "",
+                "cluster_by": "",
+            }
+            for i in range(20)
+        ]
+    if "information_schema.columns" in sql:
+        rows = []
+        for i in range(20):
+            rows.append(_column_row("SCH", f"T_{i}", "ID", 1, "NUMBER", IS_NULLABLE="NO"))
+            rows.append(_column_row("SCH", f"T_{i}", "CREATED_AT", 2, "TIMESTAMP_NTZ"))
+            rows.append(_column_row("SCH", f"T_{i}", "NAME", 3, COMMENT="a name"))
+        return rows
+    if sql.startswith("DESC"):
+        raise AssertionError(f"Unexpected {sql}")
+    return []
+
+
+def test_snapshot_fetches_table_columns_in_bulk():
+    session = StubSession(with_session_ctx(_tables_handler))
+    with data_provider.snapshot(session):
+        tables = [
+            data_provider.fetch_table(session, FQN(database="DB", schema="SCH", name=f"T_{i}")) for i in range(20)
+        ]
+    assert session.queries.count("SHOW TABLES IN SCHEMA DB.SCH") == 1
+    assert sum("information_schema.columns" in sql for sql in session.queries) == 1
+    assert tables[7]["columns"] == [
+        {"name": "ID", "data_type": "NUMBER(38,0)", "nullable": False},
+        {"name": "CREATED_AT", "data_type": "TIMESTAMP_NTZ(9)", "nullable": True},
+        {"name": "NAME", "data_type": "VARCHAR(16777216)", "nullable": True, "comment": "a name"},
+    ]
+
+
+def _desc_row(name, data_type, default=None, nullable="Y"):
+    return {"kind": "COLUMN", "name": name, "type": data_type, "null?": nullable, "default": default, "comment": None}
+
+
+# The same two tables as information_schema.columns and DESC report them
+COLUMN_ROWS = [
+    _column_row("SCH", "EVENTS", "ID", 1, "NUMBER", IS_NULLABLE="NO", COLUMN_DEFAULT="DB.SCH.SEQ.NEXTVAL"),
+    _column_row("SCH", "EVENTS", "AT", 2, "TIMESTAMP_NTZ", COLUMN_DEFAULT="CURRENT_TIMESTAMP()"),
+    _column_row("SCH", "EVENTS", "OK", 3, "BOOLEAN"),
+    _column_row("SCH", "COUNTERS", "ID", 1, "NUMBER", IS_NULLABLE="NO", IS_IDENTITY="YES"),
+    _column_row("SCH", "COUNTERS", "N", 2, "FLOAT"),
+]
+DESC_ROWS = {
+    "EVENTS": [
+        _desc_row("ID", "NUMBER(38,0)", "DB.SCH.SEQ.NEXTVAL", nullable="N"),
+        _desc_row("AT", "TIMESTAMP_NTZ(9)", "CURRENT_TIMESTAMP()"),
+        _desc_row("OK", "BOOLEAN"),
+    ],
+    "COUNTERS": [
+        _desc_row("ID", "NUMBER(38,0)", "IDENTITY START 1 INCREMENT 1 ORDER", nullable="N"),
+        _desc_row("N", "FLOAT"),
+    ],
+}
+
+
+def _columns_handler(sql):
+    if "information_schema.columns" in sql:
+        return COLUMN_ROWS + [
+            _column_row("SCH", "t", "LOWER_ONLY", 1),
+            _column_row("SCH", "T", "UPPER_ONLY", 1),
+        ]
+    if sql.startswith("DESC TABLE DB.SCH."):
+        return DESC_ROWS[sql.split(".")[-1]]
+    return []
+
+
+def test_bulk_columns_match_desc():
+    session = StubSession(with_session_ctx(_columns_handler))
+    for table in DESC_ROWS:
+        fqn = FQN(database="DB", schema="SCH", name=table)
+        desc_columns = data_provider.fetch_columns(session, "TABLE", fqn)
+        with data_provider.snapshot(session):
+            assert data_provider.fetch_columns(session, "TABLE", fqn) == desc_columns
+    # Identity columns can't be rebuilt from information_schema, their tables are described instead
+    assert session.queries.count("DESC TABLE DB.SCH.COUNTERS") == 2
+    assert session.queries.count("DESC TABLE DB.SCH.EVENTS") == 1
+
+
+def test_bulk_columns_keep_quoted_names_apart():
+    session = StubSession(with_session_ctx(_columns_handler))
+    with data_provider.snapshot(session):
+        columns = data_provider.fetch_columns(session, "TABLE", FQN(database="DB", schema="SCH", name="T"))
+    assert [column["name"] for column in columns] == ["UPPER_ONLY"]
+
+
+def test_snapshot_confirms_missing_tables_in_capped_listing():
+    def _handler(sql):
+        if sql == "SHOW TABLES IN SCHEMA DB.SCH":
+            return _tables_handler(sql) * (data_provider.SHOW_ROW_LIMIT // 20)
+        if sql == "SHOW TABLES LIKE 'LATE' IN SCHEMA DB.SCH":
+            return [
+                {
+                    "database_name": "DB",
+                    "schema_name": "SCH",
+                    "name": "LATE",
+                    "kind": "TABLE",
+                    "owner": "SYSADMIN",
+                    "comment": "",
+                    "cluster_by": "",
+                }
+            ]
+        if sql == "DESC TABLE DB.SCH.LATE":
+            return [
+                {"kind": "COLUMN", "name": "ID", "type": "NUMBER(38,0)", "null?": "Y", "default": None, "comment": None}
+            ]
+        return _tables_handler(sql)
+
+    session = StubSession(with_session_ctx(_handler))
+    with data_provider.snapshot(session):
+        late = data_provider.fetch_table(session, FQN(database="DB", schema="SCH", name="LATE"))
+        assert data_provider.fetch_table(session, FQN(database="DB", schema="SCH", name="MISSING")) is None
+    assert late["columns"] == [{"name": "ID", "data_type": "NUMBER(38,0)", "nullable": True}]
+    assert "SHOW TABLES LIKE 'MISSING' IN SCHEMA DB.SCH" in session.queries
+
+
+def test_snapshot_fetches_parameters_of_schemas_missing_from_capped_listing():
+    def _handler(sql):
+        if sql == "SHOW SCHEMAS IN DATABASE DB":
+            return [
+                {"database_name": "DB", "name": f"SCH_{i}", "options": "", "owner": "SYSADMIN"}
+                for i in range(data_provider.SHOW_ROW_LIMIT)
+            ]
+        if sql == "SHOW SCHEMAS LIKE 'LATE' IN DATABASE DB":
+            return [
+                {
+                    "database_name": "DB",
+                    "name": "LATE",
+                    "options": "",
+                    "owner": "SYSADMIN",
+                    "retention_time": "1",
+                    "comment": "",
+                }
+            ]
+        if sql.startswith("SHOW PARAMETERS IN SCHEMA DB.SCH_"):
+            return SCHEMA_PARAMS
+        if sql == "SHOW PARAMETERS IN SCHEMA DB.LATE":
+            return [{"key": "MAX_DATA_EXTENSION_TIME_IN_DAYS", "value": "7", "type": "NUMBER"}] + SCHEMA_PARAMS[1:]
+        return _account_handler(sql)
+
+    session = StubSession(with_session_ctx(_handler))
+    with data_provider.snapshot(session):
+        schema = data_provider.fetch_schema(session, FQN(database="DB", name="LATE"))
+    assert schema["max_data_extension_time_in_days"] == 7
+
+
+def test_fetch_table_without_snapshot_is_scoped_to_schema():
+    def _handler(sql):
+        if sql.startswith("SHOW TABLES"):
+            return [{"name": "T", "kind": "TABLE", "owner": "SYSADMIN", "comment": "", "cluster_by": ""}]
+        if sql == "DESC TABLE DB.SCH.T":
+            return [
+                {"kind": "COLUMN", "name": "ID", "type": "NUMBER(38,0)", "null?": "Y", "default": None, "comment": None}
+            ]
+        return []
+
+    session = StubSession(with_session_ctx(_handler))
+    table = data_provider.fetch_table(session, FQN(database="DB", schema="SCH", name="T"))
+    assert session.queries[:2] == ["SHOW TABLES LIKE 'T' IN SCHEMA DB.SCH", "DESC TABLE DB.SCH.T"]
+    assert table["columns"] == [{"name": "ID", "data_type": "NUMBER(38,0)", "nullable": True}]
+
+
+def _tag_ref(tag, value, domain, obj_database, obj_schema, obj_name):
+    tag_database, tag_schema, tag_name = tag.split(".")
+    return {
+        "TAG_DATABASE": tag_database,
+        "TAG_SCHEMA": tag_schema,
+        "TAG_NAME": tag_name,
+        "TAG_VALUE": value,
+        "OBJECT_DATABASE": obj_database,
+        "OBJECT_SCHEMA": obj_schema,
+        "OBJECT_NAME": obj_name,
+        "DOMAIN": domain,
+    }
+
+
+TAG_REFS = [
+    _tag_ref("DB.PUBLIC.COST_CENTER", "eng", "SCHEMA", "DB", "", "SCH"),
+    _tag_ref("GOV.TAGS.PII", "true", "SCHEMA", "DB", "", "SCH"),
+    _tag_ref("GOV.TAGS.PII", "false", "SCHEMA", "OTHER_DB", "", "SCH"),
+    _tag_ref("GOV.TAGS.OWNER", "data", "ROLE", "", "", "ROLE_1"),
+]
+
+
+def _tags_handler(sql):
+    if sql == "SHOW TAGS IN ACCOUNT":
+        return [{"database_name": "GOV", "schema_name": "TAGS", "name": "PII"}]
+    if sql == "SHOW ROLES":
+        return [{"name": f"ROLE_{i}", "comment": "", "owner": "SYSADMIN"} for i in range(3)]
+    if sql == "SHOW ROLES LIKE 'ROLE_1'":
+        return [{"name": "ROLE_1", "comment": "", "owner": "SYSADMIN"}]
+    if "tag_references" in sql:
+        objects = re.findall(r"tag_references\('([^']*)', '(\w+)'\)", sql)
+        return [
+            ref
+            for ref in TAG_REFS
+            for fqn, domain in objects
+            if ref["DOMAIN"] == domain
+            and fqn
+            == ".".join(part for part in (ref["OBJECT_DATABASE"], ref["OBJECT_SCHEMA"], ref["OBJECT_NAME"]) if part)
+        ]
+    return _account_handler(sql)
+
+
+def _role_tags(session, name):
+    return data_provider.fetch_resource_tags(session, ResourceType.ROLE, FQN(name=name))
+
+
+def test_snapshot_fetches_tags_in_bulk():
+    session = StubSession(with_session_ctx(_tags_handler))
+    with data_provider.snapshot(session):
+        data_provider.expect(
+            session,
+            [
+                URN(ResourceType.SCHEMA, FQN(database="DB", name="SCH"), "ABCD123"),
+                URN(ResourceType.SCHEMA, FQN(database="OTHER_DB", name="SCH"), "ABCD123"),
+            ]
+            + [URN(ResourceType.ROLE, FQN(name=f"ROLE_{i}"), "ABCD123") for i in range(3)],
+        )
+        schema = data_provider.fetch_schema(session, FQN(database="DB", name="SCH"))
+        other_schema = data_provider.fetch_schema(session, FQN(database="OTHER_DB", name="SCH"))
+        roles = [_role_tags(session, f"ROLE_{i}") for i in range(3)]
+    assert schema["tags"] == {"COST_CENTER": "eng", "GOV.TAGS.PII": "true"}
+    assert other_schema["tags"] == {"GOV.TAGS.PII": "false"}
+    assert roles == [None, {"GOV.TAGS.OWNER": "data"}, None]
+    # One query for each database's objects and one for account-level objects
+    assert sum("tag_references" in sql for sql in session.queries) == 3
+
+
+def test_fetch_tags_without_snapshot():
+    session = StubSession(with_session_ctx(_tags_handler))
+    assert _role_tags(session, "ROLE_1") == {"GOV.TAGS.OWNER": "data"}
+    assert """SELECT * FROM table("GOV".information_schema.tag_references('ROLE_1', 'ROLE'))""" in session.queries
+
+
+def test_snapshot_reads_tags_only_for_expected_objects_that_exist():
+    session = StubSession(with_session_ctx(_tags_handler))
+    with data_provider.snapshot(session):
+        data_provider.expect(
+            session,
+            [
+                URN(ResourceType.ROLE, FQN(name="ROLE_1"), "ABCD123"),
+                URN(ResourceType.ROLE, FQN(name="NEW_ROLE"), "ABCD123"),
+            ],
+        )
+        assert _role_tags(session, "ROLE_1") == {"GOV.TAGS.OWNER": "data"}
+    tag_queries = [sql for sql in session.queries if "tag_references" in sql]
+    assert tag_queries == ["""SELECT * FROM table("GOV".information_schema.tag_references('ROLE_1', 'ROLE'))"""]
+    assert "SHOW USERS" not in session.queries
+
+
+def test_unreadable_tags_dont_fail_the_fetch():
+    def _handler(sql):
+        if "tag_references" in sql:
+            raise ProgrammingError(errno=3001, msg="Insufficient privileges")
+        return _tags_handler(sql)
+
+    session = StubSession(with_session_ctx(_handler))
+    with data_provider.snapshot(session):
+        data_provider.expect(session, [URN(ResourceType.ROLE, FQN(name="ROLE_1"), "ABCD123")])
+        assert _role_tags(session, "ROLE_1") is None
+
+
+def test_fetch_tags_skipped_without_tags_in_account():
+    session = StubSession(with_session_ctx(_account_handler))
+    with data_provider.snapshot(session):
+        assert data_provider.fetch_schema(session, FQN(database="DB", name="SCH"))["tags"] is None
+    assert not any("tag_references" in sql for sql in session.queries)
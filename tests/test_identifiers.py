@@ -0,0 +1,41 @@
+import copy
+import pickle
+
+import pytest
+
+from titan.enums import ResourceType
+from titan.identifiers import FQN, URN
+from titan.parse import parse_identifier, parse_URN
+
+
+def test_fqn_is_interned_and_hashable():
+    fqn = FQN(name="tbl", database="DB", schema="SCH")
+    assert FQN(name="TBL", database="DB", schema="SCH") is fqn
+    assert {fqn: 1}[FQN(name="TBL", database="DB", schema="SCH")] == 1
+    assert FQN(name="TBL", database="DB") != fqn
+
+
+def test_identifiers_are_immutable():
+    fqn = FQN(name="R", params={"on": "X"})
+    with pytest.raises(AttributeError):
+        fqn.name = "OTHER"
+    with pytest.raises(TypeError):
+        fqn.params["on"] = "Y"
+    urn = URN(resource_type=ResourceType.ROLE, fqn=fqn, account_locator="ABCD123")
+    with pytest.raises(AttributeError):
+        urn.fqn = FQN(name="OTHER")
+    assert fqn.replace(database="DB") == FQN(name="R", database="DB", params={"on": "X"})
+
+
+def test_identifiers_survive_copy_and_pickle():
+    urn = parse_URN("urn::ABCD123:table/DB.SCH.TBL")
+    assert copy.deepcopy(urn) is urn
+    assert pickle.loads(pickle.dumps(urn)) is urn
+    assert str(pickle.loads(pickle.dumps(FQN(name="F", arg_types=["INT"])))) == "F(INT)"
+
+
+def test_parse_urn_is_memoized():
+    urn = parse_URN("urn::ABCD123:schema/DB.SCH")
+    assert parse_URN("urn::ABCD123:schema/DB.SCH") is urn
+    assert urn.fqn is parse_identifier("DB.SCH", is_db_scoped=True)
+    assert urn == URN(resource_type=ResourceType.SCHEMA, fqn=FQN(name="SCH", database="DB"), account_locator="ABCD123")
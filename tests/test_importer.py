@@ -0,0 +1,58 @@
+import io
+
+import pytest
+
+from titan import Blueprint
+from titan.importer import StatementError, bulk_import, import_sql, iter_resources, resource_from_sql
+from titan.resources import Database, Grant, JavascriptUDF, RoleGrant, Role, Schema
+from titan.resources.grant import FutureGrant
+
+from tests.helpers import get_sql_fixtures
+
+SQL_FIXTURES = [(resource_cls, sql) for resource_cls, sql, _ in get_sql_fixtures() if resource_cls.__name__ != "Column"]
+
+
+@pytest.mark.parametrize("resource_cls, sql", SQL_FIXTURES)
+def test_resource_from_sql_resolves_class(resource_cls, sql):
+    try:
+        resource_cls.from_sql(sql)
+    except Exception:
+        pytest.skip("fixture is not supported by from_sql")
+    assert type(resource_from_sql(sql)) is resource_cls
+
+
+def test_resource_from_sql_grants():
+    assert isinstance(resource_from_sql("GRANT ROLE analyst TO ROLE sysadmin"), RoleGrant)
+    assert isinstance(resource_from_sql("GRANT USAGE ON DATABASE db TO ROLE analyst"), Grant)
+    assert isinstance(resource_from_sql("GRANT USAGE ON FUTURE SCHEMAS IN DATABASE db TO ROLE analyst"), FutureGrant)
+
+
+def test_resource_from_sql_polymorphic():
+    udf = resource_from_sql("CREATE FUNCTION add5(n double) RETURNS double LANGUAGE JAVASCRIPT AS 'return N + 5;'")
+    assert isinstance(udf, JavascriptUDF)
+
+
+def test_iter_resources_streams_in_order():
+    script = io.StringIO("CREATE DATABASE db; CREATE SCHEMA db.sch; CREATE ROLE analyst;")
+    resources = list(iter_resources(script, chunk_size=4))
+    assert [type(res) for res in resources] == [Database, Schema, Role]
+    assert [res.name for res in resources] == ["db", "sch", "analyst"]
+
+
+def test_import_sql_into_blueprint(tmp_path):
+    path = tmp_path / "export.sql"
+    path.write_text("CREATE ROLE a;\nCREATE ROLE b;\n-- trailing comment\nCREATE ROLE c")
+    blueprint = import_sql(path, Blueprint(name="import"))
+    assert [res.name for res in blueprint._staged] == ["a", "b", "c"]
+
+
+def test_bulk_import_preserves_order_and_errors():
+    script = io.StringIO("CREATE DATABASE db; CREATE ROLE a; CREATE NONSENSE x; CREATE ROLE b; GRANT ROLE a TO ROLE b;")
+    blueprint = Blueprint(name="bulk")
+    errors = bulk_import(script, blueprint, max_workers=2, batch_size=2)
+    assert [type(res) for res in blueprint._staged] == [Database, Role, Role, RoleGrant]
+    assert [res.name for res in blueprint._staged[:3]] == ["db", "a", "b"]
+    assert len(errors) == 1
+    assert isinstance(errors[0], StatementError)
+    assert errors[0].index == 2
+    assert errors[0].sql == "CREATE NONSENSE x"
@@ -1,8 +1,20 @@
+import io
 import unittest
 
 import pyparsing as pp
 
-from titan.parse import FullyQualifiedIdentifier
+from titan.enums import ResourceType
+from titan.parse import (
+    FullyQualifiedIdentifier,
+    _column_parser,
+    _create_header_parser,
+    _parse_props,
+    _scoped_name_parts,
+    iter_statements,
+    parse_identifier,
+    parse_URN,
+)
+from titan.resources import Database
 
 IDENTIFIER_TEST_CASES = [
     ("tbl", ["tbl"]),
@@ -28,3 +40,47 @@ class TestParse(unittest.TestCase):
     def test_parse_identifier_wrapped(self):
         for test_case, result in IDENTIFIER_TEST_CASES:
             self.assertEqual(pp.MatchFirst(FullyQualifiedIdentifier).parse_string(test_case).as_list(), result)
+
+    def test_scoped_name_fast_path_matches_grammar(self):
+        for test_case, result in IDENTIFIER_TEST_CASES:
+            self.assertEqual(_scoped_name_parts(test_case), result)
+
+    def test_parse_identifier_quoted_periods_and_question_marks(self):
+        fqn = parse_identifier('db."a.b?c".tbl?entity=x')
+        self.assertEqual((fqn.database, fqn.schema, fqn.name), ("db", '"a.b?c"', "TBL"))
+        self.assertEqual(dict(fqn.params), {"entity": "x"})
+        fqn = parse_identifier('SCH."f(x)"(NUMBER, VARCHAR)')
+        self.assertEqual((fqn.schema, fqn.name, fqn.arg_types), ("SCH", '"F(X)"', ("NUMBER", "VARCHAR")))
+        self.assertEqual(str(parse_URN('urn::ABCD123:schema/db."this.is:schema"').fqn), 'db."THIS.IS:SCHEMA"')
+
+    def test_grammars_are_built_once(self):
+        assert _create_header_parser(ResourceType.DATABASE) is _create_header_parser(ResourceType.DATABASE)
+        parser = Database.props.parser
+        assert _parse_props(Database.props, "DATA_RETENTION_TIME_IN_DAYS = 1") == {"data_retention_time_in_days": 1}
+        assert _parse_props(Database.props, "COMMENT = 'hi'") == {"comment": "hi"}
+        assert Database.props.parser is parser
+        assert _column_parser() is _column_parser()
+        assert not pp.ParserElement._packratEnabled
+
+    def test_iter_statements(self):
+        script = """
+            CREATE ROLE a COMMENT = 'semi; colon';
+            -- a comment; with a semicolon
+            CREATE FUNCTION f() RETURNS INT AS $$ SELECT 1; $$;
+            /* block; comment */ CREATE ROLE "b;c"
+        """
+        expected = [
+            "CREATE ROLE a COMMENT = 'semi; colon'",
+            "CREATE FUNCTION f() RETURNS INT AS $$ SELECT 1; $$",
+            'CREATE ROLE "b;c"',
+        ]
+        for chunk_size in (1, 2, 3, 7, 1024):
+            assert list(iter_statements(io.StringIO(script), chunk_size)) == expected
+
+    def test_iter_statements_escaped_quotes(self):
+        script = "CREATE ROLE a COMMENT = 'it''s; \\'fine\\''; CREATE ROLE b;"
+        for chunk_size in (1, 2, 5, 1024):
+            assert list(iter_statements(io.StringIO(script), chunk_size)) == [
+                "CREATE ROLE a COMMENT = 'it''s; \\'fine\\''",
+                "CREATE ROLE b",
+            ]
@@ -1,7 +1,7 @@
 import pytest
 
-from titan.blueprint import _plan
-from titan.diff import DiffAction
+from titan.blueprint import _plan, topological_sort
+from titan.diff import DiffAction, diff
 
 
 @pytest.fixture(scope="session")
@@ -81,3 +81,39 @@ def test_plan_remove_action(remote_state, manifest, removed_db):
     changes = _plan(remote_state, manifest)
     key, data = removed_db.popitem()
     assert (DiffAction.REMOVE, key, data) in changes
+
+
+def test_diff_list_entries_ignore_order():
+    def grant(on, priv="SELECT"):
+        return {"priv": priv, "on": on, "on_type": "TABLE", "to": "ANALYST"}
+
+    key = "urn::XYZ123:grant/ANALYST?on=DB.SCH.T&type=TABLE"
+    original = {key: [grant("T1"), grant("T2"), grant("T3")]}
+    new = {key: [dict(reversed(grant("T3").items())), grant("T2", "INSERT"), grant("T1")]}
+    assert list(diff(original, original)) == []
+    assert list(diff(original, new)) == [
+        (DiffAction.REMOVE, key, grant("T2")),
+        (DiffAction.ADD, key, grant("T2", "INSERT")),
+    ]
+
+
+def test_topological_sort_is_deterministic():
+    urns = [f"urn::XYZ123:role/ROLE_{i}" for i in range(10)] + ["urn::XYZ123:database/DB"]
+    refs = [("urn::XYZ123:schema/DB.SCH", "urn::XYZ123:database/DB")]
+    order = topological_sort(set(urns), refs)
+    assert order == topological_sort(set(reversed(urns)), list(reversed(refs)))
+    assert sorted(order, key=order.get) == [
+        "urn::XYZ123:database/DB",
+        *sorted(urns[:10]),
+        "urn::XYZ123:schema/DB.SCH",
+    ]
+
+
+def test_topological_sort_names_cycle_members():
+    refs = [
+        ("urn::XYZ123:schema/DB.SCH", "urn::XYZ123:tag/DB.SCH.T"),
+        ("urn::XYZ123:tag/DB.SCH.T", "urn::XYZ123:schema/DB.SCH"),
+        ("urn::XYZ123:schema/DB.SCH", "urn::XYZ123:database/DB"),
+    ]
+    with pytest.raises(Exception, match="urn::XYZ123:schema/DB.SCH -> urn::XYZ123:tag/DB.SCH.T -> urn::XYZ123:schema"):
+        topological_sort(set(), refs)
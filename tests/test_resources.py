@@ -1,6 +1,9 @@
 import pytest
 
 from titan import resources
+from titan.enums import ResourceType
+from titan.identifiers import FQN
+from titan.resources.resource import _coercion_plan
 from tests.helpers import get_sql_fixtures, get_json_fixtures
 from titan.resources.warehouse import WarehouseSize
 
@@ -32,6 +35,67 @@ def test_resource_init_from_dict():
     )
 
 
+def test_container_find_uses_name_index():
+    db = resources.Database(name="DB")
+    assert db.find(ResourceType.SCHEMA, "public").name == "PUBLIC"
+    db.add(resources.Schema(name="SCH"))
+    assert db.find(ResourceType.SCHEMA, "sch").name == "SCH"
+    with pytest.raises(KeyError):
+        db.find(ResourceType.SCHEMA, '"sch"')
+
+
+def test_container_find_fqn():
+    account = resources.Account(name="ACCT", locator="ABCD123")
+    db = resources.Database(name="DB")
+    account.add(db)
+    schema = db.find(ResourceType.SCHEMA, "PUBLIC")
+    assert account.find_fqn(ResourceType.SCHEMA, schema.fqn) is schema
+    table = resources.Table(name="TBL", columns=[{"name": "ID", "data_type": "INT"}])
+    schema.add(table)
+    assert account.find_fqn(ResourceType.TABLE, FQN(name="TBL", database="DB", schema="PUBLIC")) is table
+
+
+def test_spec_coercion_plan_is_cached():
+    wh = resources.Warehouse(name="WH", warehouse_size="XSMALL")
+    assert wh._data.warehouse_size == WarehouseSize.XSMALL
+    plan = _coercion_plan(type(wh._data))
+    assert _coercion_plan(type(wh._data)) is plan
+    coerced_fields = {field_name for field_name, _ in plan}
+    assert "warehouse_size" in coerced_fields
+    assert "comment" not in coerced_fields
+
+
+def test_leaf_resources_are_slotted():
+    column = resources.Column(name="ID", data_type="INT")
+    grant = resources.Grant(priv="USAGE", on_warehouse="WH", to="ANALYST")
+    for resource in [column, grant]:
+        assert not hasattr(resource, "__dict__")
+        assert not hasattr(resource._data, "__dict__")
+    assert column.refs == ()
+    assert [ref.name for ref in grant.refs] == ["ANALYST", "WH"]
+    grant.requires(grant.refs[0])
+    assert len(grant.refs) == 2
+
+
+def test_defaults_are_cached_and_read_only():
+    defaults = resources.Warehouse.defaults()
+    assert resources.Warehouse.defaults() is defaults
+    with pytest.raises(TypeError):
+        defaults["comment"] = "changed"
+    merged = defaults | {"comment": "changed"}
+    assert merged["comment"] == "changed"
+    assert defaults["comment"] is None
+
+
+def test_to_dict_does_not_share_state():
+    table = resources.Table(name="TBL", columns=[{"name": "ID", "data_type": "INT"}])
+    serialized = table.to_dict()
+    assert serialized["name"] == "TBL"
+    assert serialized["columns"][0]["name"] == "ID"
+    serialized["columns"].clear()
+    assert len(table._data.columns) == 1
+
+
 def test_view_fails_with_empty_columns():
     with pytest.raises(ValueError):
         resources.View(name="MY_VIEW", columns=[], as_="SELECT 1")
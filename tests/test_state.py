@@ -0,0 +1,89 @@
+import json
+import time
+
+from titan.state import StateStore, fingerprint
+
+
+def test_fingerprint_ignores_key_order():
+    assert fingerprint({"a": 1, "b": [1, 2]}) == fingerprint({"b": [1, 2], "a": 1})
+    assert fingerprint({"a": 1}) != fingerprint({"a": 2})
+
+
+def test_get_requires_matching_fingerprint(tmp_path):
+    store = StateStore(str(tmp_path / "state.jsonl"))
+    store.put("urn::ABCD123:role/R", {"name": "R"}, {"name": "R", "comment": None})
+    assert store.get("urn::ABCD123:role/R", {"name": "R"})["remote"] == {"name": "R", "comment": None}
+    assert store.get("urn::ABCD123:role/R", {"name": "R", "comment": "changed"}) is None
+    assert store.get("urn::ABCD123:role/OTHER", {"name": "OTHER"}) is None
+
+
+def test_get_skips_stale_entries(tmp_path):
+    store = StateStore(str(tmp_path / "state.jsonl"), max_age=60)
+    store.put("urn::ABCD123:role/R", {"name": "R"}, None)
+    assert store.get("urn::ABCD123:role/R", {"name": "R"}) is not None
+    store.entries["urn::ABCD123:role/R"]["fetched_at"] = time.time() - 120
+    assert store.get("urn::ABCD123:role/R", {"name": "R"}) is None
+
+
+def test_save_and_reload(tmp_path):
+    path = tmp_path / "state.jsonl"
+    store = StateStore(str(path))
+    store.put("urn::ABCD123:role/A", {"name": "A"}, {"name": "A"})
+    store.put("urn::ABCD123:role/B", {"name": "B"}, None)
+    store.put("urn::ABCD123:role/C", {"name": "C"}, {"name": "C", "unserializable": object()})
+    store.save()
+
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"urn": "urn::ABCD123:role/D", "fingerp')
+
+    reloaded = StateStore(str(path))
+    assert set(reloaded.entries) == {"urn::ABCD123:role/A", "urn::ABCD123:role/B"}
+    assert reloaded.get("urn::ABCD123:role/B", {"name": "B"})["remote"] is None
+    assert all(json.loads(line) for line in path.read_text().splitlines()[:2])
+
+
+def test_invalidate(tmp_path):
+    store = StateStore(str(tmp_path / "state.jsonl"))
+    store.put("urn::ABCD123:role/A", {"name": "A"}, {"name": "A"})
+    store.invalidate("urn::ABCD123:role/A")
+    assert store.get("urn::ABCD123:role/A", {"name": "A"}) is None
+
+
+def test_change_marker_invalidates_entries(tmp_path):
+    store = StateStore(str(tmp_path / "state.jsonl"), max_age=60, track_changes=True)
+    store.put("urn::ABCD123:warehouse/WH", {"name": "WH"}, {"name": "WH"}, marker="t0/t1")
+    assert store.get("urn::ABCD123:warehouse/WH", {"name": "WH"}, marker="t0/t1") is not None
+    assert store.get("urn::ABCD123:warehouse/WH", {"name": "WH"}, marker="t0/t2") is None
+    # A matching marker doesn't keep an entry past max_age
+    store.entries["urn::ABCD123:warehouse/WH"]["fetched_at"] = time.time() - 120
+    assert store.get("urn::ABCD123:warehouse/WH", {"name": "WH"}, marker="t0/t1") is None
+
+
+def test_subtrees(tmp_path):
+    path = tmp_path / "state.jsonl"
+    store = StateStore(str(path), max_age=60)
+    store.put("urn::ABCD123:database/DB", {"name": "DB"}, {"name": "DB"})
+    store.put_subtree("urn::ABCD123:database/DB", "h1", ["urn::ABCD123:database/DB"], marker="m1")
+    store.save()
+
+    reloaded = StateStore(str(path), max_age=60)
+    assert set(reloaded.entries) == {"urn::ABCD123:database/DB"}
+    assert reloaded.get_subtree("urn::ABCD123:database/DB", "h1", marker="m1")
+    assert not reloaded.get_subtree("urn::ABCD123:database/DB", "h2", marker="m1")
+    assert not reloaded.get_subtree("urn::ABCD123:database/DB", "h1", marker="m2")
+    reloaded.subtrees["urn::ABCD123:database/DB"]["recorded_at"] = time.time() - 120
+    assert not reloaded.get_subtree("urn::ABCD123:database/DB", "h1", marker="m1")
+    reloaded.put_subtree("urn::ABCD123:database/DB", "h1", ["urn::ABCD123:database/DB"], marker="m1")
+    reloaded.invalidate("urn::ABCD123:database/DB")
+    assert not reloaded.get_subtree("urn::ABCD123:database/DB", "h1", marker="m1")
+
+
+def test_subtree_age_comes_from_its_oldest_entry(tmp_path):
+    store = StateStore(str(tmp_path / "state.jsonl"), max_age=60)
+    members = ["urn::ABCD123:database/DB", "urn::ABCD123:schema/DB.SCH"]
+    for member in members:
+        store.put(member, {}, {})
+    store.entries[members[1]]["fetched_at"] = time.time() - 50
+    store.put_subtree("urn::ABCD123:database/DB", "h1", members)
+    assert store.subtrees["urn::ABCD123:database/DB"]["recorded_at"] == store.entries[members[1]]["fetched_at"]
+    assert store.get_subtree("urn::ABCD123:database/DB", "h1")
@@ -1,10 +1,23 @@
+import heapq
+
+from collections import defaultdict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import contextmanager, nullcontext
 from typing import List, Optional, Union
-from queue import Queue
 
 import snowflake.connector
 
 from . import data_provider, lifecycle
-from .client import ALREADY_EXISTS_ERR, execute
+from .client import (
+    ALREADY_EXISTS_ERR,
+    QueryStats,
+    execute,
+    execute_batch,
+    invalidate_cache,
+    print_query,
+    query_caller,
+    query_hook,
+)
 from .diff import diff, DiffAction
 from .enums import ResourceType
 from .logical_grant import And, LogicalGrant, Or
@@ -22,6 +35,7 @@ from .privs import (
 from .resources import Account, Database, Schema
 from .resources.resource import Resource, ResourceContainer, ResourcePointer, convert_to_resource
 from .scope import AccountScope, DatabaseScope, OrganizationScope, SchemaScope
+from .state import StateStore, fingerprint
 
 
 class MissingPrivilegeException(Exception):
@@ -80,6 +94,7 @@ def _plan(remote_state, manifest):
     # Once sorting is done, remove the _refs and _urns keys from the manifest
     del manifest["_refs"]
     del manifest["_urns"]
+    manifest.pop("_subtrees", None)
 
     changes = []
     marked_for_replacement = set()
@@ -114,6 +129,65 @@ def _walk(resource: Resource):
             yield from _walk(item)
 
 
+def _subtree_hash(resource: Resource, manifest: dict, resource_urns: dict, members: list) -> str:
+    """
+    Merkle hash of a resource: its own manifest entry together with the hashes of everything it contains.
+    Children are hashed in sorted order, so the order resources were added in doesn't matter. The URN of
+    every resource in the subtree that has a manifest entry is appended to `members`.
+    """
+    urn_str = resource_urns.get(id(resource))
+    if urn_str is not None:
+        members.append(urn_str)
+    children = []
+    if isinstance(resource, ResourceContainer):
+        children = sorted(_subtree_hash(item, manifest, resource_urns, members) for item in resource.items())
+    entry = None if urn_str is None else [urn_str, manifest[urn_str]]
+    return fingerprint([entry, children])
+
+
+def _subtree_markers(session, manifest: dict, state_store: StateStore) -> dict:
+    """
+    Change markers for every database subtree in the manifest. A subtree only gets a marker if every
+    resource in it is tracked, otherwise only its age decides.
+    """
+    markers = {}
+    for urn_str, subtree in manifest["_subtrees"].items():
+        tracked = all(
+            parse_URN(member).resource_type in data_provider.CHANGE_TRACKED_TYPES for member in subtree["urns"]
+        )
+        if state_store.track_changes and tracked:
+            markers[urn_str] = data_provider.fetch_subtree_marker(session, parse_URN(urn_str))
+    return markers
+
+
+def _skip_unchanged_subtrees(manifest: dict, state_store: StateStore, markers: dict) -> dict:
+    """
+    Drop every database subtree the state store shows unchanged from the manifest, so it's neither fetched
+    nor diffed.
+    """
+    skipped = set()
+    subtrees = {}
+    for urn_str, subtree in manifest["_subtrees"].items():
+        if state_store.get_subtree(urn_str, subtree["hash"], marker=markers.get(urn_str)):
+            skipped.update(subtree["urns"])
+        else:
+            subtrees[urn_str] = subtree
+    if not skipped:
+        return manifest
+
+    pruned = {key: value for key, value in manifest.items() if key not in skipped}
+    pruned["_urns"] = [urn_str for urn_str in manifest["_urns"] if urn_str not in skipped]
+    pruned["_subtrees"] = subtrees
+    return pruned
+
+
+def _record_unchanged_subtrees(manifest: dict, plan: list, state_store: StateStore, markers: dict) -> None:
+    changed = {urn_str for _, urn_str, _ in plan}
+    for urn_str, subtree in manifest["_subtrees"].items():
+        if changed.isdisjoint(subtree["urns"]):
+            state_store.put_subtree(urn_str, subtree["hash"], subtree["urns"], marker=markers.get(urn_str))
+
+
 def _collect_required_privs(session_ctx, plan) -> list:
     """
     For each action in the plan, generate a
@@ -284,35 +358,180 @@ def _raise_if_missing_privs(required: list, available: dict):
     #         raise MissingPrivilegeException(f"Missing privileges for {principal}: {required_privs}")
 
 
-def _fetch_remote_state(session, manifest):
-    state = {}
-    urns = manifest["_urns"].copy()
-    for urn_str, _data in manifest.items():
+def _fetch_remote_state(session, manifest, max_workers: int = 1, state_store: StateStore = None):
+    """
+    Fetch the remote state of every URN in the manifest.
+
+    With `max_workers` > 1 the per-URN fetches are fanned out over a thread pool. Results are
+    collected in manifest order, so the returned state is the same regardless of concurrency.
+
+    With a `state_store`, URNs whose manifest entry is unchanged and whose cached state is still fresh
+    are served from the store and only the rest are fetched. Fetched state is written back to the store.
+    If the store tracks changes, each URN's change marker is read up front from bulk listings, and objects
+    whose marker moved are refetched even if their cached state is still fresh.
+    """
+    pending = {}
+    for urn_str, data in manifest.items():
         if urn_str.startswith("_"):
             continue
-        urns.remove(urn_str)
+        pending[urn_str] = data
+    for urn_str in manifest["_urns"]:
+        pending.setdefault(urn_str, None)
+
+    # Markers are read before fetching, so a change made while fetching is picked up by the next plan
+    markers = {}
+    if state_store is not None and state_store.track_changes:
+        for urn_str in pending:
+            markers[urn_str] = data_provider.fetch_change_marker(session, parse_URN(urn_str))
+
+    cached = {}
+    if state_store is not None:
+        for urn_str, data in pending.items():
+            entry = state_store.get(urn_str, data, marker=markers.get(urn_str))
+            if entry is not None:
+                cached[urn_str] = entry["remote"]
+    to_fetch = [urn_str for urn_str in pending if urn_str not in cached]
+    data_provider.expect(session, [parse_URN(urn_str) for urn_str in to_fetch])
+
+    def _fetch(urn_str):
         urn = parse_URN(urn_str)
-        resource_cls = Resource.resolve_resource_cls(urn.resource_type, _data)
+        resource_cls = Resource.resolve_resource_cls(urn.resource_type, pending[urn_str])
         data = data_provider.fetch_resource(session, urn)
-        if urn_str in manifest and data is not None:
-            if isinstance(data, list):
-                normalized = [resource_cls.defaults() | d for d in data]
-            else:
-                normalized = resource_cls.defaults() | data
+        if data is None:
+            return None
+        if isinstance(data, list):
+            return [resource_cls.defaults() | d for d in data]
+        return resource_cls.defaults() | data
+
+    if max_workers > 1:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(_fetch, to_fetch))
+    else:
+        results = [_fetch(urn_str) for urn_str in to_fetch]
+
+    fetched = dict(zip(to_fetch, results))
+    if state_store is not None:
+        for urn_str, normalized in fetched.items():
+            state_store.put(urn_str, pending[urn_str], normalized, marker=markers.get(urn_str))
+
+    state = {}
+    for urn_str in pending:
+        normalized = cached[urn_str] if urn_str in cached else fetched[urn_str]
+        if normalized is not None:
             state[urn_str] = normalized
+    return state
+
 
+# Upper bound on statements sent in one multi-statement request when batching apply
+APPLY_BATCH_SIZE = 50
+
+LIFECYCLE_FOR_ACTION = {
+    DiffAction.ADD: "lifecycle.create_resource",
+    DiffAction.CHANGE: "lifecycle.update_resource",
+    DiffAction.REMOVE: "lifecycle.drop_resource",
+}
+
+
+def _action_sql(action: DiffAction, urn: URN, data: dict, props):
+    if action == DiffAction.ADD:
+        return lifecycle.create_resource(urn, data, props)
+    elif action == DiffAction.CHANGE:
+        return lifecycle.update_resource(urn, data, props)
+    elif action == DiffAction.REMOVE:
+        return lifecycle.drop_resource(urn, data)
+
+
+def _plan_dependencies(urns: list, refs: list) -> dict:
+    """
+    For each URN in a plan (in plan order), find the URNs earlier in the plan that must be applied first.
+
+    Two URNs are related if one references the other, directly or through resources that aren't in the
+    plan, or if one contains the other. Related URNs keep their plan order and unrelated URNs are free
+    to be applied concurrently.
+    """
+    position = {urn_str: idx for idx, urn_str in enumerate(urns)}
+
+    outgoing = defaultdict(set)
+    for node, ref in refs:
+        outgoing[node].add(ref)
+
+    # Plan URNs reachable from a URN outside the plan, memoized since the walk is shared by many URNs
+    reachable_memo = {}
+
+    def _reachable_plan_urns(node, visiting):
+        if node in reachable_memo:
+            return reachable_memo[node]
+        found = set()
+        visiting.add(node)
+        for ref in outgoing[node]:
+            if ref in position:
+                found.add(ref)
+            elif ref not in visiting:
+                found |= _reachable_plan_urns(ref, visiting)
+        visiting.discard(node)
+        reachable_memo[node] = found
+        return found
+
+    related = defaultdict(set)
     for urn_str in urns:
+        for ref in outgoing[urn_str]:
+            others = {ref} if ref in position else _reachable_plan_urns(ref, {urn_str})
+            for other in others:
+                related[urn_str].add(other)
+                related[other].add(urn_str)
+
         urn = parse_URN(urn_str)
-        resource_cls = Resource.resolve_resource_cls(urn.resource_type)
-        data = data_provider.fetch_resource(session, urn)
-        if data is not None:
-            if isinstance(data, list):
-                normalized = [resource_cls.defaults() | d for d in data]
-            else:
-                normalized = resource_cls.defaults() | data
-            state[urn_str] = normalized
+        containers = []
+        if urn.fqn.database:
+            containers.append(str(urn.database()))
+        if urn.fqn.schema:
+            containers.append(str(urn.schema()))
+        for container in containers:
+            if container in position:
+                related[urn_str].add(container)
+                related[container].add(urn_str)
 
-    return state
+    return {urn_str: {other for other in related[urn_str] if position[other] < position[urn_str]} for urn_str in urns}
+
+
+def _run_dag(fn, dependencies: dict, max_workers: int):
+    """
+    Call `fn(node)` for every node once all of its dependencies have succeeded, running up to
+    `max_workers` nodes at a time. After a failure no new node is started. Once in-flight work has
+    finished, the first failure is raised with the nodes that never started in its `skipped` attribute.
+    """
+    waiting_on = {node: set(deps) for node, deps in dependencies.items()}
+    dependents = defaultdict(list)
+    for node, deps in dependencies.items():
+        for dep in deps:
+            dependents[dep].append(node)
+
+    errors = []
+    started = set()
+    ready = [node for node, deps in waiting_on.items() if not deps]
+    running = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        while running or (ready and not errors):
+            # Like the serial path, nothing new starts after a failure, only in-flight work finishes
+            while ready and not errors and len(running) < max_workers:
+                node = ready.pop(0)
+                started.add(node)
+                running[executor.submit(fn, node)] = node
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                node = running.pop(future)
+                err = future.exception()
+                if err is not None:
+                    errors.append(err)
+                    continue
+                for dependent in dependents[node]:
+                    waiting_on[dependent].discard(node)
+                    if not waiting_on[dependent]:
+                        ready.append(dependent)
+
+    if errors:
+        errors[0].skipped = [node for node in dependencies if node not in started]
+        raise errors[0]
 
 
 class Blueprint:
@@ -325,13 +544,32 @@ class Blueprint:
         resources: List[Resource] = [],
         allow_role_switching: bool = True,
         enforce_requirements: bool = False,
+        max_fetch_workers: int = 1,
+        max_apply_workers: int = 1,
+        state_store: Optional[StateStore] = None,
+        report_queries: bool = False,
+        batch_statements: bool = False,
+        print_queries: bool = False,
     ) -> None:
+        """
+        With `max_apply_workers` > 1, apply runs unrelated resources concurrently. Resources are related
+        through their references and containers only, so a view, dynamic table or task that reads from
+        objects it doesn't reference must declare them with `requires()` to be created after them. If an
+        action fails, the URNs that were never applied are listed in the raised error's `skipped` attribute.
+        """
         self._finalized = False
         self._staged: List[Resource] = []
         self._root: Account = None
         self._account_locator: str = None
         self._allow_role_switching: bool = allow_role_switching
         self._enforce_requirements: bool = enforce_requirements
+        self._max_fetch_workers: int = max_fetch_workers
+        self._max_apply_workers: int = max_apply_workers
+        self._state_store: Optional[StateStore] = state_store
+        self._report_queries: bool = report_queries
+        self._batch_statements: bool = batch_statements
+        self._print_queries: bool = print_queries
+        self.query_stats: Optional[QueryStats] = None
 
         self.name = name
         self.account: Optional[Account] = convert_to_resource(Account, account) if account else None
@@ -397,23 +635,33 @@ class Blueprint:
                 else:
                     raise Exception(f"No schema for resource {repr(resource)} found")
             elif isinstance(resource.container, ResourcePointer):
-                # TODO: clean this up
-                found = False
-                for db in databases:
-                    for schema in db.items(resource_type=ResourceType.SCHEMA):
-                        if schema.name == resource.container.name:
-                            schema.add(resource)
-                            found = True
-                            break
-                    if found:
-                        break
-                if not found:
+                schema = self._find_schema(databases, resource.container)
+                if schema is None:
                     raise Exception(f"Schema [{resource.container}] for resource {resource} not found")
+                schema.add(resource)
+
+    def _find_schema(self, databases: list, pointer: ResourcePointer) -> Optional[Schema]:
+        """
+        Resolve a schema pointer to a schema in the blueprint. A pointer that names its database is looked
+        up by FQN, otherwise the first database with a schema of that name wins.
+        """
+        if pointer.container is not None:
+            try:
+                return self._root.find_fqn(ResourceType.SCHEMA, pointer.fqn)
+            except KeyError:
+                pass
+        for db in databases:
+            try:
+                return db.find(resource_type=ResourceType.SCHEMA, name=pointer.name)
+            except KeyError:
+                continue
+        return None
 
     def generate_manifest(self, session_context: dict = {}):
         manifest = {}
         refs = []
         urns = []
+        resource_urns = {}
 
         self._finalize(session_context)
 
@@ -432,6 +680,7 @@ class Blueprint:
                 data["_pointer"] = True
 
             manifest_key = str(urn)
+            resource_urns[id(resource)] = manifest_key
 
             if resource.resource_type == ResourceType.GRANT:
                 if manifest_key not in manifest:
@@ -446,19 +695,76 @@ class Blueprint:
             for ref in resource.refs:
                 ref_urn = URN.from_resource(account_locator=self._account_locator, resource=ref)
                 refs.append((str(urn), str(ref_urn)))
+
+        subtrees = {}
+        for database in self._root.items(resource_type=ResourceType.DATABASE):
+            if isinstance(database, Database) and id(database) in resource_urns:
+                members = []
+                subtree_hash = _subtree_hash(database, manifest, resource_urns, members)
+                subtrees[resource_urns[id(database)]] = {"hash": subtree_hash, "urns": members}
+
         manifest["_refs"] = refs
         manifest["_urns"] = urns
+        manifest["_subtrees"] = subtrees
         return manifest
 
+    @contextmanager
+    def _instrument(self):
+        """
+        With print_queries, echo every query run inside the block as it completes. With report_queries,
+        aggregate them and print a per-statement summary at the end. The stats are kept on `query_stats`
+        for inspection.
+        """
+        with query_hook(print_query) if self._print_queries else nullcontext():
+            if not self._report_queries:
+                yield
+                return
+            self.query_stats = QueryStats()
+            try:
+                with query_hook(self.query_stats):
+                    yield
+            finally:
+                self.query_stats.print_report()
+
     def plan(self, session):
+        with self._instrument():
+            return self._fetch_and_plan(session, use_state_store=True)
+
+    def _fetch_and_plan(self, session, use_state_store: bool):
         session_ctx = data_provider.fetch_session(session)
         manifest = self.generate_manifest(session_ctx)
-        remote_state = _fetch_remote_state(session, manifest)
-        return _plan(remote_state, manifest)
+        state_store = self._state_store if use_state_store else None
+        subtree_markers = {}
+        with data_provider.snapshot(session):
+            if state_store is not None:
+                subtree_markers = _subtree_markers(session, manifest, state_store)
+                manifest = _skip_unchanged_subtrees(manifest, state_store, subtree_markers)
+            remote_state = _fetch_remote_state(
+                session,
+                manifest,
+                max_workers=self._max_fetch_workers,
+                state_store=state_store,
+            )
+        plan = _plan(remote_state, manifest)
+        if state_store is not None:
+            _record_unchanged_subtrees(manifest, plan, state_store, subtree_markers)
+            state_store.save()
+        return plan
 
     def apply(self, session, plan=None):
-        if plan is None:
-            plan = self.plan(session)
+        with self._instrument():
+            return self._apply(session, plan)
+
+    def _apply(self, session, plan=None):
+        # Plan and privilege collection share one snapshot, so each role's grants are only fetched once
+        # Never apply against cached remote state, the plan must reflect the account as it is now
+        with data_provider.snapshot(session):
+            if plan is None:
+                plan = self._fetch_and_plan(session, use_state_store=False)
+            session_ctx = data_provider.fetch_session(session)
+            usable_roles = session_ctx["available_roles"] if self._allow_role_switching else [session_ctx["role"]]
+            required_privs = _collect_required_privs(session_ctx, plan)
+            available_privs = _collect_available_privs(session_ctx, session, plan, usable_roles)
 
         # TODO: cursor setup, including query tag
         # TODO: clean up urn vs urn_str madness
@@ -477,43 +783,91 @@ class Blueprint:
             against what we have access to in the session and the role tree.
         """
 
-        session_ctx = data_provider.fetch_session(session)
-        usable_roles = session_ctx["available_roles"] if self._allow_role_switching else [session_ctx["role"]]
-        required_privs = _collect_required_privs(session_ctx, plan)
-        available_privs = _collect_available_privs(session_ctx, session, plan, usable_roles)
-
         _raise_if_missing_privs(required_privs, available_privs)
 
         print(self._staged)
         print(plan)
 
-        action_queue = []
-        actions_taken = []
-
-        def _queue_action(urn, data, props):
-            if action == DiffAction.ADD:
-                action_queue.append(lifecycle.create_resource(urn, data, props))
-            elif action == DiffAction.CHANGE:
-                action_queue.append(lifecycle.update_resource(urn, data, props))
-            elif action == DiffAction.REMOVE:
-                action_queue.append(lifecycle.drop_resource(urn, data))
-
+        # Group actions by URN. Actions on the same URN always run in plan order, in a single task.
+        urn_actions = {}
         for action, urn_str, data in plan:
-            urn = parse_URN(urn_str)
+            urn_actions.setdefault(urn_str, []).append((action, data))
 
-            props = Resource.props_for_resource_type(urn.resource_type, data)
+        actions_taken = []
 
-            _queue_action(urn, data, props)
+        def _statements(urn_strs):
+            for urn_str in urn_strs:
+                urn = parse_URN(urn_str)
+                for action, data in urn_actions[urn_str]:
+                    props = Resource.props_for_resource_type(urn.resource_type, data)
+                    yield urn, action, _action_sql(action, urn, data, props)
+
+        def _applied(urns):
+            for urn in urns:
+                invalidate_cache(session, urn.resource_type)
+                if self._state_store is not None:
+                    self._state_store.invalidate(str(urn))
+                    if urn.fqn.database:
+                        database_urn = URN(
+                            resource_type=ResourceType.DATABASE,
+                            fqn=FQN(name=urn.fqn.database),
+                            account_locator=urn.account_locator,
+                        )
+                        self._state_store.invalidate(str(database_urn))
 
-            while action_queue:
-                sql = action_queue.pop(0)
-                actions_taken.append(sql)
-                try:
+        def _apply_one(urn, action, sql):
+            actions_taken.append(sql)
+            try:
+                with query_caller(LIFECYCLE_FOR_ACTION[action]):
                     execute(session, sql)
-                except snowflake.connector.errors.ProgrammingError as err:
-                    if err.errno == ALREADY_EXISTS_ERR:
-                        print(f"Resource already exists: {urn_str}, skipping...")
-                    raise err
+            except snowflake.connector.errors.ProgrammingError as err:
+                if err.errno == ALREADY_EXISTS_ERR:
+                    print(f"Resource already exists: {urn}, skipping...")
+                raise err
+            finally:
+                _applied([urn])
+
+        def _apply_batch(batch):
+            # One request for the whole batch, Snowflake runs the statements in order and stops at the first failure
+            statements = [sql for _, _, sql in batch]
+            actions_taken.extend(statements)
+            callers = {LIFECYCLE_FOR_ACTION[action] for _, action, _ in batch}
+            try:
+                with query_caller(callers.pop() if len(callers) == 1 else "lifecycle.batch"):
+                    execute_batch(session, statements, use_role=getattr(statements[0], "use_role", None))
+            except snowflake.connector.errors.ProgrammingError as err:
+                if err.errno == ALREADY_EXISTS_ERR:
+                    print(f"Resource already exists in batch of {len(batch)} statements, skipping...")
+                raise err
+            finally:
+                _applied([urn for urn, _, _ in batch])
+
+        def _apply_urns(urn_strs):
+            if not self._batch_statements:
+                for urn, action, sql in _statements(urn_strs):
+                    _apply_one(urn, action, sql)
+                return
+            # Consecutive statements that run as the same role go out together
+            batch = []
+            for urn, action, sql in _statements(urn_strs):
+                same_role = not batch or getattr(batch[-1][2], "use_role", None) == getattr(sql, "use_role", None)
+                if batch and (not same_role or len(batch) >= APPLY_BATCH_SIZE):
+                    _apply_batch(batch)
+                    batch = []
+                batch.append((urn, action, sql))
+            if batch:
+                _apply_batch(batch)
+
+        try:
+            if self._max_apply_workers > 1:
+                refs = self.generate_manifest(session_ctx)["_refs"]
+                dependencies = _plan_dependencies(list(urn_actions), refs)
+                _run_dag(lambda urn_str: _apply_urns([urn_str]), dependencies, max_workers=self._max_apply_workers)
+            else:
+                _apply_urns(list(urn_actions))
+        finally:
+            if self._state_store is not None:
+                self._state_store.save()
         return actions_taken
 
     def destroy(self, session, manifest=None):
@@ -539,43 +893,68 @@ class Blueprint:
             self._add(resource)
 
 
-def topological_sort(resource_set: set, references: list):
-    # Kahn's algorithm
+def _sort_key(urn_str: str) -> tuple:
+    # urn:<org>:<account_locator>:<resource_label>/<fqn> => (resource_label, fqn, urn_str)
+    parts = urn_str.split(":", 3)
+    if len(parts) == 4:
+        resource_label, _, fqn = parts[3].partition("/")
+        return (resource_label, fqn, urn_str)
+    return ("", urn_str, urn_str)
 
-    # Compute in-degree (# of inbound edges) for each node
-    in_degrees = {}
-    outgoing_edges = {}
 
-    for node in resource_set:
-        in_degrees[node] = 0
-        outgoing_edges[node] = set()
+def _find_cycle(remaining: set, refs: list) -> list:
+    # Every remaining node has at least one unresolved ref that is also remaining, so walking those
+    # refs must eventually revisit a node.
+    node = min(remaining)
+    seen = {}
+    path = []
+    while node not in seen:
+        seen[node] = len(path)
+        path.append(node)
+        node = next(ref for ref in refs[node] if ref in remaining)
+    return path[seen[node] :] + [node]
 
+
+def topological_sort(resource_set: set, references: list):
+    """
+    Order URNs so that every URN comes after the URNs it references.
+
+    This is Kahn's algorithm over integer node ids. Ids are assigned in (resource type, FQN) order and
+    ready nodes are taken from a min-heap, so URNs with no ordering constraint between them always come
+    out in the same order.
+
+    Returns a map of URN => position. Raises if the references contain a cycle.
+    """
+    nodes = set(resource_set)
     for node, ref in references:
-        in_degrees[ref] += 1
-        outgoing_edges[node].add(ref)
-
-    # Put all nodes with 0 in-degree in a queue
-    queue = Queue()
-    for node, in_degree in in_degrees.items():
-        if in_degree == 0:
-            queue.put(node)
-
-    # Create an empty node list
-    nodes = []
-
-    while not queue.empty():
-        node = queue.get()
-        nodes.append(node)
-
-        # For each of node's outgoing edges
-        empty_neighbors = set()
-        for edge in outgoing_edges[node]:
-            in_degrees[edge] -= 1
-            if in_degrees[edge] == 0:
-                queue.put(edge)
-                empty_neighbors.add(edge)
-
-        # Remove edges to empty neighbors
-        outgoing_edges[node].difference_update(empty_neighbors)
-    nodes.reverse()
-    return {value: index for index, value in enumerate(nodes)}
+        nodes.add(node)
+        nodes.add(ref)
+    nodes = sorted(nodes, key=_sort_key)
+    node_id = {node: idx for idx, node in enumerate(nodes)}
+
+    # refs[i] are the nodes i references, dependents[i] are the nodes that reference i
+    refs = [[] for _ in nodes]
+    dependents = [[] for _ in nodes]
+    for node, ref in set(references):
+        refs[node_id[node]].append(node_id[ref])
+        dependents[node_id[ref]].append(node_id[node])
+
+    in_degree = [len(node_refs) for node_refs in refs]
+    ready = [idx for idx, degree in enumerate(in_degree) if degree == 0]
+    heapq.heapify(ready)
+
+    order = []
+    while ready:
+        idx = heapq.heappop(ready)
+        order.append(idx)
+        for dependent in dependents[idx]:
+            in_degree[dependent] -= 1
+            if in_degree[dependent] == 0:
+                heapq.heappush(ready, dependent)
+
+    if len(order) < len(nodes):
+        remaining = {idx for idx, degree in enumerate(in_degree) if degree > 0}
+        cycle = _find_cycle(remaining, refs)
+        raise Exception(f"Cycle detected in resource references: {' -> '.join(nodes[idx] for idx in cycle)}")
+
+    return {nodes[idx]: position for position, idx in enumerate(order)}
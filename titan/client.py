@@ -1,15 +1,25 @@
 import os
+import re
+import sys
+import threading
 import time
 
-from typing import Union
+from collections import OrderedDict, defaultdict
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Union
+from weakref import WeakKeyDictionary
 
 import snowflake.connector
 
+from inflection import singularize
+
 from snowflake.connector.cursor import SnowflakeCursor
 from snowflake.connector.connection import SnowflakeConnection
 from snowflake.connector.errors import ProgrammingError
 
 from .builder import SQL
+from .enums import ResourceType
 
 UNSUPPORTED_FEATURE = 2
 ACCESS_CONTROL_ERR = 3001
@@ -28,46 +38,641 @@ def get_session():
     return snowflake.connector.connect(**connection_params)
 
 
-def _execute(conn_or_cursor: Union[SnowflakeConnection, SnowflakeCursor], sql, use_role=None) -> list:
-    if isinstance(sql, str):
-        sql_text = sql
-    elif isinstance(sql, SQL):
-        sql_text = str(sql)
-        use_role = use_role or sql.use_role
+POOL_MAX_SIZE = 4
+POOL_CHECKOUT_TIMEOUT = 60
+POOL_HEALTH_CHECK_INTERVAL = 300
 
-    if isinstance(conn_or_cursor, SnowflakeConnection):
-        session = conn_or_cursor
+
+def _keepalive_session():
+    return snowflake.connector.connect(**connection_params, client_session_keep_alive=True)
+
+
+class ConnectionPool:
+    """
+    A bounded pool of connections that can be passed anywhere a session is expected.
+
+    Each statement executed against the pool checks out a connection for its duration, so concurrent
+    fetches and applies run on separate connections instead of sharing one. Every pooled connection
+    is pinned to a role: a statement is routed to an idle connection already using the role it needs,
+    so `USE ROLE` is only issued when no such connection is free. Statements without a role run as the
+    pool's default role, the role of the first connection it opened.
+
+    A connection that has been idle for longer than `health_check_interval` seconds is checked with
+    `SELECT 1` before it's handed out, and replaced if the check fails. Connections are opened lazily
+    by `factory`, which defaults to a connection with client keepalive enabled.
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[], SnowflakeConnection] = _keepalive_session,
+        max_size: int = POOL_MAX_SIZE,
+        checkout_timeout: float = POOL_CHECKOUT_TIMEOUT,
+        health_check_interval: float = POOL_HEALTH_CHECK_INTERVAL,
+    ):
+        self.factory = factory
+        self.max_size = max_size
+        self.checkout_timeout = checkout_timeout
+        self.health_check_interval = health_check_interval
+        self._user: Optional[str] = None
+        self._role: Optional[str] = None
+        self._idle: list = []
+        self._last_used: dict = {}
+        self._size = 0
+        self._closed = False
+        self._available = threading.Condition()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return self._size
+
+    def _connect_once(self):
+        # The default user and role come from the first connection, open one if there isn't one yet
+        if self._role is None and self._size == 0:
+            with self.connection():
+                pass
+
+    @property
+    def user(self) -> Optional[str]:
+        self._connect_once()
+        return self._user
+
+    @property
+    def role(self) -> Optional[str]:
+        self._connect_once()
+        return self._role
+
+    def _open(self):
+        conn = self.factory()
+        with self._available:
+            if self._role is None:
+                self._user = getattr(conn, "user", None)
+                self._role = getattr(conn, "role", None)
+        return conn
+
+    def _discard(self, conn):
+        with self._available:
+            self._size -= 1
+            self._last_used.pop(conn, None)
+            self._available.notify()
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def _is_healthy(self, conn) -> bool:
+        if getattr(conn, "is_closed", lambda: False)():
+            return False
+        if time.monotonic() - self._last_used.get(conn, 0) < self.health_check_interval:
+            return True
+        try:
+            conn.cursor().execute("SELECT 1").fetchall()
+            return True
+        except Exception:
+            return False
+
+    def _take(self, role):
+        # Must hold self._available. Prefer an idle connection already pinned to the role.
+        for idx, conn in enumerate(self._idle):
+            if role is None or _in_role(conn, role):
+                return self._idle.pop(idx)
+        if self._size < self.max_size:
+            self._size += 1
+            return None
+        if self._idle:
+            return self._idle.pop(0)
+        raise LookupError
+
+    def _checkout(self, role):
+        deadline = time.monotonic() + self.checkout_timeout
+        while True:
+            with self._available:
+                while True:
+                    if self._closed:
+                        raise RuntimeError("Connection pool is closed")
+                    try:
+                        conn = self._take(role)
+                        break
+                    except LookupError:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0 or not self._available.wait(remaining):
+                            raise TimeoutError(f"No connection available after {self.checkout_timeout}s")
+            if conn is None:
+                try:
+                    return self._open()
+                except Exception:
+                    with self._available:
+                        self._size -= 1
+                        self._available.notify()
+                    raise
+            if self._is_healthy(conn):
+                return conn
+            self._discard(conn)
+
+    def _checkin(self, conn):
+        with self._available:
+            self._last_used[conn] = time.monotonic()
+            if self._closed:
+                self._size -= 1
+            else:
+                self._idle.append(conn)
+                self._available.notify()
+                return
+        conn.close()
+
+    @contextmanager
+    def connection(self, role: str = None):
+        """Check out a connection pinned to `role`, or to the pool's default role"""
+        conn = self._checkout(role or self._role)
+        try:
+            role = role or self._role
+            if role and not _in_role(conn, role):
+                _execute(conn, f"USE ROLE {role}")
+        except BaseException:
+            self._discard(conn)
+            raise
+        try:
+            yield conn
+        except ProgrammingError:
+            self._checkin(conn)
+            raise
+        except BaseException:
+            # The connection may be mid-statement, don't hand it to anyone else
+            self._discard(conn)
+            raise
+        else:
+            self._checkin(conn)
+
+    def close(self):
+        with self._available:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._size -= len(idle)
+            self._available.notify_all()
+        for conn in idle:
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+
+@dataclass
+class QueryRecord:
+    sql: str
+    fingerprint: str
+    user: Optional[str]
+    role: Optional[str]
+    rows: Optional[int]
+    latency: float
+    error_code: Optional[int]
+    caller: Optional[str]
+
+
+_query_hooks: List[Callable[[QueryRecord], None]] = []
+_query_hooks_lock = threading.Lock()
+_query_context = threading.local()
+
+
+def add_query_hook(hook: Callable[[QueryRecord], None]) -> None:
+    """Register a callable that receives a QueryRecord for every statement titan executes"""
+    with _query_hooks_lock:
+        if hook not in _query_hooks:
+            _query_hooks.append(hook)
+
+
+def remove_query_hook(hook: Callable[[QueryRecord], None]) -> None:
+    with _query_hooks_lock:
+        if hook in _query_hooks:
+            _query_hooks.remove(hook)
+
+
+@contextmanager
+def query_hook(hook: Callable[[QueryRecord], None]):
+    add_query_hook(hook)
+    try:
+        yield hook
+    finally:
+        remove_query_hook(hook)
+
+
+@contextmanager
+def query_caller(name: str):
+    """Attribute the queries executed by this thread inside the block to `name`"""
+    previous = getattr(_query_context, "caller", None)
+    _query_context.caller = name
+    try:
+        yield
+    finally:
+        _query_context.caller = previous
+
+
+def _query_fingerprint(sql_text: str) -> str:
+    """
+    Normalized SQL with literals replaced, so repeated statements against different objects group together, eg.
+        SHOW ROLES LIKE 'ANALYST' => SHOW ROLES LIKE ?
+    """
+    sql_text = re.sub(r"'(?:[^']|'')*'|\$\$.*?\$\$|\b\d+(?:\.\d+)?\b", "?", sql_text, flags=re.DOTALL)
+    return _normalize_sql(sql_text)
+
+
+def _calling_function() -> Optional[str]:
+    caller = getattr(_query_context, "caller", None)
+    if caller:
+        return caller
+    fallback = None
+    frame = sys._getframe(2)
+    while frame is not None:
+        module = frame.f_globals.get("__name__", "")
+        name = frame.f_code.co_name
+        if module == "titan.data_provider" and name.startswith("fetch_"):
+            return name
+        if fallback is None and module != __name__ and not name.startswith("<"):
+            fallback = f"{module}.{name}"
+        frame = frame.f_back
+    return fallback
+
+
+def _emit(session, sql_text, role, rows, latency, error_code, caller):
+    record = QueryRecord(
+        sql=sql_text,
+        fingerprint=_query_fingerprint(sql_text),
+        user=getattr(session, "user", None),
+        role=role,
+        rows=rows,
+        latency=latency,
+        error_code=error_code,
+        caller=caller,
+    )
+    for hook in list(_query_hooks):
+        hook(record)
+
+
+def print_query(record: QueryRecord) -> None:
+    """A query hook that echoes each statement and its timing to stdout"""
+    prefix = f"[{record.user}:{record.role}] >"
+    if record.error_code is not None:
+        print(prefix, record.sql, f"    \033[31m(err {record.error_code}, {record.latency:.2f}s)\033[0m", flush=True)
+    else:
+        print(prefix, record.sql, f"    \033[94m({record.rows} rows, {record.latency:.2f}s)\033[0m", flush=True)
+
+
+_cursors = threading.local()
+
+
+def _cursor_for(session):
+    """
+    Reuse one DictCursor per connection and thread. Cursors aren't safe to share between threads, but
+    a thread executing statements one after another can keep using the same one.
+    """
+    cursors = getattr(_cursors, "by_connection", None)
+    if cursors is None:
+        cursors = _cursors.by_connection = WeakKeyDictionary()
+    try:
+        cur = cursors.get(session)
+    except TypeError:
+        return session.cursor(snowflake.connector.DictCursor)
+    if cur is None or getattr(cur, "is_closed", lambda: False)():
         cur = session.cursor(snowflake.connector.DictCursor)
+        cursors[session] = cur
+    return cur
+
+
+def current_role(session) -> Optional[str]:
+    """
+    The connection's current role. The connector updates it from every response, so it also reflects
+    role changes made outside titan.
+    """
+    return getattr(session, "role", None)
+
+
+def _in_role(session, role: str) -> bool:
+    current = current_role(session)
+    if current is None:
+        return False
+    if role.startswith('"') and role.endswith('"'):
+        return current == role[1:-1]
+    return current == role.upper()
+
+
+_role_locks: WeakKeyDictionary = WeakKeyDictionary()
+_role_locks_lock = threading.Lock()
+
+
+def _role_lock(session):
+    """
+    A lock per connection held across a role switch and the statement it's for, so threads sharing a
+    connection can't switch its role out from under each other. Sharing a connection still serializes
+    every statement that needs a role, give each worker its own connection with a ConnectionPool instead.
+    """
+    with _role_locks_lock:
+        try:
+            lock = _role_locks.get(session)
+            if lock is None:
+                lock = _role_locks[session] = threading.Lock()
+        except TypeError:
+            return nullcontext()
+    return lock
+
+
+def _session_and_cursor(conn_or_cursor):
+    if isinstance(conn_or_cursor, SnowflakeConnection):
+        return conn_or_cursor, _cursor_for(conn_or_cursor)
     elif isinstance(conn_or_cursor, SnowflakeCursor):
-        session = conn_or_cursor.connection
-        cur = conn_or_cursor
-        cur._use_dict_result = True
+        conn_or_cursor._use_dict_result = True
+        return conn_or_cursor.connection, conn_or_cursor
     else:
         # Undocumented snowpark-specific type snowflake.connector.connection.StoredProcConnection
         # raise Exception(f"Unknown connection type: {type(conn_or_cursor)}, {conn_or_cursor}")
-        session = conn_or_cursor
-        cur = session.cursor(snowflake.connector.DictCursor)
+        return conn_or_cursor, _cursor_for(conn_or_cursor)
+
+
+def _run(conn_or_cursor, sql_text: str, use_role: Optional[str], num_statements: int = 1) -> list:
+    """
+    Execute `sql_text` after switching to `use_role`, skipping the switch when the connection is already
+    in that role. Returns one result list per statement.
+    """
+    session, cur = _session_and_cursor(conn_or_cursor)
+
+    # Building records walks the stack, skip it entirely when nobody is listening
+    instrumented = bool(_query_hooks)
+    caller = _calling_function() if instrumented else None
+    with _role_lock(session) if use_role is not None else nullcontext():
+        role = use_role or current_role(session)
+        switch_role = use_role is not None and not _in_role(session, use_role)
+        statement = f"USE ROLE {use_role}" if switch_role else sql_text
+        try:
+            if switch_role:
+                start = time.perf_counter()
+                cur.execute(statement)
+                if instrumented:
+                    _emit(session, statement, role, 0, time.perf_counter() - start, None, caller)
+                statement = sql_text
+            start = time.perf_counter()
+            if num_statements > 1:
+                results = [cur.execute(statement, num_statements=num_statements).fetchall()]
+                while cur.nextset():
+                    results.append(cur.fetchall())
+            else:
+                results = [cur.execute(statement).fetchall()]
+            if instrumented:
+                rows = sum(len(result) for result in results)
+                _emit(session, statement, role, rows, time.perf_counter() - start, None, caller)
+            return results
+        except ProgrammingError as err:
+            # if err.errno == ACCESS_CONTROL_ERR:
+            #     raise Exception(f"Access control error: {err.msg}")
+            if instrumented:
+                _emit(session, statement, role, None, time.perf_counter() - start, err.errno, caller)
+            raise ProgrammingError(f"failed to execute sql, [{sql_text}]", errno=err.errno) from err
+
+
+def _execute(conn_or_cursor: Union[SnowflakeConnection, SnowflakeCursor, ConnectionPool], sql, use_role=None) -> list:
+    if isinstance(sql, str):
+        sql_text = sql
+    elif isinstance(sql, SQL):
+        sql_text = str(sql)
+        use_role = use_role or sql.use_role
+
+    if isinstance(conn_or_cursor, ConnectionPool):
+        with conn_or_cursor.connection(use_role) as conn:
+            return _run(conn, sql_text, None)[0]
+    return _run(conn_or_cursor, sql_text, use_role)[0]
+
+
+def execute_batch(session, statements: list, use_role=None) -> List[list]:
+    """
+    Execute several statements in one request using MULTI_STATEMENT_COUNT, and return one result list per
+    statement. Snowflake stops at the first statement that fails, and the whole batch raises.
+    """
+    sql_texts = [str(sql) for sql in statements]
+    if not sql_texts:
+        return []
+    if isinstance(session, ConnectionPool):
+        with session.connection(use_role) as conn:
+            return execute_batch(conn, sql_texts)
+    if len(sql_texts) == 1:
+        return _run(session, sql_texts[0], use_role)
+    return _run(session, ";\n".join(sql_texts), use_role, num_statements=len(sql_texts))
+
+
+def _percentile(sorted_values: list, pct: float) -> float:
+    # Nearest-rank percentile
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(-(-pct * len(sorted_values) // 100)))
+    return sorted_values[rank - 1]
+
+
+class QueryStats:
+    """
+    A query hook that aggregates records per SQL fingerprint. `report()` lists each fingerprint with its
+    count, errors, total time and p50/p95/p99 latency, slowest in total first.
+    """
+
+    def __init__(self):
+        self._latencies = defaultdict(list)
+        self._errors = defaultdict(int)
+        self._callers = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def __call__(self, record: QueryRecord) -> None:
+        with self._lock:
+            self._latencies[record.fingerprint].append(record.latency)
+            if record.error_code is not None:
+                self._errors[record.fingerprint] += 1
+            if record.caller:
+                self._callers[record.fingerprint].add(record.caller)
+
+    def __len__(self):
+        return sum(len(latencies) for latencies in self._latencies.values())
+
+    def report(self) -> List[dict]:
+        with self._lock:
+            rows = []
+            for fingerprint, latencies in self._latencies.items():
+                latencies = sorted(latencies)
+                rows.append(
+                    {
+                        "fingerprint": fingerprint,
+                        "callers": sorted(self._callers[fingerprint]),
+                        "count": len(latencies),
+                        "errors": self._errors[fingerprint],
+                        "total": sum(latencies),
+                        "p50": _percentile(latencies, 50),
+                        "p95": _percentile(latencies, 95),
+                        "p99": _percentile(latencies, 99),
+                    }
+                )
+        return sorted(rows, key=lambda row: row["total"], reverse=True)
+
+    def print_report(self, limit: int = 20) -> None:
+        report = self.report()
+        print(f"{len(self)} queries, {len(report)} distinct, {sum(row['total'] for row in report):.2f}s total")
+        for row in report[:limit]:
+            print(
+                f"  {row['count']:>6} x {row['total']:>8.2f}s "
+                f"p50={row['p50']:.3f}s p95={row['p95']:.3f}s p99={row['p99']:.3f}s "
+                f"err={row['errors']} [{', '.join(row['callers'])}] {row['fingerprint']}"
+            )
+
+
+RESULT_CACHE_TTL = 300
+RESULT_CACHE_MAX_ENTRIES = 512
+
+
+def _normalize_sql(sql_text: str) -> str:
+    # Collapse whitespace outside of string literals
+    sql_text = re.sub(r"('(?:[^']|'')*')|\s+", lambda m: m.group(1) or " ", sql_text)
+    return sql_text.strip(" ;")
+
+
+def _match_resource_type(words: list) -> Optional[ResourceType]:
+    for length in (3, 2, 1):
+        if len(words) < length:
+            continue
+        phrase = " ".join(words[: length - 1] + [singularize(words[length - 1])])
+        try:
+            return ResourceType(phrase)
+        except ValueError:
+            continue
+    return None
+
+
+def _object_type_for_sql(sql_text: str) -> Optional[ResourceType]:
+    """
+    Best-effort guess of the object type a SHOW or DESC statement reads from, eg.
+        SHOW USERS                     => USER
+        SHOW USER FUNCTIONS IN ACCOUNT => FUNCTION
+        DESC DYNAMIC TABLE foo         => DYNAMIC TABLE
+    """
+    words = sql_text.upper().split(" ")
+    if words[:4] == ["SHOW", "GRANTS", "OF", "ROLE"]:
+        return ResourceType.ROLE_GRANT
+    if words[0] == "SHOW":
+        words = words[1:]
+        if words[:1] == ["TERSE"]:
+            words = words[1:]
+        if words[:2] in (["USER", "FUNCTIONS"], ["USER", "PROCEDURES"]):
+            words = words[1:]
+        return _match_resource_type(words[:3])
+    if words[0] in ("DESC", "DESCRIBE"):
+        return _match_resource_type(words[1:4])
+    return None
+
+
+class ResultCache:
+    """
+    Query result cache for a single connection, keyed by the active role and normalized SQL text.
+
+    Entries expire after `ttl` seconds and the least recently used entry is evicted once the cache holds
+    more than `max_entries` results. Every entry is tagged with the object type it reads so that DDL
+    against that type can invalidate it.
+    """
+
+    def __init__(self, ttl: float = RESULT_CACHE_TTL, max_entries: int = RESULT_CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict = OrderedDict()
+        self._key_locks: dict = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, _, result = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return result
+
+    def _put(self, key, object_type, result):
+        with self._lock:
+            self.misses += 1
+            self._entries[key] = (time.monotonic() + self.ttl, object_type, result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_or_execute(self, role: str, sql_text: str, fn) -> list:
+        normalized = _normalize_sql(sql_text)
+        key = (role, normalized)
+        result = self._get(key)
+        if result is not None:
+            return list(result)
+
+        # Concurrent callers of the same query wait for the first one instead of all going to Snowflake
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            result = self._get(key)
+            if result is None:
+                result = fn()
+                self._put(key, _object_type_for_sql(normalized), result)
+        with self._lock:
+            self._key_locks.pop(key, None)
+        return list(result)
+
+    def invalidate(self, resource_type: ResourceType = None):
+        """
+        Drop cached results for `resource_type`, along with any results whose object type is unknown.
+        With no resource type, drop everything.
+        """
+        with self._lock:
+            if resource_type is None:
+                self._entries.clear()
+                return
+            for key, (_, object_type, _) in list(self._entries.items()):
+                if object_type is None or object_type == resource_type:
+                    del self._entries[key]
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries)}
+
+
+_result_caches: WeakKeyDictionary = WeakKeyDictionary()
+_result_caches_lock = threading.Lock()
+
+
+def _connection_for(session):
+    if isinstance(session, SnowflakeCursor):
+        return session.connection
+    return session
+
+
+def result_cache(session) -> ResultCache:
+    conn = _connection_for(session)
+    with _result_caches_lock:
+        if conn not in _result_caches:
+            _result_caches[conn] = ResultCache()
+        return _result_caches[conn]
+
+
+def invalidate_cache(session, resource_type: ResourceType = None) -> None:
+    conn = _connection_for(session)
+    with _result_caches_lock:
+        cache = _result_caches.get(conn)
+    if cache is not None:
+        cache.invalidate(resource_type)
+
 
-    try:
-        if use_role:
-            print(f"[{session.user}:{session.role}] >", f"USE ROLE {use_role}")
-            cur.execute(f"USE ROLE {use_role}")
-        print(f"[{session.user}:{session.role}] >", sql_text, end="")
-        start = time.time()
-        result = cur.execute(sql_text).fetchall()
-        print(f"    \033[94m({len(result)} rows, {time.time() - start:.2f}s)\033[0m", flush=True)
-        return result
-    except ProgrammingError as err:
-        # if err.errno == ACCESS_CONTROL_ERR:
-        #     raise Exception(f"Access control error: {err.msg}")
-        print(f"    \033[31m(err {err.errno}, {time.time() - start:.2f}s)\033[0m", flush=True)
-        raise ProgrammingError(f"failed to execute sql, [{sql_text}]", errno=err.errno) from err
-
-
-# TODO: fix this
-# @lru_cache
 def _execute_cached(session, sql, use_role=None) -> list:
-    return _execute(session, sql, use_role)
+    if isinstance(sql, SQL):
+        use_role = use_role or sql.use_role
+    role = use_role or getattr(_connection_for(session), "role", None)
+    return result_cache(session).get_or_execute(role, str(sql), lambda: _execute(session, sql, use_role))
 
 
 def execute(session, sql, use_role=None, cacheable=False) -> list:
@@ -1,14 +1,18 @@
 import json
 import sys
+import threading
 
 from collections import defaultdict
+from contextlib import contextmanager
 from functools import cache
+from typing import Optional
+from weakref import WeakKeyDictionary
 
 from inflection import pluralize
 
 from snowflake.connector.errors import ProgrammingError
 
-from .client import execute, DOEST_NOT_EXIST_ERR, UNSUPPORTED_FEATURE
+from .client import execute, execute_batch, _connection_for, DOEST_NOT_EXIST_ERR, UNSUPPORTED_FEATURE
 from .enums import ResourceType
 from .identifiers import URN, FQN
 from .parse import (
@@ -18,6 +22,7 @@ from .parse import (
     parse_identifier,
     parse_function_name,
 )
+from .state import fingerprint
 
 
 __this__ = sys.modules[__name__]
@@ -141,6 +146,374 @@ def remove_none_values(d):
     return {k: v for k, v in d.items() if v is not None}
 
 
+def _snapshot_key(*parts) -> tuple:
+    # Matches the case-insensitivity of SHOW ... LIKE
+    return tuple(part.strip('"').upper() for part in parts)
+
+
+# The SHOW listing each resource type, the SHOW ... LIKE that looks up a single object of it, and the SHOW
+# columns that make up each row's FQN. Objects in a database are listed one database at a time, tables one
+# schema at a time.
+SNAPSHOT_QUERIES = {
+    ResourceType.DATABASE: ("SHOW DATABASES", "SHOW DATABASES LIKE '{name}'", ("name",)),
+    ResourceType.ROLE: ("SHOW ROLES", "SHOW ROLES LIKE '{name}'", ("name",)),
+    ResourceType.SCHEMA: (
+        "SHOW SCHEMAS IN DATABASE {database}",
+        "SHOW SCHEMAS LIKE '{name}' IN DATABASE {database}",
+        ("database_name", "name"),
+    ),
+    ResourceType.SEQUENCE: (
+        "SHOW SEQUENCES IN DATABASE {database}",
+        "SHOW SEQUENCES LIKE '{name}' IN SCHEMA {database}.{schema}",
+        ("database_name", "schema_name", "name"),
+    ),
+    ResourceType.TABLE: (
+        "SHOW TABLES IN SCHEMA {database}.{schema}",
+        "SHOW TABLES LIKE '{name}' IN SCHEMA {database}.{schema}",
+        ("database_name", "schema_name", "name"),
+    ),
+    ResourceType.USER: ("SHOW USERS", "SHOW USERS LIKE '{name}'", ("name",)),
+    ResourceType.WAREHOUSE: ("SHOW WAREHOUSES", "SHOW WAREHOUSES LIKE '{name}'", ("name",)),
+}
+
+# SHOW returns at most this many rows, a listing that reaches it may be missing objects
+SHOW_ROW_LIMIT = 10000
+
+
+class Snapshot:
+    """
+    An in-memory index of account metadata, shared by every fetch_* call made while it is active.
+
+    Each index is loaded lazily, once, the first time a fetch needs it. For SHOW results that means a
+    single `SHOW <TYPE>S` per resource type, or per database or schema for objects in one, instead of a
+    `SHOW ... LIKE` per object. A listing that is cut off at SHOW_ROW_LIMIT, or that fails, only answers for
+    the objects it lists; anything else is looked up with `SHOW ... LIKE`.
+    """
+
+    def __init__(self, session):
+        self._session = session
+        self._loaded = {}
+        self._locks = {}
+        self._lock = threading.Lock()
+        self._expected = defaultdict(list)
+
+    def expect(self, urns: list) -> None:
+        """
+        Declare the objects about to be fetched. Bulk loads that would otherwise cover every object in the
+        account, like tag lookups, are limited to these.
+        """
+        with self._lock:
+            for urn in urns:
+                self._expected[urn.resource_type].append(urn.fqn)
+
+    def expected(self, resource_type: ResourceType) -> list:
+        return self._expected.get(resource_type, [])
+
+    def load(self, key, loader):
+        """Return the result of `loader()`, calling it at most once per snapshot for a given key."""
+        if key in self._loaded:
+            return self._loaded[key]
+        with self._lock:
+            key_lock = self._locks.setdefault(key, threading.Lock())
+        with key_lock:
+            if key not in self._loaded:
+                self._loaded[key] = loader()
+        return self._loaded[key]
+
+    def _listing(self, resource_type: ResourceType, database: Optional[str], schema: Optional[str]) -> tuple:
+        show_sql, _, key_columns = SNAPSHOT_QUERIES[resource_type]
+
+        def _index():
+            index = defaultdict(list)
+            try:
+                rows = execute(self._session, show_sql.format(database=database, schema=schema))
+            except ProgrammingError:
+                return index, False
+            for row in rows:
+                index[_snapshot_key(*[row[col] for col in key_columns])].append(row)
+            return index, len(rows) < SHOW_ROW_LIMIT
+
+        scope = _snapshot_key(*[part for part in (database, schema) if part])
+        return self.load((resource_type, scope), _index)
+
+    def show_index(
+        self, resource_type: ResourceType, database: Optional[str] = None, schema: Optional[str] = None
+    ) -> dict:
+        """
+        The rows of the SHOW listing for a resource type, keyed by FQN. Objects in a database or schema are
+        listed for that `database` or `schema` only. The index may be incomplete, see show_rows.
+        """
+        index, _ = self._listing(resource_type, database, schema)
+        return index
+
+    def show_rows(self, resource_type: ResourceType, fqn: FQN) -> list:
+        """
+        The SHOW rows for one object, from its listing. When the listing is incomplete an object missing from
+        it may still exist, so it is looked up with `SHOW ... LIKE` instead.
+        """
+        index, complete = self._listing(resource_type, *_show_scope(resource_type, fqn))
+        key = _show_key(resource_type, fqn)
+        if key in index or complete:
+            return index.get(key, [])
+
+        _, like_sql, key_columns = SNAPSHOT_QUERIES[resource_type]
+
+        def _lookup():
+            rows = execute(self._session, like_sql.format(database=fqn.database, schema=fqn.schema, name=fqn.name))
+            return [row for row in rows if _snapshot_key(*[row[col] for col in key_columns]) == key]
+
+        return self.load(("show_like", resource_type, key), _lookup)
+
+
+def _show_scope(resource_type: ResourceType, fqn: FQN) -> tuple:
+    """The (database, schema) a resource type's SHOW listing is scoped to, None for parts it isn't scoped to"""
+    show_sql, _, _ = SNAPSHOT_QUERIES[resource_type]
+    if "{schema}" in show_sql:
+        return (fqn.database, fqn.schema)
+    if "{database}" in show_sql:
+        return (fqn.database, None)
+    return (None, None)
+
+
+def _show_key(resource_type: ResourceType, fqn: FQN) -> tuple:
+    _, _, key_columns = SNAPSHOT_QUERIES[resource_type]
+    fqn_parts = {"database_name": fqn.database, "schema_name": fqn.schema, "name": fqn.name}
+    return _snapshot_key(*[fqn_parts[col] or "" for col in key_columns])
+
+
+class RoleGrants:
+    """The rows of `SHOW GRANTS TO ROLE`, indexed by the object each privilege is granted on."""
+
+    def __init__(self, rows: list):
+        self.rows = rows
+        self._on = defaultdict(list)
+        for row in rows:
+            self._on[(row["granted_on"], row["name"])].append(row)
+
+    def on(self, granted_on: str, name: str) -> list:
+        return self._on.get((granted_on, name), [])
+
+
+def _show_grants_to_role(session, role: str) -> Optional[RoleGrants]:
+    """
+    Returns None if the role does not exist. While a snapshot is active, each role's grants are
+    fetched once and shared by fetch_grant and fetch_role_grants.
+    """
+
+    def _load():
+        try:
+            return RoleGrants(execute(session, f"SHOW GRANTS TO ROLE {role}"))
+        except ProgrammingError as err:
+            if err.errno == DOEST_NOT_EXIST_ERR:
+                return None
+            raise
+
+    snap = _active_snapshot(session)
+    if snap is None:
+        return _load()
+    return snap.load(("grants_to_role", _snapshot_key(role)), _load)
+
+
+_snapshots: WeakKeyDictionary = WeakKeyDictionary()
+
+
+@contextmanager
+def snapshot(session):
+    """
+    Serve fetch_* calls on this session from a shared Snapshot for the duration of the block.
+    Nested blocks reuse the outer snapshot.
+    """
+    conn = _connection_for(session)
+    if conn in _snapshots:
+        yield _snapshots[conn]
+        return
+    snap = Snapshot(session)
+    _snapshots[conn] = snap
+    try:
+        yield snap
+    finally:
+        del _snapshots[conn]
+
+
+def _active_snapshot(session) -> Optional[Snapshot]:
+    return _snapshots.get(_connection_for(session))
+
+
+def expect(session, urns: list) -> None:
+    """Declare the objects about to be fetched to the active snapshot, if there is one."""
+    snap = _active_snapshot(session)
+    if snap is not None:
+        snap.expect(urns)
+
+
+def _show(session, resource_type: ResourceType, fqn: FQN, show_sql: str, cacheable: bool = False) -> list:
+    snap = _active_snapshot(session)
+    if snap is not None and resource_type in SNAPSHOT_QUERIES:
+        return snap.show_rows(resource_type, fqn)
+    return execute(session, show_sql, cacheable=cacheable)
+
+
+PARAMETER_QUERIES = {
+    ResourceType.DATABASE: "SHOW PARAMETERS IN DATABASE {fqn}",
+    ResourceType.SCHEMA: "SHOW PARAMETERS IN SCHEMA {fqn}",
+    ResourceType.WAREHOUSE: "SHOW PARAMETERS FOR WAREHOUSE {fqn}",
+}
+
+# SHOW PARAMETERS statements sent in each multi-statement request
+PARAMETERS_BATCH_SIZE = 100
+
+
+def _quote_identifier(name: str) -> str:
+    # Names from SHOW output are exact, quoting keeps their case and any special characters
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _parameters_in(snap: Snapshot, session, resource_type: ResourceType, database: Optional[str]) -> dict:
+    """
+    Typed parameters for the objects of a resource type the snapshot expects to fetch, or for those of its
+    schemas in a database, keyed by the requested FQN. Only objects found in the snapshot's SHOW listings are
+    included, their SHOW PARAMETERS statements name them as listed and are sent as multi-statement requests.
+    """
+    fqns, statements = [], []
+    for fqn in snap.expected(resource_type):
+        if database is not None and _snapshot_key(fqn.database or "") != _snapshot_key(database):
+            continue
+        try:
+            rows = snap.show_rows(resource_type, fqn)
+        except ProgrammingError:
+            continue
+        # Objects that don't exist, or that can't be told apart by case, are fetched one at a time
+        if len(rows) != 1:
+            continue
+        row = rows[0]
+        if resource_type == ResourceType.DATABASE and row["kind"] != "STANDARD":
+            continue
+        if resource_type == ResourceType.SCHEMA and row["name"] == "INFORMATION_SCHEMA":
+            continue
+        parts = [row["database_name"], row["name"]] if resource_type == ResourceType.SCHEMA else [row["name"]]
+        fqns.append(fqn)
+        statements.append(PARAMETER_QUERIES[resource_type].format(fqn=".".join(map(_quote_identifier, parts))))
+
+    params = {}
+    for i in range(0, len(statements), PARAMETERS_BATCH_SIZE):
+        try:
+            results = execute_batch(session, statements[i : i + PARAMETERS_BATCH_SIZE])
+        except ProgrammingError:
+            # The whole request fails with any one statement, those objects are fetched one at a time instead
+            continue
+        for fqn, result in zip(fqns[i : i + PARAMETERS_BATCH_SIZE], results):
+            params[fqn] = params_result_to_dict(result)
+    return params
+
+
+def fetch_parameters(session, resource_type: ResourceType, fqn: FQN) -> dict:
+    """
+    The parameters of a database, schema or warehouse as typed by params_result_to_dict. While a snapshot is
+    active, parameters are read at once for every object of the type the snapshot expects to fetch.
+    """
+    snap = _active_snapshot(session)
+    if snap is not None:
+        database = fqn.database if resource_type == ResourceType.SCHEMA else None
+        params = snap.load(
+            ("parameters", resource_type, database and _snapshot_key(database)),
+            lambda: _parameters_in(snap, session, resource_type, database),
+        )
+        if fqn in params:
+            return params[fqn]
+    return params_result_to_dict(execute(session, PARAMETER_QUERIES[resource_type].format(fqn=fqn)))
+
+
+# Resource types whose created/last_altered timestamps are listed in information_schema.tables
+TABLE_LIKE_TYPES = (ResourceType.DYNAMIC_TABLE, ResourceType.TABLE, ResourceType.VIEW)
+
+# Resource types whose change markers come from a database's information_schema
+CHANGE_TRACKED_TYPES = (ResourceType.DATABASE, ResourceType.SCHEMA, *TABLE_LIKE_TYPES)
+
+
+def _change_markers_in(session, database: str) -> Optional[dict]:
+    """
+    created/last_altered for a database and every schema, table and view in it from one query, keyed by
+    (resource type, FQN). Returns None if the database's information_schema can't be read.
+    """
+    try:
+        rows = execute(
+            session,
+            f"""
+            SELECT 'DATABASE' AS kind, NULL AS object_schema, database_name AS object_name, created, last_altered
+            FROM {database}.information_schema.databases
+            UNION ALL
+            SELECT 'SCHEMA' AS kind, NULL AS object_schema, schema_name AS object_name, created, last_altered
+            FROM {database}.information_schema.schemata
+            WHERE schema_name != 'INFORMATION_SCHEMA'
+            UNION ALL
+            SELECT 'TABLE', table_schema, table_name, created, last_altered
+            FROM {database}.information_schema.tables
+            WHERE table_schema != 'INFORMATION_SCHEMA'""",
+        )
+    except ProgrammingError:
+        return None
+    markers = {}
+    for row in rows:
+        key = _snapshot_key(*[part for part in (row["OBJECT_SCHEMA"], row["OBJECT_NAME"]) if part])
+        # information_schema.databases lists every database in the account, only this one belongs here
+        if row["KIND"] == "DATABASE" and key != _snapshot_key(database):
+            continue
+        markers[(row["KIND"], key)] = f"{row['CREATED']}/{row['LAST_ALTERED']}"
+    return markers
+
+
+def _database_change_markers(snap, session, database: str) -> Optional[dict]:
+    return snap.load(
+        ("change_markers", _snapshot_key(database)),
+        lambda: _change_markers_in(session, database),
+    )
+
+
+def fetch_change_marker(session, urn: URN) -> Optional[str]:
+    """
+    A value that moves whenever the object behind a URN is created, dropped or altered, read from one bulk
+    listing per resource type or database. Returns "" for objects that don't exist, and None when no
+    snapshot is active or the resource type isn't tracked.
+    """
+    snap = _active_snapshot(session)
+    if snap is None:
+        return None
+    resource_type, fqn = urn.resource_type, urn.fqn
+
+    if resource_type == ResourceType.WAREHOUSE:
+        rows = snap.show_rows(resource_type, fqn)
+        return f"{rows[0]['created_on']}/{rows[0]['updated_on']}" if rows else ""
+
+    if resource_type == ResourceType.DATABASE:
+        markers = _database_change_markers(snap, session, fqn.name)
+        if markers is None:
+            return None
+        return markers.get(("DATABASE", _snapshot_key(fqn.name)), "")
+
+    if (resource_type == ResourceType.SCHEMA or resource_type in TABLE_LIKE_TYPES) and fqn.database:
+        markers = _database_change_markers(snap, session, fqn.database)
+        if markers is None:
+            return None
+        kind = "SCHEMA" if resource_type == ResourceType.SCHEMA else "TABLE"
+        return markers.get((kind, _snapshot_key(*[part for part in (fqn.schema, fqn.name) if part])), "")
+
+    return None
+
+
+def fetch_subtree_marker(session, urn: URN) -> Optional[str]:
+    """
+    A value that moves whenever a database, or any schema, table or view in it, is created, dropped or
+    altered. Returns None when no snapshot is active or the database's information_schema can't be read.
+    """
+    snap = _active_snapshot(session)
+    if snap is None or urn.resource_type != ResourceType.DATABASE:
+        return None
+    markers = _database_change_markers(snap, session, urn.fqn.name)
+    if markers is None:
+        return None
+    return fingerprint(sorted(f"{kind}:{key}={marker}" for (kind, key), marker in markers.items()))
+
+
 def fetch_resource(session, urn: URN):
     return getattr(__this__, f"fetch_{urn.resource_label}")(session, urn.fqn)
 
@@ -227,7 +600,93 @@ def fetch_alert(session, fqn: FQN):
     }
 
 
+# information_schema.columns data types that DESC reports unchanged
+PLAIN_COLUMN_TYPES = ("ARRAY", "BOOLEAN", "DATE", "FLOAT", "GEOGRAPHY", "GEOMETRY", "OBJECT", "VARIANT")
+
+
+def _column_type(row) -> Optional[str]:
+    """
+    Rebuild the type DESC would report from an information_schema.columns row, eg NUMBER(38,0). Returns None
+    for types that can't be rebuilt from the row, like VECTOR.
+    """
+    data_type = row["DATA_TYPE"]
+    if data_type == "TEXT":
+        return f"VARCHAR({row['CHARACTER_MAXIMUM_LENGTH']})"
+    if data_type == "BINARY":
+        return f"BINARY({row['CHARACTER_MAXIMUM_LENGTH']})"
+    if data_type == "NUMBER":
+        return f"NUMBER({row['NUMERIC_PRECISION']},{row['NUMERIC_SCALE']})"
+    if data_type == "TIME" or data_type.startswith("TIMESTAMP"):
+        return f"{data_type}({row['DATETIME_PRECISION']})"
+    if data_type in PLAIN_COLUMN_TYPES:
+        return data_type
+    return None
+
+
+def _exact_identifier(identifier: str) -> str:
+    """The name Snowflake resolves an identifier to: quoted identifiers as written, others upper-cased"""
+    if identifier.startswith('"') and identifier.endswith('"'):
+        return identifier[1:-1].replace('""', '"')
+    return identifier.upper()
+
+
+def _columns_in_database(session, database: str) -> dict:
+    """
+    Every column of every table, view and dynamic table in a database from a single
+    information_schema.columns query, grouped by their exact (schema, table) names in ordinal order.
+
+    Objects with a column whose DESC output can't be rebuilt from information_schema, identity columns and
+    types like VECTOR, map to None and are described with DESC instead.
+    """
+    try:
+        rows = execute(
+            session,
+            f"""
+            SELECT
+                table_schema, table_name, column_name, ordinal_position, data_type, is_nullable,
+                column_default, is_identity, comment, character_maximum_length, numeric_precision,
+                numeric_scale, datetime_precision
+            FROM {database}.information_schema.columns
+            WHERE table_schema != 'INFORMATION_SCHEMA'
+            ORDER BY table_schema, table_name, ordinal_position""",
+        )
+    except ProgrammingError:
+        # Objects that can't be seen through information_schema fall back to DESC
+        return {}
+    columns = defaultdict(list)
+    for row in rows:
+        key = (row["TABLE_SCHEMA"], row["TABLE_NAME"])
+        data_type = _column_type(row)
+        if data_type is None or row["IS_IDENTITY"] == "YES":
+            columns[key] = None
+        if columns[key] is None:
+            continue
+        columns[key].append(
+            remove_none_values(
+                {
+                    "name": row["COLUMN_NAME"],
+                    "data_type": data_type,
+                    "nullable": row["IS_NULLABLE"] == "YES",
+                    "default": row["COLUMN_DEFAULT"],
+                    "comment": row["COMMENT"] or None,
+                }
+            )
+        )
+    return columns
+
+
 def fetch_columns(session, resource_type: str, fqn: FQN):
+    snap = _active_snapshot(session)
+    if snap is not None and fqn.database and fqn.schema:
+        # While a snapshot is active, columns for a whole database come from one query instead of a DESC per object
+        database_columns = snap.load(
+            ("columns", _snapshot_key(fqn.database)),
+            lambda: _columns_in_database(session, fqn.database),
+        )
+        columns = database_columns.get((_exact_identifier(fqn.schema), _exact_identifier(fqn.name)))
+        if columns is not None:
+            return columns
+
     desc_result = execute(session, f"DESC {resource_type} {fqn}")
     columns = []
     for col in desc_result:
@@ -248,7 +707,7 @@ def fetch_columns(session, resource_type: str, fqn: FQN):
 
 
 def fetch_database(session, fqn: FQN):
-    show_result = execute(session, f"SHOW DATABASES LIKE '{fqn.name}'", cacheable=True)
+    show_result = _show(session, ResourceType.DATABASE, fqn, f"SHOW DATABASES LIKE '{fqn.name}'", cacheable=True)
 
     if len(show_result) == 0:
         return None
@@ -258,8 +717,7 @@ def fetch_database(session, fqn: FQN):
         return None
 
     options = options_result_to_list(show_result[0]["options"])
-    show_params_result = execute(session, f"SHOW PARAMETERS IN DATABASE {fqn.name}")
-    params = params_result_to_dict(show_params_result)
+    params = fetch_parameters(session, ResourceType.DATABASE, fqn)
 
     return {
         "name": show_result[0]["name"],
@@ -373,19 +831,12 @@ def fetch_future_grant(session, fqn: FQN):
 
 
 def fetch_grant(session, fqn: FQN):
-    try:
-        show_result = execute(session, f"SHOW GRANTS TO ROLE {fqn.name}")
-    except ProgrammingError as err:
-        if err.errno == DOEST_NOT_EXIST_ERR:
-            return None
-        raise
-    granted_on = fqn.params["type"]
-    name = fqn.params["on"]
+    role_grants = _show_grants_to_role(session, fqn.name)
+    if role_grants is None:
+        return None
     grantee_name = fqn.name
     grants = _filter_result(
-        show_result,
-        granted_on=granted_on,
-        name=name,
+        role_grants.on(fqn.params["type"], fqn.params["on"]),
         grantee_name=grantee_name,
     )
 
@@ -480,32 +931,44 @@ def fetch_procedure(session, fqn: FQN):
 
 
 def fetch_role_grants(session, role: str):
+    """
+    Returns a map of principal URN => privileges held by `role` on that principal.
+    """
     if role in ["ACCOUNTADMIN", "ORGADMIN", "SECURITYADMIN"]:
         return {}
-    show_result = execute(session, f"SHOW GRANTS TO ROLE {role}")
-    session_ctx = fetch_session(session)
 
-    priv_map = defaultdict(list)
+    def _load():
+        role_grants = _show_grants_to_role(session, role)
+        if role_grants is None:
+            return {}
+        session_ctx = fetch_session(session)
+
+        priv_map = defaultdict(list)
+
+        for row in role_grants.rows:
+            try:
+                urn = _urn_from_grant(row, session_ctx)
+            except ValueError:
+                # Grant for a Snowflake resource type that Titan doesn't support yet
+                continue
+            priv_map[str(urn)].append(
+                {
+                    "priv": row["privilege"],
+                    "grant_option": row["grant_option"] == "true",
+                    "owner": row["granted_by"],
+                }
+            )
 
-    for row in show_result:
-        try:
-            urn = _urn_from_grant(row, session_ctx)
-        except ValueError:
-            # Grant for a Snowflake resource type that Titan doesn't support yet
-            continue
-        priv_map[str(urn)].append(
-            {
-                "priv": row["privilege"],
-                "grant_option": row["grant_option"] == "true",
-                "owner": row["granted_by"],
-            }
-        )
+        return dict(priv_map)
 
-    return dict(priv_map)
+    snap = _active_snapshot(session)
+    if snap is None:
+        return _load()
+    return snap.load(("role_grants", _snapshot_key(role)), _load)
 
 
 def fetch_role(session, fqn: FQN):
-    show_result = execute(session, f"SHOW ROLES LIKE '{fqn.name}'", cacheable=True)
+    show_result = _show(session, ResourceType.ROLE, fqn, f"SHOW ROLES LIKE '{fqn.name}'", cacheable=True)
 
     if len(show_result) == 0:
         return None
@@ -557,7 +1020,12 @@ def fetch_schema(session, fqn: FQN):
     if fqn.database is None:
         raise Exception(f"Schema fqn must have a database {fqn}")
     try:
-        show_result = execute(session, f"SHOW SCHEMAS LIKE '{fqn.name}' IN DATABASE {fqn.database}")
+        show_result = _show(
+            session,
+            ResourceType.SCHEMA,
+            fqn,
+            f"SHOW SCHEMAS LIKE '{fqn.name}' IN DATABASE {fqn.database}",
+        )
     except ProgrammingError:
         return None
 
@@ -569,8 +1037,7 @@ def fetch_schema(session, fqn: FQN):
     data = show_result[0]
 
     options = options_result_to_list(data["options"])
-    show_params_result = execute(session, f"SHOW PARAMETERS IN SCHEMA {fqn}")
-    params = params_result_to_dict(show_params_result)
+    params = fetch_parameters(session, ResourceType.SCHEMA, fqn)
     tags = fetch_resource_tags(session, ResourceType.SCHEMA, fqn)
 
     return {
@@ -587,7 +1054,12 @@ def fetch_schema(session, fqn: FQN):
 
 
 def fetch_sequence(session, fqn: FQN):
-    show_result = execute(session, f"SHOW SEQUENCES LIKE '{fqn.name}' IN SCHEMA {fqn.database}.{fqn.schema}")
+    show_result = _show(
+        session,
+        ResourceType.SEQUENCE,
+        fqn,
+        f"SHOW SEQUENCES LIKE '{fqn.name}' IN SCHEMA {fqn.database}.{fqn.schema}",
+    )
     if len(show_result) == 0:
         return None
     if len(show_result) > 1:
@@ -628,9 +1100,19 @@ def fetch_stage(session, fqn: FQN):
 
 
 def fetch_table(session, fqn: FQN):
-    show_result = execute(session, "SHOW TABLES")
+    if fqn.schema is None:
+        raise Exception(f"Table fqn must have a schema {fqn}")
+    try:
+        show_result = _show(
+            session,
+            ResourceType.TABLE,
+            fqn,
+            f"SHOW TABLES LIKE '{fqn.name}' IN SCHEMA {fqn.database}.{fqn.schema}",
+        )
+    except ProgrammingError:
+        return None
 
-    tables = _filter_result(show_result, name=fqn.name, kind="TABLE")
+    tables = _filter_result(show_result, kind="TABLE")
 
     if len(tables) == 0:
         return None
@@ -649,11 +1131,27 @@ def fetch_table(session, fqn: FQN):
     }
 
 
-def fetch_resource_tags(session, resource_type: ResourceType, fqn: FQN):
-    session_ctx = fetch_session(session)
-    if session_ctx["tag_support"] is False:
-        return None
+# Resource types that carry tags, and the tag_references domain their objects are listed under
+TAG_DOMAINS = {
+    ResourceType.ROLE: "ROLE",
+    ResourceType.SCHEMA: "SCHEMA",
+    ResourceType.TABLE: "TABLE",
+    ResourceType.USER: "USER",
+    ResourceType.WAREHOUSE: "WAREHOUSE",
+}
+
+# Resource types whose objects live in a database, and whose tags are read through that database
+DATABASE_TAG_TYPES = (ResourceType.SCHEMA, ResourceType.TABLE)
+
+# tag_references only takes one object, bulk loads UNION ALL this many calls into each query
+TAG_REFERENCES_BATCH_SIZE = 500
+
+
+def _tag_references_sql(database: str, fqn, domain: str) -> str:
+    return f"SELECT * FROM table({database}.information_schema.tag_references('{fqn}', '{domain}'))"
+
 
+def _tag_map(tag_refs) -> Optional[dict]:
     """
     +----------------------+------------+-------------+-----------+--------+----------------------+---------------+-------------+--------+-------------+
     |     TAG_DATABASE     | TAG_SCHEMA |  TAG_NAME   | TAG_VALUE | LEVEL  |   OBJECT_DATABASE    | OBJECT_SCHEMA | OBJECT_NAME | DOMAIN | COLUMN_NAME |
@@ -663,19 +1161,6 @@ def fetch_resource_tags(session, resource_type: ResourceType, fqn: FQN):
     +----------------------+------------+-------------+-----------+--------+----------------------+---------------+-------------+--------+-------------+
 
     """
-
-    if resource_type != ResourceType.SCHEMA or not isinstance(resource_type, ResourceType):
-        raise NotImplementedError
-
-    tag_refs = execute(
-        session,
-        f"""
-            SELECT *
-            FROM table({fqn.database}.information_schema.tag_references(
-                '{fqn}', '{str(resource_type)}'
-            ))""",
-    )
-
     if len(tag_refs) == 0:
         return None
 
@@ -693,9 +1178,108 @@ def fetch_resource_tags(session, resource_type: ResourceType, fqn: FQN):
     return tag_map
 
 
+def _tag_ref_key(domain: str, database, schema, name) -> tuple:
+    return (domain, _snapshot_key(*[part for part in (database, schema, name) if part]))
+
+
+def _tag_database(session_ctx: dict, resource_type: ResourceType, fqn: FQN) -> str:
+    """
+    The database whose information_schema.tag_references is used for an object. Objects in a database use
+    their own. Account-level objects can be looked up through any database, so they use the database of a tag
+    the session can see, since SHOW TAGS listed it. SNOWFLAKE is only used as a last resort,
+    reading its information_schema requires IMPORTED PRIVILEGES.
+    """
+    if resource_type in DATABASE_TAG_TYPES:
+        return fqn.database
+    databases = [tag.rsplit(".", 2)[0] for tag in session_ctx["tags"]]
+    database = next((db for db in databases if db.upper() != "SNOWFLAKE"), databases[0])
+    return f'"{database}"'
+
+
+def _tag_references_in(snap: Snapshot, session, session_ctx: dict, database: Optional[str]) -> tuple:
+    """
+    Tag assignments for the objects the snapshot expects to fetch, either those in a database or the
+    account-level ones when `database` is None. Only objects the snapshot's SHOW listings confirm exist are
+    included, a single missing object would fail its whole batch. Their tag_references calls are combined
+    into as few queries as possible.
+
+    Returns the keys that were looked up, and the assignments indexed by (domain, object FQN). A batch that
+    fails isn't looked up, its objects are fetched one at a time instead.
+    """
+    calls = []
+    for resource_type, domain in TAG_DOMAINS.items():
+        if (resource_type in DATABASE_TAG_TYPES) != (database is not None):
+            continue
+        for fqn in snap.expected(resource_type):
+            if database is not None and _snapshot_key(fqn.database or "") != _snapshot_key(database):
+                continue
+            try:
+                if not snap.show_rows(resource_type, fqn):
+                    continue
+            except ProgrammingError:
+                continue
+            key = _tag_ref_key(domain, fqn.database, fqn.schema, fqn.name)
+            calls.append((key, _tag_references_sql(_tag_database(session_ctx, resource_type, fqn), fqn, domain)))
+
+    looked_up = set()
+    index = defaultdict(list)
+    for i in range(0, len(calls), TAG_REFERENCES_BATCH_SIZE):
+        batch = calls[i : i + TAG_REFERENCES_BATCH_SIZE]
+        try:
+            tag_refs = execute(session, "\nUNION ALL\n".join(sql for _, sql in batch))
+        except ProgrammingError:
+            continue
+        looked_up.update(key for key, _ in batch)
+        for tag_ref in tag_refs:
+            key = _tag_ref_key(
+                tag_ref["DOMAIN"],
+                tag_ref["OBJECT_DATABASE"],
+                tag_ref["OBJECT_SCHEMA"],
+                tag_ref["OBJECT_NAME"],
+            )
+            index[key].append(tag_ref)
+    return looked_up, index
+
+
+def fetch_resource_tags(session, resource_type: ResourceType, fqn: FQN):
+    """
+    The tags on an object, or None if it has none or they can't be read. While a snapshot is active, tags
+    are read at once for every object the snapshot expects to fetch.
+    """
+    session_ctx = fetch_session(session)
+    if session_ctx["tag_support"] is False:
+        return None
+
+    if not isinstance(resource_type, ResourceType) or resource_type not in TAG_DOMAINS:
+        raise NotImplementedError
+
+    if not session_ctx["tags"]:
+        # No tags exist in the account, so nothing can be tagged
+        return None
+
+    domain = TAG_DOMAINS[resource_type]
+    key = _tag_ref_key(domain, fqn.database, fqn.schema, fqn.name)
+    snap = _active_snapshot(session)
+    if snap is not None:
+        database = fqn.database if resource_type in DATABASE_TAG_TYPES else None
+        looked_up, index = snap.load(
+            ("tag_references", database and _snapshot_key(database)),
+            lambda: _tag_references_in(snap, session, session_ctx, database),
+        )
+        if key in looked_up:
+            return _tag_map(index.get(key, []))
+
+    try:
+        tag_refs = execute(session, _tag_references_sql(_tag_database(session_ctx, resource_type, fqn), fqn, domain))
+    except ProgrammingError:
+        # Tags that can't be read don't fail the whole plan
+        return None
+    return _tag_map(tag_refs)
+
+
 def fetch_user(session, fqn: FQN):
     # SHOW USERS requires the MANAGE GRANTS privilege
-    show_result = execute(session, "SHOW USERS", cacheable=True)  # , use_role="SECURITYADMIN"
+    show_result = _show(session, ResourceType.USER, fqn, "SHOW USERS", cacheable=True)  # , use_role="SECURITYADMIN"
 
     users = _filter_result(show_result, name=fqn.name)
 
@@ -760,7 +1344,7 @@ def fetch_view(session, fqn: FQN):
 
 def fetch_warehouse(session, fqn: FQN):
     try:
-        show_result = execute(session, f"SHOW WAREHOUSES LIKE '{fqn.name}'")
+        show_result = _show(session, ResourceType.WAREHOUSE, fqn, f"SHOW WAREHOUSES LIKE '{fqn.name}'")
     except ProgrammingError:
         return None
 
@@ -771,8 +1355,7 @@ def fetch_warehouse(session, fqn: FQN):
 
     data = show_result[0]
 
-    show_params_result = execute(session, f"SHOW PARAMETERS FOR WAREHOUSE {fqn}")
-    params = params_result_to_dict(show_params_result)
+    params = fetch_parameters(session, ResourceType.WAREHOUSE, fqn)
 
     query_accel = data.get("enable_query_acceleration")
     if query_accel:
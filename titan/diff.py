@@ -1,3 +1,5 @@
+import json
+
 from enum import Enum
 
 
@@ -7,6 +9,14 @@ class DiffAction(Enum):
     CHANGE = "change"
 
 
+def _canonical(item) -> str:
+    """
+    A canonical form of a list entry item, equal for equal items regardless of key order. Any value JSON
+    can't encode is represented by its string form.
+    """
+    return json.dumps(item, sort_keys=True, separators=(",", ":"), default=str)
+
+
 def eq(lhs, rhs, key):
     if key != "args":
         return lhs == rhs
@@ -64,6 +74,10 @@ def diff(original, new):
             yield DiffAction.ADD, key, new[key]
 
     for key in original_keys & new_keys:
+        # Most entries are unchanged, skip them before diffing field by field
+        if original[key] == new[key]:
+            continue
+
         if isinstance(original[key], dict):
             # We don't diff resource pointers
             if new[key].get("_pointer", False):
@@ -73,9 +87,14 @@ def diff(original, new):
             for attr, value in delta.items():
                 yield DiffAction.CHANGE, key, {attr: value}
         elif isinstance(original[key], list):
-            for item in original[key]:
-                if item not in new[key]:
+            # Items are matched by their canonical form, built once per item instead of once per comparison
+            original_items = [(_canonical(item), item) for item in original[key]]
+            new_items = [(_canonical(item), item) for item in new[key]]
+            original_item_keys = {item_key for item_key, _ in original_items}
+            new_item_keys = {item_key for item_key, _ in new_items}
+            for item_key, item in original_items:
+                if item_key not in new_item_keys:
                     yield DiffAction.REMOVE, key, item
-            for item in new[key]:
-                if item not in original[key]:
+            for item_key, item in new_items:
+                if item_key not in original_item_keys:
                     yield DiffAction.ADD, key, item
@@ -1,4 +1,6 @@
+from types import MappingProxyType
 from typing import Optional
+from weakref import WeakValueDictionary
 
 from .enums import ResourceType
 
@@ -7,20 +9,95 @@ def _params_to_str(params: dict) -> str:
     return "&".join([f"{k.lower()}={v}" for k, v in params.items()])
 
 
-class FQN:
-    def __init__(
-        self,
+# Every live FQN and URN, keyed by its parts. Constructing an identifier that's equal to a live one returns
+# that instance instead of building another
+_interned: WeakValueDictionary = WeakValueDictionary()
+
+
+def _intern(key, instance):
+    try:
+        return _interned.setdefault(key, instance)
+    except TypeError:
+        # Identifiers with unhashable param values aren't interned
+        return instance
+
+
+class _Identifier:
+    """Shared behaviour of FQN and URN. Both are immutable, so they can be hashed, interned and cached."""
+
+    __slots__ = ()
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __eq__(self, other):
+        if self is other:
+            return True
+        if type(other) is not type(self):
+            return NotImplemented
+        return self._key == other._key
+
+    def __hash__(self):
+        return self._hash
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def _init(self, key, **attrs):
+        for attr, value in attrs.items():
+            object.__setattr__(self, attr, value)
+        object.__setattr__(self, "_key", key)
+        try:
+            identity = hash(key)
+        except TypeError:
+            identity = hash(str(self))
+        object.__setattr__(self, "_hash", identity)
+
+
+class FQN(_Identifier):
+    __slots__ = ("name", "database", "schema", "arg_types", "params", "_key", "_hash", "__weakref__")
+
+    def __new__(
+        cls,
         name: str,
         database: Optional[str] = None,
         schema: Optional[str] = None,
         arg_types: Optional[list] = None,
         params: dict = {},
-    ) -> None:
-        self.name = name.upper()
-        self.database = database
-        self.schema = schema
-        self.arg_types = arg_types
-        self.params = params
+    ) -> "FQN":
+        name = name.upper()
+        arg_types = tuple(arg_types) if arg_types is not None else None
+        key = (cls, name, database, schema, arg_types or (), tuple(params.items()))
+        fqn = object.__new__(cls)
+        fqn._init(
+            key,
+            name=name,
+            database=database,
+            schema=schema,
+            arg_types=arg_types,
+            params=MappingProxyType(dict(params)),
+        )
+        return _intern(key, fqn)
+
+    def __reduce__(self):
+        return (FQN, (self.name, self.database, self.schema, self.arg_types, dict(self.params)))
+
+    def replace(self, **changes) -> "FQN":
+        """Return an FQN with some of its parts replaced"""
+        parts = {
+            "name": self.name,
+            "database": self.database,
+            "schema": self.schema,
+            "arg_types": self.arg_types,
+            "params": self.params,
+        }
+        return FQN(**(parts | changes))
 
     def __str__(self):
         db = f"{self.database}." if self.database else ""
@@ -36,7 +113,7 @@ class FQN:
         return f"FQN(name={self.name}{db}{schema}{params})"
 
 
-class URN:
+class URN(_Identifier):
     """
     Universal Resource Name
 
@@ -54,14 +131,34 @@ class URN:
                              Fully Qualified Name
     """
 
-    def __init__(self, resource_type: ResourceType, fqn: FQN, account_locator: str) -> None:
+    __slots__ = (
+        "resource_type",
+        "resource_label",
+        "fqn",
+        "account_locator",
+        "organization",
+        "_key",
+        "_hash",
+        "__weakref__",
+    )
+
+    def __new__(cls, resource_type: ResourceType, fqn: FQN, account_locator: str) -> "URN":
         if not isinstance(resource_type, ResourceType):
             raise Exception(f"Invalid resource type: {resource_type}")
-        self.resource_type: ResourceType = resource_type
-        self.resource_label: str = str(resource_type).replace(" ", "_").lower()
-        self.fqn: FQN = fqn
-        self.account_locator: str = account_locator
-        self.organization: str = ""
+        key = (cls, resource_type, fqn, account_locator)
+        urn = object.__new__(cls)
+        urn._init(
+            key,
+            resource_type=resource_type,
+            resource_label=str(resource_type).replace(" ", "_").lower(),
+            fqn=fqn,
+            account_locator=account_locator,
+            organization="",
+        )
+        return _intern(key, urn)
+
+    def __reduce__(self):
+        return (URN, (self.resource_type, self.fqn, self.account_locator))
 
     def __str__(self):
         return f"urn:{self.organization}:{self.account_locator}:{self.resource_label}/{self.fqn}"
@@ -0,0 +1,138 @@
+import os
+
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from dataclasses import dataclass
+from itertools import islice
+from typing import Iterator, List, TextIO, Union
+
+import pyparsing as pp
+
+from .blueprint import Blueprint
+from .enums import ResourceType
+from .parse import (
+    STATEMENT_CHUNK_SIZE,
+    Keywords,
+    _contains,
+    _create_header_parser,
+    _resolve_resource_class,
+    _resource_class_parsers,
+    iter_statements,
+)
+from .resources import Resource
+
+BULK_IMPORT_BATCH_SIZE = 1024
+
+
+@dataclass
+class StatementError:
+    index: int
+    sql: str
+    error: str
+
+
+def _open(source):
+    if isinstance(source, (str, os.PathLike)):
+        return open(source, encoding="utf-8")
+    return nullcontext(source)
+
+
+def _resource_type_for_sql(sql: str) -> ResourceType:
+    if not _contains(Keywords("GRANT"), sql[:16]):
+        return _resolve_resource_class(sql)
+    if _contains(Keywords("GRANT ROLE"), sql):
+        return ResourceType.ROLE_GRANT
+    if _contains(Keywords("ON FUTURE"), sql):
+        return ResourceType.FUTURE_GRANT
+    return ResourceType.GRANT
+
+
+def resource_from_sql(sql: str) -> Resource:
+    """
+    Resolve a single CREATE or GRANT statement to a Resource. Polymorphic resource types are resolved by
+    trying each candidate class in turn.
+    """
+    resource_type = _resource_type_for_sql(sql)
+    candidates = Resource.__types__.get(resource_type, [])
+    if len(candidates) == 1:
+        return candidates[0].from_sql(sql)
+
+    for resource_cls in candidates:
+        try:
+            return resource_cls.from_sql(sql)
+        except Exception:
+            continue
+    raise pp.ParseException(f"Could not resolve resource for SQL: {sql}")
+
+
+def iter_resources(stream: TextIO, chunk_size: int = STATEMENT_CHUNK_SIZE) -> Iterator[Resource]:
+    """
+    Stream resources out of a SQL script, one statement at a time.
+    """
+    for sql in iter_statements(stream, chunk_size):
+        yield resource_from_sql(sql)
+
+
+def import_sql(
+    source: Union[str, os.PathLike, TextIO],
+    blueprint: Blueprint,
+    chunk_size: int = STATEMENT_CHUNK_SIZE,
+) -> Blueprint:
+    """
+    Add every resource in a SQL script to a blueprint. `source` is a path to the script or an open text
+    stream. The script is read in chunks, so memory use is bounded by the resources and not the size
+    of the file.
+    """
+    with _open(source) as stream:
+        for resource in iter_resources(stream, chunk_size):
+            blueprint.add(resource)
+    return blueprint
+
+
+def warm_up():
+    """
+    Build every resource grammar up front. Grammars are cached per process, so pool workers call this
+    once when they start instead of paying for it on their first few statements.
+    """
+    _resource_class_parsers()
+    for resource_type, resource_classes in Resource.__types__.items():
+        _create_header_parser(resource_type)
+        for resource_cls in resource_classes:
+            props = getattr(resource_cls, "props", None)
+            if props is not None:
+                props.parser
+
+
+def _parse_statement(item):
+    index, sql = item
+    try:
+        return {"index": index, "resource": resource_from_sql(sql), "error": None}
+    except Exception as err:
+        return {"index": index, "resource": None, "error": f"{type(err).__name__}: {err}"}
+
+
+def bulk_import(
+    source: Union[str, os.PathLike, TextIO],
+    blueprint: Blueprint,
+    max_workers: int = None,
+    chunk_size: int = STATEMENT_CHUNK_SIZE,
+    batch_size: int = BULK_IMPORT_BATCH_SIZE,
+) -> List[StatementError]:
+    """
+    Parse a SQL script across a pool of processes and add the resulting resources to a blueprint in
+    statement order. Statements are read in batches of `batch_size`, so memory is bounded by the batch and
+    not the script. A statement that fails to parse doesn't stop the import, it's returned as a
+    StatementError with its position in the script.
+    """
+    max_workers = max_workers or os.cpu_count() or 1
+    errors = []
+    with _open(source) as stream, ProcessPoolExecutor(max_workers, initializer=warm_up) as executor:
+        statements = enumerate(iter_statements(stream, chunk_size))
+        while batch := list(islice(statements, batch_size)):
+            chunksize = max(1, len(batch) // (max_workers * 4))
+            for item, result in zip(batch, executor.map(_parse_statement, batch, chunksize=chunksize)):
+                if result["error"]:
+                    errors.append(StatementError(index=result["index"], sql=item[1], error=result["error"]))
+                else:
+                    blueprint.add(result["resource"])
+    return errors
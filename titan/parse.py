@@ -1,5 +1,7 @@
+import io
 import re
 
+from functools import lru_cache
 from typing import List, Dict, Callable, Union
 
 import pyparsing as pp
@@ -72,34 +74,83 @@ NOTIFICATION_INTEGRATION = Keywords("NOTIFICATION INTEGRATION")
 snowflake_sql_comment = pp.Regex(r"--.*").set_name("Snowflake SQL comment")
 
 
-def _split_statements(sql_text):
-    # Define SQL strings
-    single_quote = pp.QuotedString("'", multiline=True, unquote_results=False)
-    double_quote = pp.QuotedString('"', multiline=True, unquote_results=False)
-    double_dollar = pp.QuotedString("$$", multiline=True, unquote_results=False, end_quote_char="$$")
-    triple_dollar = pp.QuotedString("$$$", multiline=True, unquote_results=False, end_quote_char="$$$")
-
-    # Combine all SQL strings into a single parser
-    any_sql_string = pp.MatchFirst([single_quote, double_quote, double_dollar, triple_dollar])
+# The scanner jumps between these tokens instead of walking the text character by character. Each
+# quote or comment opener maps to the pattern that finds its end.
+_STATEMENT_TOKEN = re.compile(r"\$\$\$|\$\$|'|\"|--|/\*|;")
+_STATEMENT_CLOSERS = {
+    "'": re.compile(r"\\.|''|'", re.DOTALL),
+    '"': re.compile(r'""|"'),
+    "$$": re.compile(r"\$\$"),
+    "$$$": re.compile(r"\$\$\$"),
+    "--": re.compile(r"\n"),
+    "/*": re.compile(r"\*/"),
+}
+_WHITESPACE = re.compile(r"\s+")
+STATEMENT_CHUNK_SIZE = 64 * 1024
 
-    # Define other characters
-    other_chars = pp.Word(pp.printables, excludeChars=";") | pp.White()
-    semicolon = pp.Literal(";").suppress()
 
-    # SQL Statement is any sequence of SQL strings and other characters, ended with semicolon
-    parser = pp.OneOrMore(any_sql_string | other_chars).set_parse_action(" ".join) + semicolon
-    parser = parser.ignore(pp.c_style_comment | snowflake_sql_comment)
+def iter_statements(stream, chunk_size: int = STATEMENT_CHUNK_SIZE):
+    """
+    Yield SQL statements from a text stream one at a time, reading it in chunks of `chunk_size`
+    characters. Only the statement being scanned is held in memory. Semicolons inside quoted strings,
+    quoted identifiers and $$ blocks do not end a statement, comments are dropped, and whitespace outside
+    of quotes is collapsed to a single space. The last statement does not need a terminating semicolon.
+    """
+    buffer = ""
+    pos = 0
+    eof = False
+    statement = []
+    opener = None
+
+    def _text(end):
+        return _WHITESPACE.sub(" ", buffer[pos:end])
+
+    while True:
+        pattern = _STATEMENT_CLOSERS[opener] if opener else _STATEMENT_TOKEN
+        match = pattern.search(buffer, pos)
+        # A token that touches the end of the buffer might continue into the next chunk ($ vs $$, ' vs '')
+        if match is None or (match.end() == len(buffer) and not eof):
+            if eof:
+                if opener is None:
+                    statement.append(_text(len(buffer)))
+                elif opener not in ("--", "/*"):
+                    statement.append(buffer[pos:])
+                break
+            chunk = stream.read(chunk_size)
+            eof = chunk == ""
+            buffer = buffer[pos:] + chunk
+            pos = 0
+            continue
+
+        token = match.group()
+        if opener in ("--", "/*"):
+            statement.append(" ")
+            opener = None
+        elif opener:
+            statement.append(buffer[pos : match.end()])
+            if token not in ("''", '""') and not token.startswith("\\"):
+                opener = None
+        elif token == ";":
+            statement.append(_text(match.start()))
+            sql = "".join(statement).strip()
+            if sql:
+                yield sql
+            statement = []
+        elif token in ("--", "/*"):
+            statement.append(_text(match.start()))
+            opener = token
+        else:
+            statement.append(_text(match.start()) + token)
+            opener = token
+        pos = match.end()
 
-    results = []
-    for result, start, end in parser.scan_string(sql_text):
-        results.append(result[0])
+    sql = "".join(statement).strip()
+    if sql:
+        yield sql
 
-    # Allow last statement to not have a semicolon
-    remainder = sql_text[end:]
-    if remainder.strip():
-        results.append(remainder)
 
-    return results
+def _split_statements(sql_text):
+    return list(iter_statements(io.StringIO(sql_text)))
 
 
 def _make_scoped_identifier(identifier_list, scope):
@@ -116,8 +167,9 @@ def _make_scoped_identifier(identifier_list, scope):
         raise Exception(f"Unsupported identifier list: {identifier_list}")
 
 
-def _parse_create_header(sql, resource_type, scope):
-    header = pp.And(
+@lru_cache(maxsize=None)
+def _create_header_parser(resource_type):
+    return pp.And(
         [
             CREATE,
             pp.Opt(OR_REPLACE)("or_replace"),
@@ -129,6 +181,10 @@ def _parse_create_header(sql, resource_type, scope):
             REST_OF_STRING("remainder"),
         ]
     )
+
+
+def _parse_create_header(sql, resource_type, scope):
+    header = _create_header_parser(resource_type)
     try:
         results = header.parse_string(sql, parse_all=True).as_dict()
         remainder = (results["_skipped"][0] + " " + results.get("remainder", "")).strip(" ;")
@@ -154,6 +210,36 @@ def _parse_grant(sql: Union[str, SQL]):
         return _parse_priv_grant(sql)
 
 
+# ignore() is applied recursively to the shared module-level elements, so these grammars must be built
+# once. Building them per call grows the ignore list of GRANT, ON, TO, etc. and slows every later parse.
+@lru_cache(maxsize=None)
+def _priv_grant_parser():
+    grant = (
+        GRANT
+        + pp.SkipTo(ON)("privs")
+        + ON
+        + pp.SkipTo(TO)("on_stmt")
+        + TO
+        + pp.Opt(Keyword("ROLE").suppress())
+        + Identifier("to")
+        + pp.Opt(Keywords("WITH GRANT OPTION").suppress())
+    )
+    return grant.ignore(pp.c_style_comment | snowflake_sql_comment)
+
+
+@lru_cache(maxsize=None)
+def _role_grant_parser():
+    grant = (
+        GRANT
+        + Keyword("ROLE").suppress()
+        + Identifier("role")
+        + TO
+        + pp.MatchFirst([Keyword("ROLE"), Keyword("USER")]).suppress()
+        + Identifier("to_role")
+    )
+    return grant.ignore(pp.c_style_comment | snowflake_sql_comment)
+
+
 def _parse_priv_grant(sql: str):
     """
     GRANT {
@@ -166,17 +252,7 @@ def _parse_priv_grant(sql: str):
     }
     TO [ ROLE ] <role_name> [ WITH GRANT OPTION ]
     """
-    grant = (
-        GRANT
-        + pp.SkipTo(ON)("privs")
-        + ON
-        + pp.SkipTo(TO)("on_stmt")
-        + TO
-        + pp.Opt(Keyword("ROLE").suppress())
-        + Identifier("to")
-        + pp.Opt(Keywords("WITH GRANT OPTION").suppress())
-    )
-    grant = grant.ignore(pp.c_style_comment | snowflake_sql_comment)
+    grant = _priv_grant_parser()
 
     try:
         results = grant.parse_string(sql, parse_all=True)
@@ -208,15 +284,7 @@ def _parse_role_grant(sql: str):
     GRANT ROLE <name> TO { ROLE <parent_role_name> | USER <user_name> }
     """
 
-    grant = (
-        GRANT
-        + Keyword("ROLE").suppress()
-        + Identifier("role")
-        + TO
-        + pp.MatchFirst([Keyword("ROLE"), Keyword("USER")]).suppress()
-        + Identifier("to_role")
-    )
-    grant = grant.ignore(pp.c_style_comment | snowflake_sql_comment)
+    grant = _role_grant_parser()
 
     try:
         results = grant.parse_string(sql, parse_all=True)
@@ -295,34 +363,52 @@ def _resolve_notification_integration(sql):
     #     return "aws_outbound_notification_integration"
 
 
-def _resolve_resource_class(sql):
+# Multi-word types that start with another type's keyword (DATABASE ROLE, DATABASE) must come first
+RESOURCE_CLASS_LEXICON = {
+    "ALERT": ResourceType.ALERT,
+    "API INTEGRATION": ResourceType.API_INTEGRATION,
+    "DATABASE ROLE": ResourceType.DATABASE_ROLE,
+    "DATABASE": ResourceType.DATABASE,
+    "DYNAMIC TABLE": ResourceType.DYNAMIC_TABLE,
+    "EVENT TABLE": ResourceType.EVENT_TABLE,
+    "EXTERNAL ACCESS INTEGRATION": ResourceType.EXTERNAL_ACCESS_INTEGRATION,
+    "EXTERNAL FUNCTION": ResourceType.EXTERNAL_FUNCTION,
+    "FAILOVER GROUP": ResourceType.FAILOVER_GROUP,
+    "FILE FORMAT": ResourceType.FILE_FORMAT,
+    "FUNCTION": ResourceType.FUNCTION,
+    "NETWORK RULE": ResourceType.NETWORK_RULE,
+    "NOTIFICATION INTEGRATION": ResourceType.NOTIFICATION_INTEGRATION,
+    "PACKAGES POLICY": ResourceType.PACKAGES_POLICY,
+    "PASSWORD POLICY": ResourceType.PASSWORD_POLICY,
+    "PIPE": ResourceType.PIPE,
+    "PROCEDURE": ResourceType.PROCEDURE,
+    "REPLICATION GROUP": ResourceType.REPLICATION_GROUP,
+    "RESOURCE MONITOR": ResourceType.RESOURCE_MONITOR,
+    "ROLE": ResourceType.ROLE,
+    "SCHEMA": ResourceType.SCHEMA,
+    "SECRET": ResourceType.SECRET,
+    "SEQUENCE": ResourceType.SEQUENCE,
+    "STAGE": ResourceType.STAGE,
+    "STORAGE INTEGRATION": ResourceType.STORAGE_INTEGRATION,
+    "STREAM": ResourceType.STREAM,
+    "TABLE": ResourceType.TABLE,
+    "TAG": ResourceType.TAG,
+    "TASK": ResourceType.TASK,
+    "USER": ResourceType.USER,
+    "VIEW": ResourceType.VIEW,
+    "WAREHOUSE": ResourceType.WAREHOUSE,
+}
+
+
+@lru_cache(maxsize=None)
+def _resource_class_parsers():
     create_header = CREATE + pp.Opt(OR_REPLACE) + pp.Opt(TEMPORARY) + pp.Opt(TRANSIENT) + pp.Opt(SECURE)
-    sql = _consume_tokens(create_header, sql)
+    return create_header, Lexicon(RESOURCE_CLASS_LEXICON)
 
-    lexicon = Lexicon(
-        {
-            "ALERT": ResourceType.ALERT,
-            "DATABASE": ResourceType.DATABASE,
-            "DYNAMIC TABLE": ResourceType.DYNAMIC_TABLE,
-            "EXTERNAL FUNCTION": ResourceType.EXTERNAL_FUNCTION,
-            "FILE FORMAT": ResourceType.FILE_FORMAT,
-            "NOTIFICATION INTEGRATION": ResourceType.NOTIFICATION_INTEGRATION,
-            "PIPE": ResourceType.PIPE,
-            "RESOURCE MONITOR": ResourceType.RESOURCE_MONITOR,
-            "ROLE": ResourceType.ROLE,
-            "SCHEMA": ResourceType.SCHEMA,
-            "SEQUENCE": ResourceType.SEQUENCE,
-            "STAGE": ResourceType.STAGE,
-            "STORAGE INTEGRATION": ResourceType.STORAGE_INTEGRATION,
-            "STREAM": ResourceType.STREAM,
-            "TABLE": ResourceType.TABLE,
-            "TAG": ResourceType.TAG,
-            "TASK": ResourceType.TASK,
-            "USER": ResourceType.USER,
-            "VIEW": ResourceType.VIEW,
-            "WAREHOUSE": ResourceType.WAREHOUSE,
-        }
-    )
+
+def _resolve_resource_class(sql):
+    create_header, lexicon = _resource_class_parsers()
+    sql = _consume_tokens(create_header, sql)
 
     try:
         resource_type = convert_match(lexicon, sql)
@@ -343,10 +429,13 @@ class Lexicon:
             self._words.append(word)
             self._actions.append(action)
             idx += 1
+        self._parser = None
 
     @property
     def parser(self):
-        return pp.MatchFirst(self._words)
+        if self._parser is None:
+            self._parser = pp.MatchFirst(self._words)
+        return self._parser
 
     def get_action(self, parse_result):
         result_names = list(parse_result.as_dict().keys())
@@ -412,17 +501,20 @@ def _marker(name):
     return pp.Empty().set_parse_action(lambda s, loc, toks, marker=name: marker)
 
 
+def _build_props_parser(props):
+    lexicon = []
+    for prop_kwarg, prop in props.props.items():
+        lexicon.append(prop.parser.copy() + _marker(prop_kwarg))
+    return pp.MatchFirst(lexicon).ignore(pp.c_style_comment)
+
+
 def _parse_props(props, sql):
     if sql.strip() == "":
         return {}
 
     found_props = {}
 
-    lexicon = []
-    for prop_kwarg, prop in props.props.items():
-        lexicon.append(prop.parser.copy() + _marker(prop_kwarg))
-
-    parser = pp.MatchFirst(lexicon).ignore(pp.c_style_comment)
+    parser = props.parser
     if props.start_token:
         sql = _consume_tokens(props.start_token, sql)
 
@@ -472,7 +564,8 @@ def _format_props(props):
     return "\n".join(buf)
 
 
-def _parse_column(sql):
+@lru_cache(maxsize=None)
+def _column_parser():
     collate = Keyword("COLLATE").suppress() + ANY("collate")
     comment = Keyword("COMMENT").suppress() + ANY("comment")
     not_null = Keywords("NOT NULL").set_parse_action(lambda _: True)("not_null")
@@ -488,8 +581,12 @@ def _parse_column(sql):
         + pp.Opt(constraint)
         + REST_OF_STRING("remainder")
     )
+    return column
+
+
+def _parse_column(sql):
     try:
-        results = column.parse_string(sql, parse_all=True)
+        results = _column_parser().parse_string(sql, parse_all=True)
         return results.as_dict()
     except pp.ParseException as err:
         raise pp.ParseException("Failed to parse column") from err
@@ -582,22 +679,57 @@ def parse_function_name(header: str):
     return prefix
 
 
+# Up to four unquoted identifiers separated by periods, the shape of almost every name titan parses
+_SIMPLE_SCOPED_NAME = re.compile(r"[A-Za-z0-9_][A-Za-z0-9_$]*(?:\.[A-Za-z0-9_][A-Za-z0-9_$]*){0,3}")
+
+
+def _find_unquoted(text: str, char: str) -> int:
+    """The index of the first `char` that isn't inside a double-quoted identifier, or -1"""
+    if '"' not in text:
+        return text.find(char)
+    quoted = False
+    for idx, c in enumerate(text):
+        if c == '"':
+            # An escaped quote ("") toggles twice, so it never ends the identifier
+            quoted = not quoted
+        elif c == char and not quoted:
+            return idx
+    return -1
+
+
+def _scoped_name_parts(scoped_name: str) -> list:
+    """
+    Split a possibly-qualified name into its identifiers. Plain names are split directly, only names with
+    quoted or otherwise unusual identifiers go through the FullyQualifiedIdentifier grammar.
+    """
+    if _SIMPLE_SCOPED_NAME.fullmatch(scoped_name):
+        return scoped_name.split(".")
+    return list(FullyQualifiedIdentifier.parse_string(scoped_name, parse_all=True))
+
+
+# Identifiers are immutable, so every string only needs to be parsed once per process
+IDENTIFIER_CACHE_SIZE = 65536
+
+
+@lru_cache(maxsize=IDENTIFIER_CACHE_SIZE)
 def parse_identifier(identifier: str, is_db_scoped=False) -> FQN:
-    # TODO: This needs to support periods and question marks in double quoted identifiers
-    scoped_name, param_str = identifier.split("?") if "?" in identifier else (identifier, "")
+    param_start = _find_unquoted(identifier, "?")
+    scoped_name, param_str = (
+        (identifier[:param_start], identifier[param_start + 1 :]) if param_start != -1 else (identifier, "")
+    )
     params = {}
     if param_str:
         for param in param_str.split("&"):
-            k, v = param.split("=")
+            k, v = param.split("=", 1)
             params[k] = v
 
     arg_types = []
-    if "(" in scoped_name:
-        args_start = scoped_name.find("(")
+    args_start = _find_unquoted(scoped_name, "(")
+    if args_start != -1:
         scoped_name, args_str = scoped_name[:args_start], scoped_name[args_start:]
         arg_types = [arg.strip() for arg in args_str.strip("()").split(",")]
 
-    name_parts = list(FullyQualifiedIdentifier.parse_string(scoped_name, parse_all=True))
+    name_parts = _scoped_name_parts(scoped_name)
     if len(name_parts) == 1:
         return FQN(
             name=name_parts[0],
@@ -639,13 +771,15 @@ def parse_identifier(identifier: str, is_db_scoped=False) -> FQN:
     raise Exception(f"Failed to parse identifier: {identifier}")
 
 
+@lru_cache(maxsize=IDENTIFIER_CACHE_SIZE)
 def parse_URN(urn_str: str) -> URN:
-    parts = urn_str.split(":")
+    # The FQN is split off whole, quoted identifiers in it may contain colons and slashes
+    parts = urn_str.split(":", 3)
     if len(parts) != 4:
         raise Exception(f"Invalid URN string: {urn_str}")
     if parts[0] != "urn":
         raise Exception(f"Invalid URN string: {urn_str}")
-    resource_label, fqn_str = parts[3].split("/")
+    resource_label, fqn_str = parts[3].split("/", 1)
     resource_type = ResourceType(resource_label.replace("_", " ").upper())
     fqn = parse_identifier(fqn_str, is_db_scoped=(resource_label == "schema"))
     return URN(
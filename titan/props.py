@@ -9,6 +9,7 @@ import pyparsing as pp
 from .builder import tidy_sql
 from .enums import DataType
 from .parse import (
+    _build_props_parser,
     _parser_has_results_name,
     _parse_props,
     _in_parens,
@@ -87,10 +88,18 @@ class Props:
         self.props: Dict[str, Prop] = props
         self.name = _name
         self.start_token = Literals(_start_token) if _start_token else None
+        self._parser = None
 
     def __getitem__(self, key: str) -> Prop:
         return self.props[key]
 
+    @property
+    def parser(self):
+        # Built on first use, then shared by every parse of this set of props
+        if self._parser is None:
+            self._parser = _build_props_parser(self)
+        return self._parser
+
     def to_json(self):
         return json.dumps(self, default=lambda obj: obj.__dict__)
 
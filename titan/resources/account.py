@@ -1,11 +1,12 @@
 from dataclasses import dataclass
 
-from .resource import Resource, ResourceContainer, ResourceSpec
+from .resource import Resource, ResourceContainer, ResourceSpec, slotted
 from ..enums import AccountEdition, ResourceType
 from ..props import Props
 from ..scope import OrganizationScope
 
 
+@slotted
 @dataclass
 class _Account(ResourceSpec):
     name: str
@@ -1,6 +1,6 @@
 from dataclasses import dataclass
 
-from .resource import Resource, ResourceSpec
+from .resource import Resource, ResourceSpec, slotted
 from .warehouse import Warehouse
 from ..enums import ResourceType
 from ..scope import SchemaScope
@@ -8,6 +8,7 @@ from ..scope import SchemaScope
 from ..props import Props, StringProp, QueryProp, AlertConditionProp, TagsProp
 
 
+@slotted
 @dataclass
 class _Alert(ResourceSpec):
     name: str
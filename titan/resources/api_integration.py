@@ -1,6 +1,6 @@
 from dataclasses import dataclass
 
-from .resource import Resource, ResourceSpec
+from .resource import Resource, ResourceSpec, slotted
 from ..enums import ParseableEnum, ResourceType
 from ..scope import AccountScope
 
@@ -15,6 +15,7 @@ class ApiProvider(ParseableEnum):
     AWS_GOV_PRIVATE_API_GATEWAY = "AWS_GOV_PRIVATE_API_GATEWAY"
 
 
+@slotted
 @dataclass
 class _APIIntegration(ResourceSpec):
     name: str
@@ -1,12 +1,13 @@
 from dataclasses import dataclass
 
-from .resource import Resource, ResourceSpec
+from .resource import Resource, ResourceSpec, slotted
 from ..enums import DataType, ResourceType
 from ..props import FlagProp, Props, StringProp
 from ..parse import _parse_column, _parse_props
 from ..scope import TableScope
 
 
+@slotted
 @dataclass
 class _Column(ResourceSpec):
     name: str
@@ -1,12 +1,13 @@
 from dataclasses import dataclass
 
-from .resource import Resource, ResourceContainer, ResourceSpec
+from .resource import Resource, ResourceContainer, ResourceSpec, slotted
 from .schema import Schema
 from ..enums import ResourceType
 from ..props import Props, IntProp, StringProp, TagsProp, FlagProp
 from ..scope import AccountScope
 
 
+@slotted
 @dataclass
 class _Database(ResourceSpec):
     name: str
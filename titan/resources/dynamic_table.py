@@ -1,6 +1,6 @@
 from dataclasses import dataclass
 
-from .resource import Resource, ResourceSpec
+from .resource import Resource, ResourceSpec, slotted
 from .column import Column
 from .warehouse import Warehouse
 from ..enums import ParseableEnum, ResourceType
@@ -19,6 +19,7 @@ class InitializeBehavior(ParseableEnum):
     ON_SCHEDULE = "ON_SCHEDULE"
 
 
+@slotted
 @dataclass
 class _DynamicTable(ResourceSpec):
     name: str
@@ -1,6 +1,6 @@
 from dataclasses import dataclass
 
-from .resource import Resource, ResourceSpec
+from .resource import Resource, ResourceSpec, slotted
 from ..enums import ResourceType
 from ..scope import SchemaScope
 from ..props import (
@@ -14,6 +14,7 @@ from ..props import (
 )
 
 
+@slotted
 @dataclass
 class _EventTable(ResourceSpec):
     name: str
@@ -1,6 +1,6 @@
 from dataclasses import dataclass
 
-from .resource import Resource, ResourceSpec
+from .resource import Resource, ResourceSpec, slotted
 from .network_rule import NetworkRule
 from .secret import Secret
 from ..enums import ResourceType
@@ -9,6 +9,7 @@ from ..scope import AccountScope
 from ..props import BoolProp, Props, StringProp, IdentifierListProp
 
 
+@slotted
 @dataclass
 class _ExternalAccessIntegration(ResourceSpec):
     name: str
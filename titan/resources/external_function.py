@@ -1,6 +1,6 @@
 from dataclasses import dataclass
 
-from .resource import Resource, ResourceSpec, Arg
+from .resource import Resource, ResourceSpec, Arg, slotted
 from ..enums import DataType, NullHandling, Volatility, ResourceType
 from ..scope import AccountScope
 
@@ -17,6 +17,7 @@ from ..props import (
 )
 
 
+@slotted
 @dataclass
 class _ExternalFunction(ResourceSpec):
     name: str
@@ -1,6 +1,6 @@
 from dataclasses import dataclass
 
-from .resource import Resource, ResourceSpec
+from .resource import Resource, ResourceSpec, slotted
 from ..enums import ParseableEnum, ResourceType
 from ..scope import AccountScope
 
@@ -26,6 +26,7 @@ class IntegrationTypes(ParseableEnum):
     NOTIFICATION_INTEGRATIONS = "NOTIFICATION INTEGRATIONS"
 
 
+@slotted
 @dataclass
 class _FailoverGroup(ResourceSpec):
     name: str
@@ -1,6 +1,6 @@
 from dataclasses import dataclass
 
-from .resource import Arg, Resource, ResourceSpec
+from .resource import Arg, Resource, ResourceSpec, slotted
 from ..scope import SchemaScope
 from ..enums import DataType, Language, NullHandling, ResourceType, Volatility
 from ..props import (
@@ -16,6 +16,7 @@ from ..props import (
 )
 
 
+@slotted
 @dataclass
 class _JavascriptUDF(ResourceSpec):
     name: str
@@ -87,6 +88,7 @@ class JavascriptUDF(Resource):
         )
 
 
+@slotted
 @dataclass
 class _PythonUDF(ResourceSpec):
     name: str
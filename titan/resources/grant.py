@@ -3,7 +3,7 @@ from typing import Any
 
 from inflection import singularize
 
-from .resource import Resource, ResourcePointer, ResourceSpec
+from .resource import Resource, ResourcePointer, ResourceSpec, slotted
 from .role import Role
 from .user import User
 from ..enums import ResourceType
@@ -14,6 +14,7 @@ from ..props import Props, FlagProp, IdentifierProp
 from ..scope import AccountScope
 
 
+@slotted
 @dataclass
 class _Grant(ResourceSpec):
     priv: str
@@ -263,6 +264,7 @@ def grant_fqn(grant: _Grant):
     return FQN(name=grant.to.name, params={"on": grant.on, "type": str(grant.on_type)})
 
 
+@slotted
 @dataclass
 class _FutureGrant(ResourceSpec):
     priv: str
@@ -372,6 +374,7 @@ def future_grant_fqn(grant: _FutureGrant):
     )
 
 
+@slotted
 @dataclass
 class _RoleGrant(ResourceSpec):
     role: Role
@@ -1,6 +1,6 @@
 from dataclasses import dataclass
 
-from .resource import Resource, ResourceSpec
+from .resource import Resource, ResourceSpec, slotted
 from ..enums import ParseableEnum, ResourceType
 from ..scope import SchemaScope
 
@@ -25,6 +25,7 @@ class NetworkRuleMode(ParseableEnum):
     EGRESS = "EGRESS"
 
 
+@slotted
 @dataclass
 class _NetworkRule(ResourceSpec):
     name: str
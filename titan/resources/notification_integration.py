@@ -2,7 +2,7 @@ from dataclasses import dataclass
 
 from inflection import camelize
 
-from .resource import Resource, ResourceSpec
+from .resource import Resource, ResourceSpec, slotted
 from ..enums import ParseableEnum, ResourceType
 from ..parse import _resolve_resource_class
 from ..props import Props, StringProp, BoolProp, EnumProp, StringListProp
@@ -26,6 +26,7 @@ class NotificationDirection(ParseableEnum):
     OUTBOUND = "OUTBOUND"
 
 
+@slotted
 @dataclass
 class _EmailNotificationIntegration(ResourceSpec):
     name: str
@@ -81,6 +82,7 @@ class EmailNotificationIntegration(Resource):
         )
 
 
+@slotted
 @dataclass
 class _AWSOutboundNotificationIntegration(ResourceSpec):
     name: str
@@ -148,6 +150,7 @@ class AWSOutboundNotificationIntegration(Resource):
         )
 
 
+@slotted
 @dataclass
 class _GCPOutboundNotificationIntegration(ResourceSpec):
     name: str
@@ -209,6 +212,7 @@ class GCPOutboundNotificationIntegration(Resource):
         )
 
 
+@slotted
 @dataclass
 class _AzureOutboundNotificationIntegration(ResourceSpec):
     name: str
@@ -275,6 +279,7 @@ class AzureOutboundNotificationIntegration(Resource):
         )
 
 
+@slotted
 @dataclass
 class _GCPInboundNotificationIntegration(ResourceSpec):
     name: str
@@ -333,6 +338,7 @@ class GCPInboundNotificationIntegration(Resource):
         )
 
 
+@slotted
 @dataclass
 class _AzureInboundNotificationIntegration(ResourceSpec):
     name: str
@@ -1,6 +1,6 @@
 from dataclasses import dataclass
 
-from .resource import Resource, ResourceSpec
+from .resource import Resource, ResourceSpec, slotted
 from ..enums import ResourceType, Language
 from ..scope import SchemaScope
 from ..props import (
@@ -11,6 +11,7 @@ from ..props import (
 )
 
 
+@slotted
 @dataclass
 class _PackagesPolicy(ResourceSpec):
     name: str
@@ -5,13 +5,14 @@
 
 from dataclasses import dataclass
 
-from .resource import Resource, ResourceSpec
+from .resource import Resource, ResourceSpec, slotted
 from ..enums import ResourceType
 from ..parse import _parse_copy_into
 from ..props import BoolProp, Props, StringProp, QueryProp
 from ..scope import SchemaScope
 
 
+@slotted
 @dataclass
 class _Pipe(ResourceSpec):
     name: str
@@ -1,6 +1,6 @@
 from dataclasses import dataclass, field
 
-from .resource import Arg, Resource, ResourceSpec
+from .resource import Arg, Resource, ResourceSpec, slotted
 from ..scope import SchemaScope
 from ..enums import DataType, ExecutionRights, NullHandling, Language, ResourceType
 from ..props import (
@@ -14,6 +14,7 @@ from ..props import (
 )
 
 
+@slotted
 @dataclass
 class _PythonStoredProcedure(ResourceSpec):
     name: str
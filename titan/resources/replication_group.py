@@ -1,6 +1,6 @@
 from dataclasses import dataclass
 
-from .resource import Resource, ResourceSpec
+from .resource import Resource, ResourceSpec, slotted
 from .database import Database
 from ..enums import AccountEdition, ParseableEnum, ResourceType
 from ..props import (
@@ -33,6 +33,7 @@ class IntegrationType(ParseableEnum):
     NOTIFICATION_INTEGRATIONS = "NOTIFICATION INTEGRATIONS"
 
 
+@slotted
 @dataclass
 class _ReplicationGroup(ResourceSpec):
     name: str
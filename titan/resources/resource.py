@@ -1,12 +1,14 @@
-from dataclasses import asdict, dataclass, fields
-from typing import Any, TypedDict, Type, Union, get_args, get_origin
+from dataclasses import dataclass, fields, is_dataclass
+from functools import lru_cache
+from typing import Any, Callable, Optional, TypedDict, Type, Union, get_args, get_origin
 from inspect import isclass
+from types import MappingProxyType
 from itertools import chain
 
 import pyparsing as pp
 
 from ..enums import AccountEdition, DataType, ParseableEnum, ResourceType
-from ..identifiers import URN
+from ..identifiers import FQN, URN
 from ..lifecycle import create_resource, drop_resource
 from ..props import Props as ResourceProps
 from ..parse import _parse_create_header, _parse_props, _resolve_resource_class
@@ -23,84 +25,212 @@ class Returns(TypedDict):
     metadata: str
 
 
-@dataclass
-class ResourceSpec:
-    def __post_init__(self):
-        def _coerce(field_value, field_type):
-            if field_type == Any:
-                return field_value
-
-            # Recursively traverse lists and dicts
-            if get_origin(field_type) == list:  # or issubclass(field_type, list):
-                if not isinstance(field_value, list):
-                    raise Exception
-                list_element_type = get_args(field_type) or (str,)
-                return [_coerce(v, field_type=list_element_type[0]) for v in field_value]
-            elif get_origin(field_type) == dict:  # issubclass(field_type, dict):
-                if not isinstance(field_value, dict):
-                    raise Exception
-                dict_types = get_args(field_type)
-                if len(dict_types) < 2:
-                    raise RuntimeError(f"Unexpected field type {field_type}")
-                return {k: _coerce(v, field_type=dict_types[1]) for k, v in field_value.items()}
-
-            # Check for field_value's type in a Union
-            if get_origin(field_type) == Union:
-                union_types = get_args(field_type)
-                for union_type in union_types:
-                    expected_type = get_origin(union_type) or union_type
-                    if isinstance(field_value, expected_type):
-                        return _coerce(field_value, field_type=expected_type)
-                raise RuntimeError(f"Unexpected field type {field_type}")
-
-            if not isclass(field_type):
-                raise RuntimeError(f"Unexpected field type {field_type}")
-
-            # Coerce enums
-            if issubclass(field_type, ParseableEnum):
-                return field_type(field_value)
-
-            # Coerce args
-            elif field_type == Arg:
-                arg_dict = {
-                    "name": field_value["name"].upper(),
-                    "data_type": DataType(field_value["data_type"]),
-                }
-                if "default" in field_value:
-                    arg_dict["default"] = field_value["default"]
-                return arg_dict
-
-            # Coerce returns
-            elif field_type == Returns:
-                returns_dict = {
-                    "data_type": DataType(field_value["data_type"]),
-                    "metadata": field_value["metadata"],
-                }
-                if "returns_null" in field_value:
-                    returns_dict["returns_null"] = field_value["returns_null"]
-                return returns_dict
-
-            # Coerce resources
-            elif issubclass(field_type, Resource):
-                return convert_to_resource(field_type, field_value)
-            else:
-                return field_value
+def _identity(field_value):
+    return field_value
+
+
+def _raise(exc: Exception):
+    def _coerce(field_value):
+        raise exc
+
+    return _coerce
+
+
+def _coerce_list(element_coercer):
+    def _coerce(field_value):
+        if not isinstance(field_value, list):
+            raise Exception
+        return [element_coercer(v) for v in field_value]
+
+    return _coerce
+
+
+def _coerce_dict(value_coercer):
+    def _coerce(field_value):
+        if not isinstance(field_value, dict):
+            raise Exception
+        return {k: value_coercer(v) for k, v in field_value.items()}
+
+    return _coerce
+
+
+def _coerce_union(field_type, members):
+    def _coerce(field_value):
+        for expected_type, coercer in members:
+            if isinstance(field_value, expected_type):
+                return coercer(field_value)
+        raise RuntimeError(f"Unexpected field type {field_type}")
+
+    return _coerce
 
-        for field in fields(self):
-            field_value = getattr(self, field.name)
 
-            if field_value is None:
+def _coerce_arg(field_value):
+    arg_dict = {
+        "name": field_value["name"].upper(),
+        "data_type": DataType(field_value["data_type"]),
+    }
+    if "default" in field_value:
+        arg_dict["default"] = field_value["default"]
+    return arg_dict
+
+
+def _coerce_returns(field_value):
+    returns_dict = {
+        "data_type": DataType(field_value["data_type"]),
+        "metadata": field_value["metadata"],
+    }
+    if "returns_null" in field_value:
+        returns_dict["returns_null"] = field_value["returns_null"]
+    return returns_dict
+
+
+def _coerce_resource(field_type):
+    def _coerce(field_value):
+        return convert_to_resource(field_type, field_value)
+
+    return _coerce
+
+
+@lru_cache(maxsize=None)
+def _coercer(field_type) -> Callable:
+    """
+    Build the function that coerces a (non-None) value of a field of this type. All of the type inspection
+    happens here, once per type, and not on every resource construction.
+    """
+    if field_type == Any:
+        return _identity
+
+    # Recursively traverse lists and dicts
+    if get_origin(field_type) == list:
+        list_element_type = get_args(field_type) or (str,)
+        return _coerce_list(_coercer(list_element_type[0]))
+    elif get_origin(field_type) == dict:
+        dict_types = get_args(field_type)
+        if len(dict_types) < 2:
+            return _raise(RuntimeError(f"Unexpected field type {field_type}"))
+        return _coerce_dict(_coercer(dict_types[1]))
+
+    # Check for field_value's type in a Union
+    if get_origin(field_type) == Union:
+        members = []
+        for union_type in get_args(field_type):
+            expected_type = get_origin(union_type) or union_type
+            members.append((expected_type, _coercer(expected_type)))
+        return _coerce_union(field_type, tuple(members))
+
+    if not isclass(field_type):
+        return _raise(RuntimeError(f"Unexpected field type {field_type}"))
+
+    # Coerce enums
+    if issubclass(field_type, ParseableEnum):
+        return field_type
+    elif field_type == Arg:
+        return _coerce_arg
+    elif field_type == Returns:
+        return _coerce_returns
+    elif issubclass(field_type, Resource):
+        return _coerce_resource(field_type)
+    return _identity
+
+
+def slotted(cls):
+    """
+    Rebuild a dataclass with __slots__ for its fields, like dataclass(slots=True) which needs Python 3.10.
+    Specs are held by every resource, so dropping their per-instance __dict__ adds up in large blueprints.
+    """
+    inherited_slots = {slot for base in cls.__mro__[1:] for slot in getattr(base, "__slots__", ())}
+    field_names = tuple(field.name for field in fields(cls))
+    cls_dict = dict(cls.__dict__)
+    cls_dict["__slots__"] = tuple(name for name in field_names if name not in inherited_slots)
+    for field_name in field_names:
+        # Defaults live on __init__, the class attributes would shadow the slots
+        cls_dict.pop(field_name, None)
+    cls_dict.pop("__dict__", None)
+    cls_dict.pop("__weakref__", None)
+    slotted_cls = type(cls)(cls.__name__, cls.__bases__, cls_dict)
+    slotted_cls.__qualname__ = cls.__qualname__
+    # Zero-argument super() in the spec's methods looks the class up in a closure cell, point it at the new one
+    for member in cls_dict.values():
+        for cell in getattr(getattr(member, "__func__", member), "__closure__", None) or ():
+            try:
+                if cell.cell_contents is cls:
+                    cell.cell_contents = slotted_cls
+            except ValueError:
+                # An empty cell
                 continue
-            # elif isinstance(field.type, _GenericAlias):
-            #     continue
-            else:
-                setattr(self, field.name, _coerce(field_value, field.type))
+    return slotted_cls
+
+
+# Spec class -> the (field name, coercer) pairs __post_init__ runs, fields that never change are left out
+_coercion_plans: dict[type, tuple] = {}
+
+
+def _coercion_plan(spec_cls: type) -> tuple:
+    plan = _coercion_plans.get(spec_cls)
+    if plan is None:
+        plan = tuple(
+            (field.name, coercer) for field in fields(spec_cls) if (coercer := _coercer(field.type)) is not _identity
+        )
+        _coercion_plans[spec_cls] = plan
+    return plan
+
+
+@dataclass
+class ResourceSpec:
+    __slots__ = ()
+
+    def __post_init__(self):
+        for field_name, coercer in _coercion_plan(type(self)):
+            field_value = getattr(self, field_name)
+            if field_value is not None:
+                setattr(self, field_name, coercer(field_value))
 
     @classmethod
     def get_metadata(cls, field_name: str):
         return {f.name: f.metadata for f in fields(cls)}[field_name]
 
 
+@lru_cache(maxsize=None)
+def _spec_field_names(spec_cls: type) -> tuple:
+    return tuple(field.name for field in fields(spec_cls))
+
+
+@lru_cache(maxsize=None)
+def _spec_defaults(spec_cls: type) -> MappingProxyType:
+    # Read-only, since every caller shares it. Use `defaults | data` to build a dict
+    return MappingProxyType({field.name: field.default for field in fields(spec_cls)})
+
+
+def _serialize(value):
+    if isinstance(value, ResourcePointer):
+        return value.name
+    elif isinstance(value, Resource):
+        if hasattr(value, "serialize"):
+            return value.serialize()
+        elif hasattr(value._data, "name"):
+            return getattr(value._data, "name")
+        else:
+            raise Exception(f"Cannot serialize {value}")
+    elif isinstance(value, ParseableEnum):
+        return str(value)
+    elif isinstance(value, list):
+        return [_serialize(v) for v in value]
+    elif isinstance(value, dict):
+        return {k: _serialize(v) for k, v in value.items()}
+    elif is_dataclass(value) and not isinstance(value, type):
+        return _serialize_spec(value)
+    else:
+        return value
+
+
+def _serialize_spec(spec: ResourceSpec) -> dict:
+    """
+    Serialize a spec in a single pass. Lists and dicts are rebuilt as they're serialized, so the result
+    shares nothing mutable with the spec and no deep copy is needed.
+    """
+    return {field_name: _serialize(getattr(spec, field_name)) for field_name in _spec_field_names(type(spec))}
+
+
 RESOURCE_SCOPES = {
     ResourceType.ACCOUNT: OrganizationScope(),
 }
@@ -111,6 +241,8 @@ class _Resource(type):
     __resolvers__ = {}
 
     def __new__(cls, name, bases, attrs):
+        # Resources are slotted, subclasses only get a __dict__ if they ask for one
+        attrs.setdefault("__slots__", ())
         cls_ = super().__new__(cls, name, bases, attrs)
         if cls_.__name__ in ["Resource", "_Resource", "ResourcePointer"]:
             return cls_
@@ -129,12 +261,15 @@ class Resource(metaclass=_Resource):
     scope: ResourceScope
     spec: Type[ResourceSpec]
 
+    __slots__ = ("_data", "_container", "implicit", "_refs")
+
     def __init__(self, implicit: bool = False, **kwargs):
         super().__init__()
         self._data: ResourceSpec = None
         self._container: "ResourceContainer" = None
         self.implicit = implicit
-        self.refs = set()
+        # Resources reference a handful of others at most, a tuple is far smaller than a set
+        self._refs: tuple = ()
 
         # Consume resource_type from kwargs if it exists
         resource_type = kwargs.pop("resource_type", None)
@@ -193,46 +328,15 @@ class Resource(metaclass=_Resource):
         return resource_types[0]
 
     @classmethod
-    def defaults(cls):
-        return {f.name: f.default for f in fields(cls.spec)}
+    def defaults(cls) -> MappingProxyType:
+        return _spec_defaults(cls.spec)
 
     def __repr__(self):  # pragma: no cover
         name = getattr(self._data, "name", None)
         return f"{self.__class__.__name__}({name})"
 
     def to_dict(self):
-        defaults = {f.name: f.default for f in fields(self.spec)}
-
-        serialized = {}
-
-        def _serialize(value):
-            if isinstance(value, ResourcePointer):
-                return value.name
-            elif isinstance(value, Resource):
-                if hasattr(value, "serialize"):
-                    return value.serialize()
-                elif hasattr(value._data, "name"):
-                    return getattr(value._data, "name")
-                else:
-                    raise Exception(f"Cannot serialize {value}")
-            elif isinstance(value, ParseableEnum):
-                return str(value)
-            elif isinstance(value, list):
-                return [_serialize(v) for v in value]
-            elif isinstance(value, dict):
-                return {k: _serialize(v) for k, v in value.items()}
-            else:
-                return value
-
-        for key, value in asdict(self._data).items():
-            skip_field = (value is None) or (value == defaults[key])
-            skip_field = skip_field and (key != "owner")
-            if skip_field:
-                # continue
-                pass
-            serialized[key] = _serialize(value)
-
-        return serialized
+        return _serialize_spec(self._data)
 
     def create_sql(self, **kwargs):
         return create_resource(
@@ -245,9 +349,13 @@ class Resource(metaclass=_Resource):
     def drop_sql(self, if_exists: bool = False):
         return drop_resource(self.urn, self.to_dict(), if_exists=if_exists)
 
+    @property
+    def refs(self) -> tuple:
+        return self._refs
+
     def _requires(self, resource: "Resource"):
-        if isinstance(resource, (Resource, ResourcePointer)):
-            self.refs.add(resource)
+        if isinstance(resource, (Resource, ResourcePointer)) and resource not in self._refs:
+            self._refs += (resource,)
 
     def requires(self, *resources: "Resource"):
         if isinstance(resources[0], list):
@@ -286,13 +394,30 @@ class Resource(metaclass=_Resource):
         return URN.from_resource(self, account_locator="")
 
 
+def _normalize_name(name) -> str:
+    # Unquoted identifiers are case-insensitive, quoted ones are matched exactly
+    name = str(name)
+    return name if name.startswith('"') else name.upper()
+
+
+def _item_name(item: Resource):
+    if isinstance(item, ResourcePointer):
+        return item.name
+    return getattr(item._data, "name", None)
+
+
 class ResourceContainer:
     def __init__(self):
         self._items: dict[ResourceType, list[Resource]] = {}
+        # (resource type, normalized name) -> first item with that name, built on the first find
+        self._index: Optional[dict[tuple, Resource]] = None
+        # (resource type, FQN) -> resource for the whole tree under this container, built on the first find_fqn
+        self._fqn_index: Optional[dict[tuple, Resource]] = None
 
     def add(self, *items: Resource):
         if isinstance(items[0], list):
             items = items[0]
+        root = self._root_container()
         for item in items:
 
             if item.container and not isinstance(item.container, ResourcePointer):
@@ -303,6 +428,29 @@ class ResourceContainer:
                 self._items[item.resource_type] = []
             self._items[item.resource_type].append(item)
 
+            if self._index is not None:
+                name = _item_name(item)
+                if name is None:
+                    # Resources add themselves to their container before their spec is set
+                    self._index = None
+                else:
+                    self._index.setdefault((item.resource_type, _normalize_name(name)), item)
+            if root._fqn_index is not None:
+                root._index_fqns(item)
+
+    def _root_container(self) -> "ResourceContainer":
+        root = self
+        while isinstance(root.container, ResourceContainer):
+            root = root.container
+        return root
+
+    def _index_fqns(self, item: Resource):
+        if _item_name(item) is not None:
+            self._fqn_index.setdefault((item.resource_type, item.fqn), item)
+        if isinstance(item, ResourceContainer):
+            for child in item.items():
+                self._index_fqns(child)
+
     def items(self, resource_type: ResourceType = None) -> list[Resource]:
         if resource_type:
             return self._items.get(resource_type, [])
@@ -310,10 +458,28 @@ class ResourceContainer:
             return list(chain.from_iterable(self._items.values()))
 
     def find(self, resource_type: ResourceType, name: str) -> Resource:
-        for resource in self.items(resource_type):
-            if resource._data.name == name:
-                return resource
-        raise KeyError(f"Resource {resource_type} {name} not found")
+        if self._index is None:
+            index = {}
+            for item in self.items():
+                item_name = _item_name(item)
+                if item_name is not None:
+                    index.setdefault((item.resource_type, _normalize_name(item_name)), item)
+            self._index = index
+        try:
+            return self._index[(resource_type, _normalize_name(name))]
+        except KeyError:
+            raise KeyError(f"Resource {resource_type} {name} not found")
+
+    def find_fqn(self, resource_type: ResourceType, fqn: FQN) -> Resource:
+        """Find a resource anywhere under this container by its fully qualified name"""
+        if self._fqn_index is None:
+            self._fqn_index = {}
+            for item in self.items():
+                self._index_fqns(item)
+        try:
+            return self._fqn_index[(resource_type, fqn)]
+        except KeyError:
+            raise KeyError(f"Resource {resource_type} {fqn} not found")
 
     @property
     def name(self):
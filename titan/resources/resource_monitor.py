@@ -1,6 +1,6 @@
 from dataclasses import dataclass
 
-from .resource import Resource, ResourceSpec
+from .resource import Resource, ResourceSpec, slotted
 from ..enums import ParseableEnum, ResourceType
 from ..scope import AccountScope
 from ..props import (
@@ -20,6 +20,7 @@ class ResourceMonitorFrequency(ParseableEnum):
     NEVER = "NEVER"
 
 
+@slotted
 @dataclass
 class _ResourceMonitor(ResourceSpec):
     name: str
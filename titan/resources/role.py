@@ -1,12 +1,13 @@
 from dataclasses import dataclass
 
-from .resource import Resource, ResourceSpec
+from .resource import Resource, ResourceSpec, slotted
 from ..enums import ResourceType
 from ..parse import parse_identifier
 from ..props import Props, StringProp, TagsProp
 from ..scope import AccountScope, DatabaseScope
 
 
+@slotted
 @dataclass
 class _Role(ResourceSpec):
     name: str
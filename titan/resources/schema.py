@@ -1,11 +1,12 @@
 from dataclasses import dataclass
 
-from .resource import Resource, ResourceContainer, ResourcePointer, ResourceSpec
+from .resource import Resource, ResourceContainer, ResourcePointer, ResourceSpec, slotted
 from ..enums import ResourceType
 from ..props import Props, IntProp, StringProp, TagsProp, FlagProp
 from ..scope import DatabaseScope
 
 
+@slotted
 @dataclass
 class _Schema(ResourceSpec):
     name: str
@@ -1,5 +1,5 @@
 from dataclasses import dataclass
-from .resource import Resource, ResourceSpec
+from .resource import Resource, ResourceSpec, slotted
 from ..enums import ParseableEnum, ResourceType
 from ..scope import SchemaScope
 from ..props import (
@@ -16,6 +16,7 @@ class SecretType(ParseableEnum):
     GENERIC_STRING = "GENERIC_STRING"
 
 
+@slotted
 @dataclass
 class _Secret(ResourceSpec):
     name: str
@@ -1,12 +1,13 @@
 from dataclasses import dataclass
 
-from .resource import Resource, ResourceSpec
+from .resource import Resource, ResourceSpec, slotted
 from ..enums import ResourceType
 from ..scope import SchemaScope
 
 from ..props import Props, IntProp, StringProp
 
 
+@slotted
 @dataclass
 class _Sequence(ResourceSpec):
     name: str
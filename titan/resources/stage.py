@@ -1,7 +1,7 @@
 from dataclasses import dataclass
 from typing import Union
 
-from .resource import Resource, ResourceSpec
+from .resource import Resource, ResourceSpec, slotted
 from ..enums import ParseableEnum, ResourceType
 from ..scope import SchemaScope
 from ..props import (
@@ -55,6 +55,7 @@ copy_options = Props(
 )
 
 
+@slotted
 @dataclass
 class _InternalStage(ResourceSpec):
     name: str
@@ -141,6 +142,7 @@ class InternalStage(Resource):
         )
 
 
+@slotted
 @dataclass
 class _ExternalStage(ResourceSpec):
     name: str
@@ -1,6 +1,6 @@
 from dataclasses import dataclass
 
-from .resource import Resource, ResourceSpec
+from .resource import Resource, ResourceSpec, slotted
 from ..enums import ParseableEnum, ResourceType
 from ..scope import AccountScope
 from ..props import Props, StringProp, BoolProp, EnumProp, StringListProp
@@ -12,6 +12,7 @@ class StorageProvider(ParseableEnum):
     GCS = "GCS"
 
 
+@slotted
 @dataclass
 class _S3StorageIntegration(ResourceSpec):
     name: str
@@ -89,6 +90,7 @@ class S3StorageIntegration(Resource):
         )
 
 
+@slotted
 @dataclass
 class _GCSStorageIntegration(ResourceSpec):
     name: str
@@ -158,6 +160,7 @@ class GCSStorageIntegration(Resource):
         )
 
 
+@slotted
 @dataclass
 class _AzureStorageIntegration(ResourceSpec):
     name: str
@@ -1,6 +1,6 @@
 from dataclasses import dataclass
 
-from .resource import Resource, ResourcePointer, ResourceSpec
+from .resource import Resource, ResourcePointer, ResourceSpec, slotted
 from .table import Table
 from .view import View
 
@@ -18,6 +18,7 @@ class StreamType(ParseableEnum):
     VIEW = "VIEW"
 
 
+@slotted
 @dataclass
 class _TableStream(ResourceSpec):
     name: str
@@ -155,6 +156,7 @@ class TableStream(Resource):
 #         )
 
 
+@slotted
 @dataclass
 class _StageStream(ResourceSpec):
     name: str
@@ -203,6 +205,7 @@ class StageStream(Resource):
         self.requires(ResourcePointer(name=self._data.on_stage, resource_type=ResourceType.STAGE))
 
 
+@slotted
 @dataclass
 class _ViewStream(ResourceSpec):
     name: str
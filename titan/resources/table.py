@@ -1,6 +1,6 @@
 from dataclasses import dataclass
 
-from .resource import Resource, ResourceSpec
+from .resource import Resource, ResourceSpec, slotted
 from .column import Column
 
 # from .stage import InternalStage, copy_options
@@ -19,6 +19,7 @@ from ..props import (
 )
 
 
+@slotted
 @dataclass
 class _Table(ResourceSpec):
     name: str
@@ -48,6 +49,8 @@ class _Table(ResourceSpec):
 
 
 class Table(Resource):
+    __slots__ = ("_table_stage",)
+
     resource_type = ResourceType.TABLE
     props = Props(
         volatile=FlagProp("volatile"),
@@ -1,11 +1,12 @@
 from dataclasses import dataclass
 
-from .resource import Resource, ResourceSpec
+from .resource import Resource, ResourceSpec, slotted
 from ..enums import AccountEdition, ResourceType
 from ..scope import SchemaScope
 from ..props import Props, StringProp, StringListProp
 
 
+@slotted
 @dataclass
 class _Tag(ResourceSpec):
     name: str
@@ -1,6 +1,6 @@
 from dataclasses import dataclass
 
-from .resource import Resource, ResourceSpec
+from .resource import Resource, ResourceSpec, slotted
 from .warehouse import Warehouse, WarehouseSize
 from ..enums import ResourceType
 from ..props import (
@@ -18,6 +18,7 @@ from ..props import (
 from ..scope import AccountScope
 
 
+@slotted
 @dataclass
 class _Task(ResourceSpec):
     name: str
@@ -1,6 +1,6 @@
 from dataclasses import dataclass
 
-from .resource import Resource, ResourceSpec
+from .resource import Resource, ResourceSpec, slotted
 from .resource_monitor import ResourceMonitor
 from ..enums import ParseableEnum, ResourceType
 from ..scope import AccountScope
@@ -56,6 +56,7 @@ class WarehouseScalingPolicy(ParseableEnum):
     ECONOMY = "ECONOMY"
 
 
+@slotted
 @dataclass
 class _Warehouse(ResourceSpec):
     name: str
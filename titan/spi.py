@@ -180,7 +180,7 @@ def _create_or_update_resource(
     resource_cls = resources.Resource.resolve_resource_cls(resource_type)
     session_ctx = dp.fetch_session(sf_session)
     if isinstance(resource_cls.scope, (DatabaseScope, SchemaScope)) and fqn.database is None:
-        fqn.database = config.get("database", session_ctx["database"])
+        fqn = fqn.replace(database=config.get("database", session_ctx["database"]))
     urn = URN(resource_type=resource_type, fqn=fqn, account_locator=session_ctx["account_locator"])
     original = dp.fetch_resource(sf_session, urn)
     sql = []
@@ -293,7 +293,7 @@ def fetch_schema(sp_session, name: str) -> dict:
     """
     fqn = parse_identifier(name, is_db_scoped=True)
     if fqn.database is None:
-        fqn.database = sp_session.get_current_database()
+        fqn = fqn.replace(database=sp_session.get_current_database())
     return dp.fetch_schema(sp_session.connection, fqn)
 
 
@@ -0,0 +1,167 @@
+import hashlib
+import json
+import os
+import time
+
+from itertools import chain
+from typing import Optional
+
+# Remote state older than this many seconds is refetched even if its manifest entry hasn't changed
+STATE_MAX_AGE = 3600
+
+
+def fingerprint(data) -> str:
+    """
+    A stable hash of a manifest entry. Key order doesn't matter, any value JSON can't encode is
+    hashed by its string form.
+    """
+    serialized = json.dumps(data, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha1(serialized.encode("utf-8")).hexdigest()
+
+
+class StateStore:
+    """
+    A local cache of remote state, stored as one JSON object per line and keyed by URN.
+
+    Each entry holds the remote state fetched for a URN, the fingerprint of the manifest entry it was
+    fetched for, and when it was fetched. An entry is only served while that fingerprint still matches
+    and the entry is younger than `max_age` seconds, so changing a resource in the blueprint always
+    refetches it.
+
+    With `track_changes`, each entry also records a change marker for the object, built from its
+    created_on/last_altered timestamps. As soon as an object's marker moves it is refetched, even if its
+    entry is younger than `max_age`.
+
+    The store also records subtrees, a database and everything the blueprint puts in it, by the hash of
+    their manifest entries. A subtree is recorded once a plan finds nothing to change in it, and while
+    its hash and marker hold and it's younger than `max_age`, later plans skip it entirely.
+    """
+
+    def __init__(self, path: str, max_age: float = STATE_MAX_AGE, track_changes: bool = False):
+        self.path = path
+        self.max_age = max_age
+        self.track_changes = track_changes
+        self._entries: Optional[dict] = None
+        self._subtrees: Optional[dict] = None
+
+    @property
+    def entries(self) -> dict:
+        if self._entries is None:
+            self._entries, self._subtrees = self._read()
+        return self._entries
+
+    @property
+    def subtrees(self) -> dict:
+        if self._subtrees is None:
+            self._entries, self._subtrees = self._read()
+        return self._subtrees
+
+    def _read(self) -> tuple:
+        entries, subtrees = {}, {}
+        if not os.path.exists(self.path):
+            return entries, subtrees
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # A partially written line can't be trusted, it will be refetched
+                    continue
+                if "subtree" in entry:
+                    subtrees[entry["subtree"]] = entry
+                else:
+                    entries[entry["urn"]] = entry
+        return entries, subtrees
+
+    def get(self, urn_str: str, manifest_entry, marker: Optional[str] = None) -> Optional[dict]:
+        """
+        Return the cached entry for a URN, or None if it's missing, stale, or was fetched for a
+        different manifest entry. The remote state is under the entry's "remote" key and is None if the
+        resource didn't exist.
+
+        When both `marker` and the entry's recorded marker are known and differ, the entry is stale
+        regardless of its age. A matching marker never extends an entry past `max_age`, since some
+        changes, like ownership grants or tags, don't move it.
+        """
+        entry = self.entries.get(urn_str)
+        if entry is None:
+            return None
+        if entry["fingerprint"] != fingerprint(manifest_entry):
+            return None
+        if marker is not None and entry.get("marker") is not None and entry["marker"] != marker:
+            return None
+        if time.time() - entry["fetched_at"] > self.max_age:
+            return None
+        return entry
+
+    def get_subtree(self, urn_str: str, subtree_hash: str, marker: Optional[str] = None) -> bool:
+        """
+        Whether the subtree rooted at a URN was recorded with the same hash and is still fresh, by the
+        same rules as `get`.
+        """
+        subtree = self.subtrees.get(urn_str)
+        if subtree is None or subtree["hash"] != subtree_hash:
+            return False
+        if marker is not None and subtree.get("marker") is not None and subtree["marker"] != marker:
+            return False
+        return time.time() - subtree["recorded_at"] <= self.max_age
+
+    def put(self, urn_str: str, manifest_entry, remote, marker: Optional[str] = None) -> None:
+        entry = {
+            "urn": urn_str,
+            "fingerprint": fingerprint(manifest_entry),
+            "fetched_at": time.time(),
+            "marker": marker,
+            "remote": remote,
+        }
+        try:
+            json.dumps(entry)
+        except (TypeError, ValueError):
+            # Remote state that doesn't survive a round trip through JSON isn't cached
+            self.entries.pop(urn_str, None)
+            return
+        self.entries[urn_str] = entry
+
+    def put_subtree(
+        self,
+        urn_str: str,
+        subtree_hash: str,
+        member_urns: list,
+        marker: Optional[str] = None,
+    ) -> None:
+        """
+        Record a subtree. Its age is that of the oldest remote state it was checked against, so a subtree
+        checked against cached entries expires with them instead of restarting the clock.
+        """
+        now = time.time()
+        fetched_at = [self.entries[member]["fetched_at"] for member in member_urns if member in self.entries]
+        self.subtrees[urn_str] = {
+            "subtree": urn_str,
+            "hash": subtree_hash,
+            "recorded_at": min(fetched_at, default=now),
+            "marker": marker,
+        }
+
+    def invalidate(self, *urn_strs: str) -> None:
+        for urn_str in urn_strs:
+            self.entries.pop(urn_str, None)
+            self.subtrees.pop(urn_str, None)
+
+    def clear(self) -> None:
+        self._entries = {}
+        self._subtrees = {}
+
+    def save(self) -> None:
+        if self._entries is None:
+            return
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for entry in chain(self._entries.values(), self._subtrees.values()):
+                f.write(json.dumps(entry, separators=(",", ":")))
+                f.write("\n")
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,56 @@
+"""
+Compare serial and multiprocess import of a generated DDL script.
+
+The script cycles through the SQL fixtures that parse cleanly, so it exercises the same grammars as a
+real GET_DDL export.
+
+    python tools/benchmarks/bulk_import.py --statements 20000 --workers 8
+"""
+
+import argparse
+import io
+import sys
+import time
+
+sys.path.insert(0, ".")
+
+from tests.helpers import get_sql_fixtures  # noqa: E402
+from titan import Blueprint  # noqa: E402
+from titan.importer import bulk_import, import_sql, resource_from_sql  # noqa: E402
+
+
+def build_script(statement_count: int) -> str:
+    fixtures = []
+    for _, sql, _ in get_sql_fixtures():
+        try:
+            resource_from_sql(sql)
+        except Exception:
+            continue
+        fixtures.append(sql)
+    return ";\n".join(fixtures[idx % len(fixtures)] for idx in range(statement_count)) + ";\n"
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--statements", type=int, default=20_000)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    script = build_script(args.statements)
+    print(f"{args.statements} statements, {len(script) / 1e6:.1f} MB")
+
+    start = time.perf_counter()
+    serial = import_sql(io.StringIO(script), Blueprint(name="serial"))
+    print(f"import_sql: {time.perf_counter() - start:.2f}s")
+
+    start = time.perf_counter()
+    pooled = Blueprint(name="pooled")
+    errors = bulk_import(io.StringIO(script), pooled, max_workers=args.workers)
+    print(f"bulk_import: {time.perf_counter() - start:.2f}s, {len(errors)} errors")
+
+    same_order = [type(res) for res in serial._staged] == [type(res) for res in pooled._staged]
+    print(f"same resources in the same order: {same_order}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Time diff on remote state and a manifest with many grants to one role.
+
+Grants are diffed in two layouts: one URN per granted object, which is how a blueprint manifests them,
+and every grant under a single URN, which is the worst case for list entries. In both, `--changed`
+grants differ between the two sides and everything else is identical.
+
+    python tools/benchmarks/diff_grants.py --grants 10000 --changed 10
+"""
+
+import argparse
+import time
+
+from titan.diff import diff
+
+
+def grant(idx: int, priv: str = "SELECT") -> dict:
+    return {
+        "priv": priv,
+        "on": f"DB.SCH.TBL_{idx}",
+        "on_type": "TABLE",
+        "to": "ANALYST",
+        "grant_option": False,
+        "owner": "SYSADMIN",
+    }
+
+
+def per_urn_state(grant_count: int, changed: int) -> tuple:
+    remote, manifest = {}, {}
+    for idx in range(grant_count):
+        urn_str = f"urn::BENCH:grant/ANALYST?on=DB.SCH.TBL_{idx}&type=TABLE"
+        remote[urn_str] = [grant(idx)]
+        manifest[urn_str] = [grant(idx, "INSERT" if idx < changed else "SELECT")]
+    return remote, manifest
+
+
+def single_urn_state(grant_count: int, changed: int) -> tuple:
+    urn_str = "urn::BENCH:grant/ANALYST?on=DB.SCH.TBL&type=TABLE"
+    remote = [grant(idx) for idx in range(grant_count)]
+    manifest = [grant(idx, "INSERT" if idx < changed else "SELECT") for idx in reversed(range(grant_count))]
+    return {urn_str: remote}, {urn_str: manifest}
+
+
+LAYOUTS = {
+    "per_urn": per_urn_state,
+    "single_urn": single_urn_state,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--grants", type=int, default=10_000)
+    parser.add_argument("--changed", type=int, default=10)
+    parser.add_argument("--layouts", nargs="+", default=list(LAYOUTS))
+    args = parser.parse_args()
+
+    for layout in args.layouts:
+        remote, manifest = LAYOUTS[layout](args.grants, args.changed)
+        start = time.perf_counter()
+        changes = list(diff(remote, manifest))
+        elapsed = time.perf_counter() - start
+        print(f"{layout:>10}: {elapsed:.3f}s, {len(changes)} changes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+Wall-clock scaling of Blueprint remote state fetching as the worker count grows.
+
+Runs `_fetch_remote_state` against a stub session that sleeps for a fixed latency on every query, so the
+numbers approximate a plan dominated by Snowflake round trips.
+
+    python tools/benchmarks/fetch_remote_state.py --resources 300 --latency 0.02
+"""
+
+import argparse
+import contextlib
+import io
+import sys
+import time
+
+from titan import Blueprint, Database, Role, Warehouse
+from titan.blueprint import _fetch_remote_state
+
+sys.path.insert(0, ".")
+from tests.helpers import StubSession  # noqa: E402
+
+SESSION_CTX = {"account": "BENCH", "account_locator": "BENCH123"}
+
+
+def build_manifest(resource_count: int):
+    resources = []
+    for i in range(resource_count):
+        resource_cls = [Database, Role, Warehouse][i % 3]
+        resources.append(resource_cls(name=f"BENCH_{i}"))
+    return Blueprint(name="bench", resources=resources).generate_manifest(SESSION_CTX)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--resources", type=int, default=300)
+    parser.add_argument("--latency", type=float, default=0.02, help="Simulated seconds per query")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32])
+    args = parser.parse_args()
+
+    manifest = build_manifest(args.resources)
+    print(f"{args.resources} resources, {args.latency * 1000:.0f}ms per query")
+    print(f"{'workers':>8} {'queries':>8} {'seconds':>8} {'speedup':>8}")
+    baseline = None
+    for workers in args.workers:
+        session = StubSession(latency=args.latency)
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            _fetch_remote_state(session, manifest, max_workers=workers)
+        elapsed = time.perf_counter() - start
+        baseline = baseline or elapsed
+        print(f"{workers:>8} {len(session.queries):>8} {elapsed:>8.2f} {baseline / elapsed:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
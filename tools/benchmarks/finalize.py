@@ -0,0 +1,43 @@
+"""
+Time Blueprint._finalize as the number of schema-scoped resources grows.
+
+Tables are created against schema pointers, so finalize has to resolve every one of them to a real
+schema in the blueprint. Time per table should stay flat as the blueprint grows.
+
+    python tools/benchmarks/finalize.py --tables 5000 10000 20000
+"""
+
+import argparse
+import time
+
+from titan import Blueprint, Database, Schema, Table
+
+SESSION_CTX = {"account": "BENCH", "account_locator": "BENCH", "database": None}
+
+
+def build_blueprint(table_count: int, schema_count: int = 200) -> Blueprint:
+    db = Database(name="DB")
+    schemas = [Schema(name=f"SCH_{idx}") for idx in range(schema_count)]
+    db.add(schemas)
+    tables = [
+        Table(name=f"T_{idx}", columns=[{"name": "ID", "data_type": "INT"}], schema=f"SCH_{idx % schema_count}")
+        for idx in range(table_count)
+    ]
+    return Blueprint(name="bench", resources=[db, *schemas, *tables])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tables", type=int, nargs="+", default=[5_000, 10_000, 20_000])
+    args = parser.parse_args()
+
+    for table_count in args.tables:
+        blueprint = build_blueprint(table_count)
+        start = time.perf_counter()
+        blueprint._finalize(SESSION_CTX)
+        elapsed = time.perf_counter() - start
+        print(f"{table_count} tables: {elapsed:.3f}s ({elapsed / table_count * 1e6:.1f}us per table)")
+
+
+if __name__ == "__main__":
+    main()
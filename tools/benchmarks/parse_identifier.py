@@ -0,0 +1,47 @@
+"""
+Compare the fast identifier path against the full FullyQualifiedIdentifier grammar.
+
+Identifiers are a mix of one- to four-part unquoted names, the shape of the FQNs titan builds for URNs.
+Both paths are timed on the same list, and every result is checked against the other.
+
+    python tools/benchmarks/parse_identifier.py --identifiers 1000000
+"""
+
+import argparse
+import random
+import time
+
+from titan.parse import FullyQualifiedIdentifier, _scoped_name_parts
+
+
+def build_identifiers(count: int, seed: int = 0) -> list:
+    rng = random.Random(seed)
+    identifiers = []
+    for idx in range(count):
+        parts = [f"DB_{rng.randrange(100)}", f"SCH_{rng.randrange(100)}", f"TBL_{idx}", "COL"]
+        identifiers.append(".".join(parts[: rng.randint(1, 4)]))
+    return identifiers
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--identifiers", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    identifiers = build_identifiers(args.identifiers)
+
+    start = time.perf_counter()
+    fast = [_scoped_name_parts(identifier) for identifier in identifiers]
+    fast_elapsed = time.perf_counter() - start
+    print(f"fast path: {fast_elapsed:.2f}s")
+
+    start = time.perf_counter()
+    grammar = [list(FullyQualifiedIdentifier.parse_string(identifier, parse_all=True)) for identifier in identifiers]
+    grammar_elapsed = time.perf_counter() - start
+    print(f"grammar: {grammar_elapsed:.2f}s ({grammar_elapsed / fast_elapsed:.0f}x)")
+
+    print(f"same results: {fast == grammar}")
+
+
+if __name__ == "__main__":
+    main()
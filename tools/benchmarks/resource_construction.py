@@ -0,0 +1,43 @@
+"""
+Measure construction throughput per resource type.
+
+Every construction runs ResourceSpec.__post_init__, so this mostly measures field coercion. Each type is
+built with the kind of arguments a generated blueprint passes.
+
+    python tools/benchmarks/resource_construction.py --count 50000
+"""
+
+import argparse
+import time
+
+from titan.resources import Column, Grant, Role, RoleGrant, Table, Warehouse
+
+COLUMNS = [{"name": f"COL_{idx}", "data_type": "VARCHAR"} for idx in range(5)]
+
+FACTORIES = {
+    "column": lambda idx: Column(name=f"COL_{idx}", data_type="NUMBER(38,0)", comment="a column"),
+    "grant": lambda idx: Grant(priv="USAGE", on_warehouse=f"WH_{idx}", to=f"ROLE_{idx}"),
+    "role": lambda idx: Role(name=f"ROLE_{idx}", comment="a role"),
+    "role_grant": lambda idx: RoleGrant(role=f"ROLE_{idx}", to_role="SYSADMIN"),
+    "table": lambda idx: Table(name=f"TBL_{idx}", columns=COLUMNS),
+    "warehouse": lambda idx: Warehouse(name=f"WH_{idx}", warehouse_size="XSMALL", auto_suspend=60),
+}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--count", type=int, default=50_000)
+    parser.add_argument("--types", nargs="+", default=list(FACTORIES))
+    args = parser.parse_args()
+
+    for resource_type in args.types:
+        factory = FACTORIES[resource_type]
+        start = time.perf_counter()
+        for idx in range(args.count):
+            factory(idx)
+        elapsed = time.perf_counter() - start
+        print(f"{resource_type:>12}: {args.count / elapsed:>10,.0f}/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Time blueprint.topological_sort on a synthetic account-shaped graph.
+
+Databases contain schemas, schemas contain tables and views, and every view and grant references a few
+tables, roughly the shape `Blueprint.generate_manifest` produces for a large account.
+
+    python tools/benchmarks/topological_sort.py --nodes 100000
+"""
+
+import argparse
+import random
+import time
+
+from titan.blueprint import topological_sort
+
+
+def build_graph(node_count: int, seed: int = 0):
+    rng = random.Random(seed)
+    urns = []
+    refs = []
+    tables = []
+    db_count = max(1, node_count // 10_000)
+    schemas_per_db = 20
+    for d in range(db_count):
+        db = f"urn::BENCH:database/DB_{d}"
+        urns.append(db)
+        for s in range(schemas_per_db):
+            schema = f"urn::BENCH:schema/DB_{d}.SCH_{s}"
+            urns.append(schema)
+            refs.append((schema, db))
+
+    schemas = [urn for urn in urns if ":schema/" in urn]
+    idx = 0
+    while len(urns) < node_count:
+        schema = schemas[idx % len(schemas)]
+        fqn = schema.split("/", 1)[1]
+        kind = idx % 3
+        if kind == 0 or not tables:
+            urn = f"urn::BENCH:table/{fqn}.T_{idx}"
+            tables.append(urn)
+            refs.append((urn, schema))
+        elif kind == 1:
+            urn = f"urn::BENCH:view/{fqn}.V_{idx}"
+            refs.append((urn, schema))
+            refs.extend((urn, table) for table in rng.sample(tables, min(3, len(tables))))
+        else:
+            urn = f"urn::BENCH:grant/ROLE_{idx % 50}?on={fqn}.T_{idx}&type=TABLE"
+            refs.append((urn, rng.choice(tables)))
+        urns.append(urn)
+        idx += 1
+    return set(urns), refs
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--nodes", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    resource_set, refs = build_graph(args.nodes)
+    print(f"{len(resource_set)} nodes, {len(refs)} edges")
+    first = None
+    for run in range(args.repeat):
+        start = time.perf_counter()
+        order = topological_sort(resource_set, refs)
+        elapsed = time.perf_counter() - start
+        first = first or order
+        print(f"run {run + 1}: {elapsed:.3f}s, identical to run 1: {order == first}")
+
+
+if __name__ == "__main__":
+    main()